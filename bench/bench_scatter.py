@@ -0,0 +1,142 @@
+"""Scaling benchmark for ScatterObject against a stand-in maya.cmds
+
+Runs every form_of_scatter mode over a grid of target sizes and scatter
+percentages without Maya. The stand-in modules in bench/fake_maya
+record every command and API call. Results are saved as JSON, and a
+previous results file can be passed as a baseline to flag regressions.
+
+Usage: python bench/bench_scatter.py [--sizes 1000 1000000]
+           [--percentages 1 100] [--output results.json]
+           [--baseline old.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, "fake_maya"),
+                os.path.join(os.path.dirname(BENCH_DIR), "src")]
+
+from maya import _scene  # noqa: E402
+import scatter  # noqa: E402
+
+log = logging.getLogger("bench_scatter")
+FORMS = {0: "random_rotation", 1: "align_to_normals",
+         2: "align_to_normals_random_rotation"}
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_PERCENTAGES = [1, 10, 100]
+
+
+def run_case(vertex_count, percentage, form_of_scatter):
+    """Times one scatter on a fresh scene, returns a result dict"""
+    _scene.reset()
+    _scene.add_grid_mesh("ground", vertex_count)
+    _scene.add_node("rock")
+    _scene.add_node("rockShape", "mesh", _scene.nodes["rock"])
+    scatter_object = scatter.ScatterObject()
+    scatter_object.scatter_x_max = 360
+    scatter_object.scatter_y_max = 360
+    scatter_object.scatter_z_max = 360
+    scatter_object.scatter_scale_xmin = 0.5
+    scatter_object.scatter_scale_ymin = 0.5
+    scatter_object.scatter_scale_zmin = 0.5
+    scatter_object.scatter_scale_xmax = 2
+    scatter_object.scatter_scale_ymax = 2
+    scatter_object.scatter_scale_zmax = 2
+    scatter_object.scatter_percentage = percentage
+    scatter_object.form_of_scatter = form_of_scatter
+    scatter_object.seed = 1
+    _scene.selection[:] = ["rock"]
+    scatter_object.select_scatter_object()
+    _scene.selection[:] = ["ground"]
+    scatter_object.select_target_object()
+    _scene.calls.clear()
+    tracemalloc.start()
+    start = time.time()
+    scatter_object.scatter_check()
+    seconds = time.time() - start
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    instances = len(_scene.nodes["instance_group1"].children)
+    return {
+        "vertices": len(_scene.meshes["ground"][0]),
+        "percentage": percentage,
+        "form_of_scatter": form_of_scatter,
+        "mode": FORMS[form_of_scatter],
+        "instances": instances,
+        "seconds": seconds,
+        "seconds_per_instance": seconds / max(instances, 1),
+        "total_calls": sum(_scene.calls.values()),
+        "calls": dict(_scene.calls),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Returns descriptions of cases slower than baseline by tolerance"""
+    previous = dict(((case["vertices"], case["percentage"],
+                      case["form_of_scatter"]), case) for case in baseline)
+    regressions = []
+    for case in results:
+        old = previous.get((case["vertices"], case["percentage"],
+                            case["form_of_scatter"]))
+        if old is None:
+            continue
+        if case["seconds_per_instance"] > \
+                old["seconds_per_instance"] * (1.0 + tolerance) or \
+                case["total_calls"] > old["total_calls"]:
+            regressions.append(
+                "%s, %d vertices, %d%%: %.2e -> %.2e s/instance, "
+                "%d -> %d calls" % (
+                    case["mode"], case["vertices"], case["percentage"],
+                    old["seconds_per_instance"],
+                    case["seconds_per_instance"], old["total_calls"],
+                    case["total_calls"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=DEFAULT_SIZES)
+    parser.add_argument("--percentages", type=int, nargs="+",
+                        default=DEFAULT_PERCENTAGES)
+    parser.add_argument("--forms", type=int, nargs="+",
+                        default=sorted(FORMS))
+    parser.add_argument("--output",
+                        default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = []
+    for vertex_count in args.sizes:
+        for percentage in args.percentages:
+            for form_of_scatter in args.forms:
+                case = run_case(vertex_count, percentage, form_of_scatter)
+                results.append(case)
+                log.info("%-34s %8d verts %4d%% %8d inst %8.3f s "
+                         "%.2e s/inst %8d calls %7.1f MB",
+                         case["mode"], case["vertices"], percentage,
+                         case["instances"], case["seconds"],
+                         case["seconds_per_instance"], case["total_calls"],
+                         case["peak_memory_bytes"] / 1e6)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=1, sort_keys=True)
+    log.info("Saved %d cases to %s", len(results), args.output)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file),
+                                  args.tolerance)
+        for regression in regressions:
+            log.warning("Regression: %s", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""In memory scene and call log shared by the stand-in Maya modules"""
+import collections
+import numpy as np
+
+calls = collections.Counter()
+nodes = {}
+meshes = {}
+selection = []
+commands = {}
+
+
+class Node(object):
+    """A scene node with a name, a type and DAG children"""
+
+    def __init__(self, name, node_type="transform", parent=None):
+        self.name = name
+        self.type = node_type
+        self.children = []
+        self.parents = []
+        self.valid = True
+        if parent is not None:
+            parent.add_child(self)
+
+    def add_child(self, child):
+        self.children.append(child)
+        child.parents.append(self)
+
+    def remove_child(self, child):
+        self.children.remove(child)
+        child.parents.remove(self)
+
+
+def record(name):
+    calls[name] += 1
+
+
+def reset():
+    """Clears the scene and the call log"""
+    calls.clear()
+    nodes.clear()
+    meshes.clear()
+    del selection[:]
+
+
+def add_node(name, node_type="transform", parent=None):
+    base = name.rstrip("#")
+    if name.endswith("#") or name in nodes:
+        index = 1
+        while "%s%d" % (base, index) in nodes:
+            index += 1
+        name = "%s%d" % (base, index)
+    node = Node(name, node_type, parent)
+    nodes[name] = node
+    return node
+
+
+def delete_node(node):
+    for child in list(node.children):
+        node.remove_child(child)
+        if not child.parents:
+            delete_node(child)
+    for parent in list(node.parents):
+        parent.remove_child(node)
+    node.valid = False
+    nodes.pop(node.name, None)
+
+
+def add_grid_mesh(name, vertex_count):
+    """Adds a wavy grid mesh of about vertex_count vertices"""
+    side = max(int(round(vertex_count ** 0.5)), 2)
+    x, z = np.meshgrid(np.arange(side, dtype=np.float64),
+                       np.arange(side, dtype=np.float64))
+    y = 0.25 * np.sin(x * 0.3) * np.cos(z * 0.2)
+    positions = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=1)
+    corner = (np.arange(side - 1)[:, None] * side
+              + np.arange(side - 1)[None, :]).ravel()
+    triangles = np.concatenate((
+        np.stack((corner, corner + side, corner + 1), axis=1),
+        np.stack((corner + 1, corner + side, corner + side + 1), axis=1)))
+    normals = np.zeros_like(positions)
+    normals[:, 1] = 1.0
+    transform = add_node(name)
+    add_node(name + "Shape", "mesh", transform)
+    meshes[name] = (positions, normals, triangles.astype(np.int32))
+    return transform
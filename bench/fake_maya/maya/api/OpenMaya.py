@@ -0,0 +1,206 @@
+"""Stand-in for maya.api.OpenMaya backed by the in memory scene
+
+Every method call is recorded in maya._scene.calls under its class and
+method name.
+"""
+import numpy as np
+from maya import _scene
+
+
+class MSpace(object):
+    kTransform = 1
+    kWorld = 4
+
+
+class MFn(object):
+    kTransform = 110
+    kMesh = 296
+
+
+class MVector(tuple):
+
+    def __new__(cls, values):
+        return tuple.__new__(cls, values)
+
+
+class MEulerRotation(tuple):
+
+    def __new__(cls, values):
+        return tuple.__new__(cls, values)
+
+
+class MObject(object):
+    """Wraps a scene node the way an MObject refers to it"""
+
+    def __init__(self, node):
+        self.node = node
+
+    def hasFn(self, function_type):
+        if function_type == MFn.kTransform:
+            return self.node.type == "transform"
+        return function_type == MFn.kMesh and self.node.type == "mesh"
+
+
+class MObjectHandle(object):
+
+    def __init__(self, obj):
+        self._object = obj
+
+    def isValid(self):
+        return self._object.node.valid
+
+    def hashCode(self):
+        return id(self._object.node)
+
+    def object(self):
+        return self._object
+
+
+class MDagPath(MObject):
+
+    def extendToShape(self):
+        _scene.record("MDagPath.extendToShape")
+        self.node = self.node.children[0]
+
+
+class MSelectionList(object):
+
+    def __init__(self):
+        self._names = []
+
+    def add(self, name):
+        _scene.record("MSelectionList.add")
+        self._names.append(name.split("|")[-1])
+
+    def getDagPath(self, index):
+        return MDagPath(_scene.nodes[self._names[index]])
+
+    def getDependNode(self, index):
+        return MObject(_scene.nodes[self._names[index]])
+
+
+class MFnMesh(object):
+
+    def __init__(self, dag_path):
+        transform = dag_path.node.parents[0]
+        self._data = _scene.meshes[transform.name]
+
+    def getPoints(self, space):
+        _scene.record("MFnMesh.getPoints")
+        positions = self._data[0]
+        return np.concatenate((positions, np.ones((len(positions), 1))),
+                              axis=1)
+
+    def getVertexNormals(self, angle_weighted, space):
+        _scene.record("MFnMesh.getVertexNormals")
+        return self._data[1].astype(np.float32)
+
+    def getTriangles(self):
+        _scene.record("MFnMesh.getTriangles")
+        triangles = self._data[2]
+        return np.full(len(triangles), 1), triangles.ravel()
+
+
+class MFnDependencyNode(object):
+
+    def __init__(self, obj=None):
+        self._object = obj
+
+    def name(self):
+        return self._object.node.name
+
+
+class MFnDagNode(MFnDependencyNode):
+    kNextPos = -1
+
+    def object(self):
+        return self._object
+
+    def childCount(self):
+        return len(self._object.node.children)
+
+    def child(self, index):
+        return MObject(self._object.node.children[index])
+
+    def addChild(self, child, index=-1, keep_existing_parents=False):
+        _scene.record("MFnDagNode.addChild")
+        self._object.node.add_child(child.node)
+
+    def removeChild(self, child):
+        _scene.record("MFnDagNode.removeChild")
+        self._object.node.remove_child(child.node)
+
+    def fullPathName(self):
+        return "|" + self._object.node.name
+
+
+class MFnTransform(MFnDagNode):
+
+    def setObject(self, obj):
+        self._object = obj
+
+    def setTranslation(self, vector, space):
+        _scene.record("MFnTransform.setTranslation")
+        self._object.node.translation = vector
+
+    def setRotation(self, rotation, space):
+        _scene.record("MFnTransform.setRotation")
+        self._object.node.rotation = rotation
+
+    def setScale(self, scale):
+        _scene.record("MFnTransform.setScale")
+        self._object.node.scale = scale
+
+
+class MDagModifier(object):
+
+    def __init__(self):
+        self._created = []
+
+    def createNode(self, node_type, parent=None):
+        _scene.record("MDagModifier.createNode")
+        node = _scene.Node("", node_type,
+                           parent.node if parent is not None else None)
+        self._created.append(node)
+        return MObject(node)
+
+    def renameNode(self, obj, name):
+        _scene.record("MDagModifier.renameNode")
+        obj.node.name = name
+
+    def deleteNode(self, obj):
+        _scene.record("MDagModifier.deleteNode")
+
+    def doIt(self):
+        _scene.record("MDagModifier.doIt")
+        for node in self._created:
+            node.name = _scene.add_node(node.name or "transform#").name
+            _scene.nodes[node.name] = node
+
+    def undoIt(self):
+        _scene.record("MDagModifier.undoIt")
+        for node in reversed(self._created):
+            _scene.delete_node(node)
+
+
+class MPxCommand(object):
+
+    def setResult(self, result):
+        self.result = result
+
+
+class MFnPlugin(object):
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def registerCommand(self, name, creator):
+        def command(*args, **kwargs):
+            _scene.record(name)
+            instance = creator()
+            instance.doIt(args)
+            return getattr(instance, "result", None)
+        _scene.commands[name] = command
+
+    def deregisterCommand(self, name):
+        _scene.commands.pop(name, None)
@@ -0,0 +1,122 @@
+"""Stand-in for maya.cmds that records every call
+
+Only the commands the scatter tool uses do real work on the in memory
+scene in maya._scene; any other command is recorded and ignored.
+"""
+import importlib
+import os
+import re
+import sys
+from maya import _scene
+
+_loaded_plugins = set()
+
+
+def _recorded(function):
+    def wrapper(*args, **kwargs):
+        _scene.record(function.__name__)
+        return function(*args, **kwargs)
+    wrapper.__name__ = function.__name__
+    return wrapper
+
+
+@_recorded
+def ls(*args, **kwargs):
+    if kwargs.get("os") or kwargs.get("orderedSelection"):
+        return list(_scene.selection)
+    names = []
+    for pattern in args:
+        expression = re.compile(re.escape(pattern).replace(r"\*", ".*") + "$")
+        names.extend(name for name in _scene.nodes
+                     if expression.match(name))
+    return names
+
+
+@_recorded
+def select(*args, **kwargs):
+    del _scene.selection[:]
+    for arg in args:
+        _scene.selection.extend(arg if isinstance(arg, list) else [arg])
+
+
+@_recorded
+def polyListComponentConversion(selection, **kwargs):
+    components = []
+    for name in selection:
+        mesh = name.split(".")[0]
+        if mesh in _scene.meshes:
+            count = len(_scene.meshes[mesh][0])
+            components.append("%s.vtx[0:%d]" % (mesh, count - 1))
+    return components
+
+
+@_recorded
+def polyEvaluate(mesh, **kwargs):
+    return len(_scene.meshes[mesh][0])
+
+
+@_recorded
+def pluginInfo(name, **kwargs):
+    return name in _loaded_plugins
+
+
+@_recorded
+def loadPlugin(path, **kwargs):
+    name = os.path.splitext(os.path.basename(path))[0]
+    module = sys.modules.get(name) or importlib.import_module(name)
+    module.initializePlugin(name)
+    _loaded_plugins.add(name)
+
+
+@_recorded
+def group(*args, **kwargs):
+    return _scene.add_node(kwargs.get("name", "group#")).name
+
+
+@_recorded
+def objExists(name):
+    return name in _scene.nodes
+
+
+@_recorded
+def delete(*args, **kwargs):
+    for arg in args:
+        for name in (arg if isinstance(arg, list) else [arg]):
+            name = name.split("|")[-1]
+            if name in _scene.nodes:
+                _scene.delete_node(_scene.nodes[name])
+
+
+@_recorded
+def parent(*args, **kwargs):
+    args = list(args)
+    new_parent = _scene.nodes[args.pop()]
+    for name in args:
+        node = _scene.nodes[name]
+        for old_parent in list(node.parents):
+            old_parent.remove_child(node)
+        new_parent.add_child(node)
+
+
+@_recorded
+def particle(**kwargs):
+    transform = _scene.add_node(kwargs.get("name", "particle#"))
+    shape = _scene.add_node(transform.name + "Shape", "particle", transform)
+    return [transform.name, shape.name]
+
+
+@_recorded
+def particleInstancer(*args, **kwargs):
+    return _scene.add_node(kwargs.get("name", "instancer#"),
+                           "instancer").name
+
+
+def __getattr__(name):
+    if name in _scene.commands:
+        return _scene.commands[name]
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    def command(*args, **kwargs):
+        _scene.record(name)
+    return command
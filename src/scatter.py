@@ -1,411 +1,116 @@
 import logging
-import random
-from PySide2 import QtWidgets, QtCore
-from shiboken2 import wrapInstance
-import maya.OpenMayaUI as omui
+import os
+import sys
+import threading
+import time
+import numpy as np
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import scatter_binding
+import scatter_commit
+import scatter_core
+import scatter_culling
+import scatter_io
+import scatter_layout
+import scatter_masks
+import scatter_mesh
+import scatter_stats
 log = logging.getLogger(__name__)
-
-
-def maya_main_window():
-    """Return the maya main window widget"""
-    main_window = omui.MQtUtil.mainWindow()
-    return wrapInstance(long(main_window), QtWidgets.QWidget)
-
-
-class ScatterUI(QtWidgets.QDialog):
-    """Scatter Tool UI Class"""
-
-    def __init__(self):
-        super(ScatterUI, self).__init__(parent=maya_main_window())
-        self.setWindowTitle("Scatter Tool")
-        self.setMinimumWidth(500)
-        self.setMaximumWidth(1000)
-        self.setMaximumHeight(730)
-        self.setWindowFlags(self.windowFlags() ^
-                            QtCore.Qt.WindowContextHelpButtonHint)
-        self.create_ui()
-        self.create_connections()
-        self.scatterobject = ScatterObject()
-
-    def create_ui(self):
-        self.title_lbl = QtWidgets.QLabel("Scatter Tool")
-        self.title_lbl.setStyleSheet("font: bold 20px")
-        layout = self.layout_setup()
-        layout.addWidget(self.title_lbl)
-        layout.addLayout(self.scatter_field_lay)
-        layout.addLayout(self.align_to_normals_lay)
-        layout.addLayout(self.xrot_rand_lay)
-        layout.addLayout(self.yrot_rand_lay)
-        layout.addLayout(self.zrot_rand_lay)
-        layout.addLayout(self.xscale_rand_lay)
-        layout.addLayout(self.yscale_rand_lay)
-        layout.addLayout(self.zscale_rand_lay)
-        layout.addLayout(self.selected_vert_perc_rand_lay)
-        layout.addStretch()
-        layout.addLayout(self.bottom_button_rand_lay)
-        return layout
-
-    def layout_setup(self):
-        """Sets row min heights to fix layout spacing"""
-        main_lay = QtWidgets.QVBoxLayout()
-        self.layout_creation()
-        self.xrot_rand_lay.setRowMinimumHeight(0, 20)
-        self.xrot_rand_lay.setRowMinimumHeight(1, 20)
-        self.yrot_rand_lay.setRowMinimumHeight(0, 20)
-        self.zrot_rand_lay.setRowMinimumHeight(0, 20)
-        self.xscale_rand_lay.setRowMinimumHeight(0, 40)
-        self.yscale_rand_lay.setRowMinimumHeight(0, 20)
-        self.zscale_rand_lay.setRowMinimumHeight(0, 20)
-        self.selected_vert_perc_rand_lay.setRowMinimumHeight(0, 40)
-        self.bottom_button_rand_lay.setRowMinimumHeight(0, 20)
-        self.setLayout(main_lay)
-        return main_lay
-
-    def layout_creation(self):
-        """Assigns variable names to method calls"""
-        self.scatter_field_lay = self._create_scatter_field_ui()
-        self.align_to_normals_lay = self._create_align_to_normals_ui()
-        self.xrot_rand_lay = self._create_xrot_rand_field_ui()
-        self.yrot_rand_lay = self._create_yrot_rand_field_ui()
-        self.zrot_rand_lay = self._create_zrot_rand_field_ui()
-        self.xscale_rand_lay = self._create_xscale_rand_field_ui()
-        self.yscale_rand_lay = self._create_yscale_rand_field_ui()
-        self.zscale_rand_lay = self._create_zscale_rand_field_ui()
-        self.selected_vert_perc_rand_lay = \
-            self._create_selected_vert_percentage_ui()
-        self.bottom_button_rand_lay = self._create_bottom_buttons_ui()
-
-    def create_connections(self):
-        """Connects Signals and Slots"""
-        self.scatter_btn.clicked.connect(self._scatter_click)
-        self.reset_btn.clicked.connect(self._reset_click)
-        self.scatter_obj_pb.clicked.connect(self._select_scatter_object_click)
-        self.scatter_targ_pb.clicked.connect(self._select_scatter_target_click)
-        self.align_to_normals.clicked.connect(self._align_to_normals_click)
-        self.align_to_normals_and_rotation.clicked.connect(
-            self._align_to_normals_and_random_rotate_click)
-
-    @QtCore.Slot()
-    def _select_scatter_object_click(self):
-        """Sets scatter object to name of last selected object"""
-        self._set_selected_scatter_object()
-
-    @QtCore.Slot()
-    def _select_scatter_target_click(self):
-        """Sets scatter object to name of last selected object"""
-        self._set_selected_scatter_target()
-
-    @QtCore.Slot()
-    def _align_to_normals_click(self):
-        """Aligns to normals when box is checked"""
-        self._set_align_to_normals_values()
-
-    @QtCore.Slot()
-    def _align_to_normals_and_random_rotate_click(self):
-        """Aligns to normals when box is checked"""
-        self._set_align_to_normals_values_and_rotate_randomly()
-
-    @QtCore.Slot()
-    def _scatter_click(self):
-        """Scatters object with randomization specifications"""
-        if len(self.scatter_obj.text()) <= 0:
-            log.warning("Scatter Failed: Scatter Object Not Selected. Select "
-                        "a Scatter Object to fix this.")
-        elif len(self.scatter_targ.text()) <= 0:
-            log.warning("Scatter Failed: Scatter Destination Object Not "
-                        "Selected. Select a Scatter Object to fix this.")
-        else:
-            self._set_scatterobject_properties_from_ui()
-            self.scatterobject.scatter_check()
-
-    @QtCore.Slot()
-    def _reset_click(self):
-        """Reset UI values to default"""
-        self._reset_scatterobject_properties_from_ui()
-
-    def _create_scatter_field_ui(self):
-        layout = self._create_scatter_field_headers()
-        self.scatter_obj = QtWidgets.QLineEdit()
-        self.scatter_obj.setMinimumWidth(100)
-        self.scatter_obj_pb = QtWidgets.QPushButton("Select")
-        self.scatter_obj_pb.setFixedWidth(50)
-        self.scatter_targ = QtWidgets.QLineEdit()
-        self.scatter_targ.setMinimumWidth(100)
-        self.scatter_targ_pb = QtWidgets.QPushButton("Select")
-        self.scatter_targ_pb.setFixedWidth(50)
-        layout.addWidget(self.scatter_obj, 1, 0)
-        layout.addWidget(self.scatter_obj_pb, 1, 2)
-        layout.addWidget(self.scatter_targ, 1, 3)
-        layout.addWidget(self.scatter_targ_pb, 1, 4)
-        return layout
-
-    def _create_align_to_normals_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.align_to_normals = QtWidgets.QCheckBox("Align to Normals")
-        layout.addWidget(self.align_to_normals, 2, 0)
-        self.align_to_normals_and_rotation \
-            = QtWidgets.QCheckBox("Align to Normals with Random Rotation")
-        layout.addWidget(self.align_to_normals_and_rotation, 2, 1)
-        return layout
-
-    def _set_align_to_normals_values(self):
-        if self.align_to_normals.isChecked():
-            self.align_to_normals_and_rotation.setChecked(False)
-            self.scatterobject.form_of_scatter = 1
-        else:
-            self.scatterobject.form_of_scatter = 0
-
-    def _set_align_to_normals_values_and_rotate_randomly(self):
-        if self.align_to_normals_and_rotation.isChecked():
-            self.align_to_normals.setChecked(False)
-            self.scatterobject.form_of_scatter = 2
-        else:
-            self.scatterobject.form_of_scatter = 0
-
-    def _create_xrot_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.x_min_lbl = QtWidgets.QLabel("X Rotation Variation Minimum")
-        self.x_max_lbl = QtWidgets.QLabel("X Rotation Variation Maximum")
-        self._set_xrot_spinbox()
-        layout.addWidget(self.x_min_lbl, 1, 0)
-        layout.addWidget(self.xrot_min, 2, 0)
-        layout.addWidget(self.x_max_lbl, 1, 1)
-        layout.addWidget(self.xrot_max, 2, 1)
-        return layout
-
-    def _set_xrot_spinbox(self):
-        self.xrot_min = QtWidgets.QSpinBox()
-        self.xrot_min.setMinimum(0)
-        self.xrot_min.setMaximum(360)
-        self.xrot_min.setMinimumWidth(100)
-        self.xrot_min.setSingleStep(10)
-        self.xrot_max = QtWidgets.QSpinBox()
-        self.xrot_max.setMinimum(0)
-        self.xrot_max.setMaximum(360)
-        self.xrot_max.setValue(360)
-        self.xrot_max.setMinimumWidth(100)
-        self.xrot_max.setSingleStep(10)
-
-    def _create_yrot_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.y_min_lbl = QtWidgets.QLabel("Y Rotation Variation Minimum")
-        self.y_max_lbl = QtWidgets.QLabel("Y Rotation Variation Maximum")
-        self._set_yrot_spinbox()
-        layout.addWidget(self.y_min_lbl, 3, 0)
-        layout.addWidget(self.yrot_min, 4, 0)
-        layout.addWidget(self.y_max_lbl, 3, 1)
-        layout.addWidget(self.yrot_max, 4, 1)
-        return layout
-
-    def _set_yrot_spinbox(self):
-        self.yrot_min = QtWidgets.QSpinBox()
-        self.yrot_min.setMinimum(0)
-        self.yrot_min.setMaximum(360)
-        self.yrot_min.setMinimumWidth(100)
-        self.yrot_min.setSingleStep(10)
-        self.yrot_max = QtWidgets.QSpinBox()
-        self.yrot_max.setMinimum(0)
-        self.yrot_max.setMaximum(360)
-        self.yrot_max.setValue(360)
-        self.yrot_max.setMinimumWidth(100)
-        self.yrot_max.setSingleStep(10)
-
-    def _create_zrot_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.z_min_lbl = QtWidgets.QLabel("Z Rotation Variation Minimum")
-        self.z_max_lbl = QtWidgets.QLabel("Z Rotation Variation Maximum")
-        self._set_zrot_spinbox()
-        layout.addWidget(self.z_min_lbl, 5, 0)
-        layout.addWidget(self.zrot_min, 6, 0)
-        layout.addWidget(self.z_max_lbl, 5, 1)
-        layout.addWidget(self.zrot_max, 6, 1)
-        return layout
-
-    def _set_zrot_spinbox(self):
-        self.zrot_min = QtWidgets.QSpinBox()
-        self.zrot_min.setMinimum(0)
-        self.zrot_min.setMaximum(360)
-        self.zrot_min.setMinimumWidth(100)
-        self.zrot_min.setSingleStep(10)
-        self.zrot_max = QtWidgets.QSpinBox()
-        self.zrot_max.setMinimum(0)
-        self.zrot_max.setMaximum(360)
-        self.zrot_max.setValue(360)
-        self.zrot_max.setMinimumWidth(100)
-        self.zrot_max.setSingleStep(10)
-
-    def _create_xscale_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.scale_xmin_lbl = QtWidgets.QLabel("Scale X Variation Minimum")
-        self.scale_xmax_lbl = QtWidgets.QLabel("Scale X Variation Maximum")
-        self._set_xscale_spinbox()
-        layout.addWidget(self.scale_xmin_lbl, 7, 0)
-        layout.addWidget(self.scale_xmin, 8, 0)
-        layout.addWidget(self.scale_xmax_lbl, 7, 1)
-        layout.addWidget(self.scale_xmax, 8, 1)
-        return layout
-
-    def _create_yscale_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.scale_ymin_lbl = QtWidgets.QLabel("Scale Y Variation Minimum")
-        self.scale_ymax_lbl = QtWidgets.QLabel("Scale Y Variation Maximum")
-        self._set_yscale_spinbox()
-        layout.addWidget(self.scale_ymin_lbl, 9, 0)
-        layout.addWidget(self.scale_ymin, 10, 0)
-        layout.addWidget(self.scale_ymax_lbl, 9, 1)
-        layout.addWidget(self.scale_ymax, 10, 1)
-        return layout
-
-    def _create_zscale_rand_field_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.scale_zmin_lbl = QtWidgets.QLabel("Scale Z Variation Minimum")
-        self.scale_zmax_lbl = QtWidgets.QLabel("Scale Z Variation Maximum")
-        self._set_zscale_spinbox()
-        layout.addWidget(self.scale_zmin_lbl, 11, 0)
-        layout.addWidget(self.scale_zmin, 12, 0)
-        layout.addWidget(self.scale_zmax_lbl, 11, 1)
-        layout.addWidget(self.scale_zmax, 12, 1)
-        return layout
-
-    def _set_xscale_spinbox(self):
-        self.scale_xmin = QtWidgets.QDoubleSpinBox()
-        self.scale_xmin.setMinimum(0.1)
-        self.scale_xmin.setValue(1.0)
-        self.scale_xmin.setMaximum(10)
-        self.scale_xmin.setMinimumWidth(100)
-        self.scale_xmin.setSingleStep(.1)
-        self.scale_xmax = QtWidgets.QDoubleSpinBox()
-        self.scale_xmax.setMinimum(0.1)
-        self.scale_xmax.setValue(1.0)
-        self.scale_xmax.setMaximum(10)
-        self.scale_xmax.setMinimumWidth(100)
-        self.scale_xmax.setSingleStep(.1)
-
-    def _set_yscale_spinbox(self):
-        self.scale_ymin = QtWidgets.QDoubleSpinBox()
-        self.scale_ymin.setMinimum(0.1)
-        self.scale_ymin.setValue(1.0)
-        self.scale_ymin.setMaximum(10)
-        self.scale_ymin.setMinimumWidth(100)
-        self.scale_ymin.setSingleStep(.1)
-        self.scale_ymax = QtWidgets.QDoubleSpinBox()
-        self.scale_ymax.setMinimum(0.1)
-        self.scale_ymax.setValue(1.0)
-        self.scale_ymax.setMaximum(10)
-        self.scale_ymax.setMinimumWidth(100)
-        self.scale_ymax.setSingleStep(.1)
-
-    def _set_zscale_spinbox(self):
-        self.scale_zmin = QtWidgets.QDoubleSpinBox()
-        self.scale_zmin.setMinimum(0.1)
-        self.scale_zmin.setValue(1.0)
-        self.scale_zmin.setMaximum(10)
-        self.scale_zmin.setMinimumWidth(100)
-        self.scale_zmin.setSingleStep(.1)
-        self.scale_zmax = QtWidgets.QDoubleSpinBox()
-        self.scale_zmax.setMinimum(0.1)
-        self.scale_zmax.setValue(1.0)
-        self.scale_zmax.setMaximum(10)
-        self.scale_zmax.setMinimumWidth(100)
-        self.scale_zmax.setSingleStep(.1)
-
-    def _create_selected_vert_percentage_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.selected_vert_lbl = QtWidgets.QLabel("Target Vertices Random "
-                                                  "Scatter Percentage")
-        self.obj_embed_offset_lbl = QtWidgets.QLabel("Scatter Object Embed "
-                                                     "Position Offset")
-        self._set_selected_vert_percentage_spinbox()
-        self._create_y_position_offset_spinbox()
-        layout.addWidget(self.selected_vert_lbl, 14, 0)
-        layout.addWidget(self.obj_embed_offset_lbl, 14, 1)
-        layout.addWidget(self.selected_vert_perc, 15, 0)
-        layout.addWidget(self.obj_embed_offset, 15, 1)
-        return layout
-
-    def _create_y_position_offset_spinbox(self):
-        self.obj_embed_offset = QtWidgets.QDoubleSpinBox()
-        self.obj_embed_offset.setMinimum(-10)
-        self.obj_embed_offset.setValue(0)
-        self.obj_embed_offset.setMaximum(10)
-        self.obj_embed_offset.setMinimumWidth(100)
-        self.obj_embed_offset.setSingleStep(.1)
-
-    def _set_selected_vert_percentage_spinbox(self):
-        self.selected_vert_perc = QtWidgets.QSpinBox()
-        self.selected_vert_perc.setMinimum(0)
-        self.selected_vert_perc.setMaximum(100)
-        self.selected_vert_perc.setValue(100)
-        self.selected_vert_perc.setMinimumWidth(100)
-        self.selected_vert_perc.setSingleStep(5)
-
-    def _create_bottom_buttons_ui(self):
-        layout = QtWidgets.QGridLayout()
-        self.scatter_btn = QtWidgets.QPushButton("Scatter")
-        self.reset_btn = QtWidgets.QPushButton("Reset")
-        layout.addWidget(self.scatter_btn, 16, 0)
-        layout.addWidget(self.reset_btn, 16, 1)
-        return layout
-
-    def _create_scatter_field_headers(self):
-        self.scatter_targ_lbl = QtWidgets.QLabel("Object Being Scattered")
-        self.scatter_targ_lbl.setStyleSheet("font: bold")
-        self.scatter_obj_lbl = QtWidgets.QLabel("Scatter Destination Object")
-        self.scatter_obj_lbl.setStyleSheet("font: bold")
-        layout = QtWidgets.QGridLayout()
-        layout.addWidget(self.scatter_targ_lbl, 0, 0)
-        layout.addWidget(self.scatter_obj_lbl, 0, 3)
-        return layout
-
-    def _set_scatterobject_properties_from_ui(self):
-        self.scatterobject.scatter_x_min = self.xrot_min.value()
-        self.scatterobject.scatter_x_max = self.xrot_max.value()
-        self.scatterobject.scatter_y_min = self.yrot_min.value()
-        self.scatterobject.scatter_y_max = self.yrot_max.value()
-        self.scatterobject.scatter_z_min = self.zrot_min.value()
-        self.scatterobject.scatter_z_max = self.zrot_max.value()
-        self.scatterobject.scatter_scale_xmin = self.scale_xmin.value()
-        self.scatterobject.scatter_scale_xmax = self.scale_xmax.value()
-        self.scatterobject.scatter_scale_ymin = self.scale_ymin.value()
-        self.scatterobject.scatter_scale_ymax = self.scale_ymax.value()
-        self.scatterobject.scatter_scale_zmin = self.scale_zmin.value()
-        self.scatterobject.scatter_scale_zmax = self.scale_zmax.value()
-        self.scatterobject.scatter_percentage = self.selected_vert_perc.value()
-        self.scatterobject.obj_pos_offset = self.obj_embed_offset.value()
-
-    def _set_selected_scatter_object(self):
-        self.scatterobject.select_scatter_object()
-        self.scatter_obj.setText(self.scatterobject.current_object_def)
-
-    def _set_selected_scatter_target(self):
-        self.scatterobject.select_target_object()
-        self.scatter_targ.setText(str(self.scatterobject.current_target_def))
-
-    def _reset_scatterobject_properties_from_ui(self):
-        self._reset_scatter_scale_and_rotation_from_ui()
-        self.align_to_normals.setChecked(False)
-        self.align_to_normals_and_rotation.setChecked(False)
-        self.scatterobject.form_of_scatter = 0
-        self.scatterobject.scatter_percentage = \
-            self.selected_vert_perc.setValue(100)
-        self.scatterobject.scatter_obj_def = self.scatter_obj.setText("")
-        self.scatterobject.scatter_target_def = self.scatter_targ.setText("")
-        self.scatterobject.obj_pos_offset = self.obj_embed_offset.setValue(0)
-
-    def _reset_scatter_scale_and_rotation_from_ui(self):
-        self.scatterobject.scatter_x_min = self.xrot_min.setValue(0)
-        self.scatterobject.scatter_x_max = self.xrot_max.setValue(360)
-        self.scatterobject.scatter_y_min = self.yrot_min.setValue(0)
-        self.scatterobject.scatter_y_max = self.yrot_max.setValue(360)
-        self.scatterobject.scatter_z_min = self.zrot_min.setValue(0)
-        self.scatterobject.scatter_z_max = self.zrot_max.setValue(360)
-        self.scatterobject.scatter_scale_xmin = self.scale_xmin.setValue(1.0)
-        self.scatterobject.scatter_scale_xmax = self.scale_xmax.setValue(1.0)
-        self.scatterobject.scatter_scale_ymin = self.scale_ymin.setValue(1.0)
-        self.scatterobject.scatter_scale_ymax = self.scale_ymax.setValue(1.0)
-        self.scatterobject.scatter_scale_zmin = self.scale_zmin.setValue(1.0)
-        self.scatterobject.scatter_scale_zmax = self.scale_zmax.setValue(1.0)
+TIME_SLICE = 0.1
+CURVE_SAMPLES = 200
+
+
+def ScatterUI():
+    """Returns the tool's dialog, building it on the first call only
+
+    Qt is imported here rather than with this module. The dialog and
+    its ScatterObject persist between calls, so a shelf button running
+    ScatterUI().show() raises the open dialog instead of stacking a new
+    one.
+    """
+    import scatter_ui
+    return scatter_ui.dialog()
+
+
+def read_mesh_data(mesh, triangles=False, colors=False, uvs=False):
+    """Reads world space vertex positions and normals of a mesh at once
+
+    With triangles=True the triangulation is read as well, with
+    colors=True the current color set and with uvs=True the first UV of
+    each vertex in the current UV set, when the mesh has them.
+    """
+    selection = om.MSelectionList()
+    selection.add(mesh)
+    dag_path = selection.getDagPath(0)
+    if dag_path.hasFn(om.MFn.kTransform):
+        dag_path.extendToShape()
+    mesh_fn = om.MFnMesh(dag_path)
+    positions = np.array(mesh_fn.getPoints(om.MSpace.kWorld))[:, :3]
+    normals = np.array(mesh_fn.getVertexNormals(False, om.MSpace.kWorld))
+    triangle_vertices = None
+    if triangles:
+        triangle_vertices = np.array(mesh_fn.getTriangles()[1])
+    vertex_colors = None
+    if colors and mesh_fn.numColorSets > 0:
+        vertex_colors = np.array(mesh_fn.getVertexColors())
+    vertex_uvs = None
+    if uvs and mesh_fn.numUVs() > 0:
+        vertex_uvs = read_vertex_uvs(mesh_fn, len(positions))
+    return scatter_mesh.MeshData(mesh, positions, normals, triangle_vertices,
+                                 vertex_colors, vertex_uvs)
+
+
+def camera_view(camera):
+    """Returns the CameraView of a camera at the render resolution"""
+    selection = om.MSelectionList()
+    selection.add(camera)
+    dag_path = selection.getDagPath(0)
+    if dag_path.hasFn(om.MFn.kTransform):
+        dag_path.extendToShape()
+    camera_fn = om.MFnCamera(dag_path)
+    horizontal_fov, vertical_fov = camera_fn.getPortFieldOfView(
+        cmds.getAttr("defaultResolution.width"),
+        cmds.getAttr("defaultResolution.height"))
+    return scatter_culling.CameraView(
+        list(dag_path.inclusiveMatrix()), np.degrees(horizontal_fov),
+        np.degrees(vertical_fov), camera_fn.nearClippingPlane,
+        camera_fn.farClippingPlane)
+
+
+def curve_points(curve, samples=CURVE_SAMPLES):
+    """Returns world space points along a NURBS curve as an (n, 3) array
+
+    Linear curves return their CVs, other curves are sampled evenly in
+    parameter.
+    """
+    selection = om.MSelectionList()
+    selection.add(curve)
+    dag_path = selection.getDagPath(0)
+    if dag_path.hasFn(om.MFn.kTransform):
+        dag_path.extendToShape()
+    curve_fn = om.MFnNurbsCurve(dag_path)
+    if curve_fn.degree == 1:
+        return np.array(curve_fn.cvPositions(om.MSpace.kWorld))[:, :3]
+    start, end = curve_fn.knotDomain
+    return np.array([curve_fn.getPointAtParam(param, om.MSpace.kWorld)
+                     for param in np.linspace(start, end, samples)])[:, :3]
+
+
+def read_vertex_uvs(mesh_fn, vertex_count):
+    """Returns one UV per vertex from the face vertex UV assignments"""
+    us, vs = mesh_fn.getUVs()
+    uv_ids = np.array(mesh_fn.getAssignedUVs()[1])
+    face_vertices = np.array(mesh_fn.getVertices()[1])
+    if len(uv_ids) != len(face_vertices):
+        return None
+    uvs = np.zeros((vertex_count, 2))
+    uvs[face_vertices, 0] = np.array(us)[uv_ids]
+    uvs[face_vertices, 1] = np.array(vs)[uv_ids]
+    return uvs
+
+
+def _is_set(event):
+    return event is not None and event.is_set()
 
 
 class ScatterObject(object):
@@ -419,6 +124,43 @@ class ScatterObject(object):
         self.current_target_def = None
         self.form_of_scatter = 0
         self.obj_pos_offset = 0
+        self.seed = None
+        self.target_mesh_data = {}
+        self.aim_axis = scatter_layout.X_AXIS
+        self.up_axis = scatter_layout.Y_AXIS
+        self.select_sampled_vertices = False
+        self.output_mode = 0
+        self.sample_mode = 0
+        self.surface_point_count = 1000
+        self.projection_curve = None
+        self.projection_width = 0.0
+        self.sample_positions = None
+        self.sample_normals = None
+        self.sample_key = None
+        self.min_spacing = 0
+        self.spacing_uses_scale = False
+        self.layout_cache = scatter_core.LayoutCache()
+        self.preview_pool = None
+        self.keep_partial_on_cancel = False
+        self.layout_thread = None
+        self.last_layout = None
+        self.last_settings = None
+        self.slope_range = None
+        self.height_range = None
+        self.color_channel = None
+        self.density_map = None
+        self.prototype_weights = []
+        self.cull_camera = None
+        self.frustum_padding = 0.1
+        self.thin_distance = 0.0
+        self.bind_to_target = False
+        self.sample_binding = None
+        self.bound_group = None
+        self.bound_layout = None
+        self.bound_settings = None
+        self.follow_callback = None
+        self.stats = scatter_stats.ScatterStats(
+            (sys.modules[__name__], scatter_commit))
 
     def _init_scatter_fields_assignment(self):
         self.scatter_x_min = 0
@@ -435,126 +177,573 @@ class ScatterObject(object):
         self.scatter_scale_zmax = 0
         self.scatter_percentage = 0
 
+    def scatter_settings(self):
+        """Returns the current fields as Maya independent ScatterSettings"""
+        settings = scatter_core.ScatterSettings()
+        settings.rotation_range = self._rotation_range()
+        settings.scale_range = self._scale_range()
+        settings.embed_offset = self.obj_pos_offset
+        settings.form_of_scatter = self.form_of_scatter
+        settings.aim_axis = self.aim_axis
+        settings.up_axis = self.up_axis
+        settings.percentage = self.scatter_percentage
+        settings.sample_mode = self.sample_mode
+        settings.surface_point_count = self.surface_point_count
+        if self.projection_curve:
+            settings.projection_path = tuple(
+                map(tuple, curve_points(self.projection_curve).tolist()))
+        settings.projection_width = self.projection_width
+        settings.min_spacing = self.min_spacing
+        settings.spacing_uses_scale = self.spacing_uses_scale
+        settings.slope_range = self.slope_range
+        settings.height_range = self.height_range
+        settings.color_channel = self.color_channel
+        settings.density_map = self.density_map
+        settings.prototype_weights = self._prototype_weights()
+        if self.cull_camera:
+            settings.camera_view = camera_view(self.cull_camera).to_dict()
+        settings.frustum_padding = self.frustum_padding
+        settings.thin_distance = self.thin_distance
+        settings.seed = self.seed
+        return settings
+
     def scatter_check(self):
-        if self.scatter_x_min > self.scatter_x_max or \
-                self.scatter_y_min > self.scatter_y_max or \
-                self.scatter_z_min > self.scatter_z_max or \
-                self.scatter_scale_xmin > self.scatter_scale_xmax or \
-                self.scatter_scale_ymin > self.scatter_scale_ymax or \
-                self.scatter_scale_zmin > self.scatter_scale_zmax:
-            log.warning("Minimum value(s) greater than maximum value(s). "
-                        "This is not valid. Resubmit values correctly.")
+        problem = scatter_core.check_settings(self.scatter_settings())
+        if problem is not None:
+            log.warning(problem)
         else:
-            if self.scatter_percentage == 0:
-                log.warning("Percentage set to 0, no vertices randomly "
-                            "selected. Specify a higher percentage.")
-            else:
+            with self.stats.run():
                 self.scatter_check_internal_align_check()
 
     def scatter_check_internal_align_check(self):
-        if self.form_of_scatter == 0:
-            self.random_scatter_vertices()
-            self.scatter_object()
-        elif self.form_of_scatter == 1:
-            self.random_scatter_vertices()
-            self.scatter_object_align_normals()
-        elif self.form_of_scatter == 2:
-            self.random_scatter_vertices()
-            self.scatter_object_align_normals_and_rand_rotation()
-
-    def scatter_object(self):
-        object_grouping = cmds.group(empty=True, name="instance_group#")
-        for target in self.percentage_selection:
-            self.scatterObject = cmds.instance(self.current_object_def,
-                                               name=self.current_object_def
-                                               + "_instance#")
-            cmds.parent(self.scatterObject, object_grouping)
-            x_point, y_point, z_point = cmds.pointPosition(target)
-            cmds.move(x_point, y_point, z_point, self.scatterObject)
-            self.create_scale_scatter_randomization()
-            self.offset_scatter_object_embed_pos_without_constraint()
-            self.create_rotation_scatter_randomization()
-
-    def scatter_object_align_normals(self):
-        object_grouping = cmds.group(empty=True, name="instance_group#")
-        for target in self.percentage_selection:
-            self.scatterObject = cmds.instance(self.current_object_def,
-                                               name=self.current_object_def
-                                               + "_instance#")
-            cmds.parent(self.scatterObject, object_grouping)
-            x_point, y_point, z_point = cmds.pointPosition(target)
-            cmds.move(x_point, y_point, z_point, self.scatterObject)
-            self.create_scale_scatter_randomization()
-            constraint = cmds.normalConstraint(self.scatter_target_def,
-                                               self.scatterObject)
-            cmds.delete(constraint)
-            self.offset_scatter_object_embed_pos()
-
-    def scatter_object_align_normals_and_rand_rotation(self):
-        object_grouping = cmds.group(empty=True, name="instance_group#")
-        for target in self.percentage_selection:
-            self.scatterObject = cmds.instance(self.current_object_def,
-                                               name=self.current_object_def
-                                               + "_instance#")
-            cmds.parent(self.scatterObject, object_grouping)
-            x_point, y_point, z_point = cmds.pointPosition(target)
-            cmds.move(x_point, y_point, z_point, self.scatterObject)
-            self.create_scale_scatter_randomization()
-            constraint = cmds.normalConstraint(self.scatter_target_def,
-                                               self.scatterObject)
-            cmds.delete(constraint)
-            self.offset_scatter_object_embed_pos()
-            self.create_rotation_scatter_randomization()
-
-    def offset_scatter_object_embed_pos(self):
-        cmds.move(self.obj_pos_offset, 0, 0, self.scatterObject,
-                  objectSpace=True, relative=True)
-
-    def offset_scatter_object_embed_pos_without_constraint(self):
-        cmds.move(0, self.obj_pos_offset, 0, self.scatterObject,
-                  objectSpace=True, relative=True)
+        if self.form_of_scatter in (0, 1, 2):
+            settings = self.scatter_settings()
+            self.sample_target_points(settings)
+            if len(self.sample_positions) == 0:
+                log.warning("No scatter points could be sampled on the "
+                            "scatter destination object.")
+            else:
+                self.apply_layout(self.create_layout(settings))
+
+    def sample_target_points(self, settings):
+        """Samples the positions and normals instances are placed on
+
+        The target meshes are read first so placement masks can drop
+        vertices before any sampling. With bind_to_target set the source
+        vertices of the points are kept in sample_binding. Points of a
+        seeded run are reused while the sampling settings and the target
+        as read, in world space, stay the same, so changing only
+        rotations, scales or the embed offset skips sampling. Moving,
+        deforming or editing the target samples it again.
+        """
+        self.read_sample_target(settings)
+        key = self._sample_key(settings)
+        if key is None or key != self.sample_key:
+            self.compute_sample_points(settings, key)
+            self.select_sample_vertices()
+        self.stats.count("points sampled", len(self.sample_positions))
+
+    def read_sample_target(self, settings):
+        """Reads everything sampling needs from the scene
+
+        Runs on the main thread so compute_sample_points can run on a
+        worker thread without touching Maya.
+        """
+        self.read_target_meshes(
+            triangles=settings.sample_mode != scatter_core.VERTEX_SAMPLING,
+            settings=settings)
+        if settings.density_map:
+            # Images are read through MImage, keep that on the main thread
+            with self.stats.phase("read_meshes"):
+                scatter_masks.load_density_map(settings.density_map)
+
+    def compute_sample_points(self, settings, key=None, cancel=None):
+        """Samples points on the meshes read by read_sample_target
+
+        Only uses NumPy, so it is safe to run off the main thread. key is
+        kept as sample_key once the points are sampled. The points are
+        only stored once sampling is done, and dropped when the cancel
+        event is set by then, leaving the previous points untouched.
+        """
+        selection = None
+        try:
+            if settings.sample_mode == scatter_core.SURFACE_SAMPLING:
+                with self.stats.phase("sample_surface"):
+                    positions, normals, binding = \
+                        scatter_core.sample_bound_surface(
+                            self.target_mesh_data, self.scatter_target_def,
+                            settings)
+            elif settings.sample_mode == scatter_core.PROJECTED_SAMPLING:
+                with self.stats.phase("project"):
+                    positions, normals, binding = \
+                        scatter_core.sample_projected(
+                            self.target_mesh_data, self.scatter_target_def,
+                            settings)
+            else:
+                selection = self.random_scatter_vertices(settings)
+                with self.stats.phase("gather_points"):
+                    positions, normals = scatter_core.vertex_points(
+                        self.target_mesh_data, selection)
+                    binding = scatter_binding.vertex_binding(selection)
+            if _is_set(cancel):
+                return
+            with self.stats.phase("cull"):
+                keep = scatter_core.cull_mask(positions, settings)
+                if keep is not None:
+                    positions = positions[keep]
+                    normals = normals[keep]
+                    binding = binding.subset(keep)
+        except ValueError as error:
+            log.warning(error)
+            positions = np.empty((0, 3))
+            normals = np.empty((0, 3))
+            binding = None
+            key = None
+        if _is_set(cancel):
+            return
+        self.percentage_selection = selection
+        self.sample_positions = positions
+        self.sample_normals = normals
+        self.sample_binding = binding if self.bind_to_target else None
+        self.sample_key = key
+
+    def select_sample_vertices(self):
+        """Selects the sampled vertices when select_sampled_vertices is set"""
+        if self.select_sampled_vertices and \
+                self.percentage_selection is not None:
+            cmds.select(self.percentage_selection.component_names())
+
+    def _sample_key(self, settings):
+        """Returns what sampled points depend on, None if never reused
+
+        The target meshes are hashed as read_sample_target read them, so
+        transform, deformer and vertex color edits all change the key.
+        """
+        key = scatter_core.sampling_key(settings)
+        if key is None or not self.scatter_target_def:
+            return None
+        with self.stats.phase("sample_key"):
+            target = tuple(
+                (mesh, indices.tobytes(), self.target_mesh_data[mesh].digest())
+                for mesh, indices in self.scatter_target_def)
+        density_map = None
+        if settings.density_map and os.path.exists(settings.density_map):
+            density_map = os.path.getmtime(settings.density_map)
+        return key + (target, density_map, self.bind_to_target)
+
+    def create_layout(self, settings, cancel=None):
+        """Computes the transforms of every instance before scene edits
+
+        Returns None without keeping the layout when the cancel event is
+        set before or while it is computed.
+        """
+        if _is_set(cancel):
+            return None
+        with self.stats.phase("layout"):
+            layout = scatter_core.create_layout(self.sample_positions,
+                                                self.sample_normals, settings,
+                                                self.layout_cache,
+                                                self.sample_binding)
+        if _is_set(cancel):
+            return None
+        self.last_layout = layout
+        self.last_settings = settings
+        return layout
+
+    def apply_layout(self, layout):
+        """Writes a layout to the scene in one undo step"""
+        self.stats.count("instances committed", len(layout))
+        with self.stats.phase("commit"):
+            if self.output_mode == 1:
+                return scatter_commit.commit_point_instancer(
+                    self.scatter_obj_def, layout)
+            group = scatter_commit.commit_layout(self.scatter_obj_def, layout)
+        self._bind_instances(group, layout)
+        return group
+
+    def scatter_steps(self):
+        """Runs a scatter in time slices, yielding progress from 0 to 1
+
+        The target is read first, then the points are sampled and the
+        layout computed on a background thread while this yields. Instances
+        are committed in batches sized to take about TIME_SLICE seconds
+        each. Batches are created with undo turned off, so no undo chunk
+        stays open while Maya handles events between slices, and the
+        finished group is then made one undo step. Closing the generator
+        early cancels the scatter and deletes the partial instance group
+        unless keep_partial_on_cancel is set. A background thread still
+        running then is told to drop its result, layout_busy stays True
+        until it exits and no new scatter should start before that.
+        """
+        return self.stats.steps(self._scatter_steps())
+
+    def layout_busy(self):
+        """Returns whether a layout thread of a scatter is still running"""
+        return self.layout_thread is not None and \
+            self.layout_thread.is_alive()
+
+    def _scatter_steps(self):
+        settings = self.scatter_settings()
+        problem = scatter_core.check_settings(settings)
+        if problem is not None:
+            log.warning(problem)
+            return
+        self.read_sample_target(settings)
+        key = self._sample_key(settings)
+        resample = key is None or key != self.sample_key
+        yield 0.0
+        result = {}
+        cancel = threading.Event()
+        self.layout_thread = threading.Thread(
+            target=self._create_layout_in_background,
+            args=(settings, key, resample, cancel, result))
+        self.layout_thread.daemon = True
+        self.layout_thread.start()
+        try:
+            while self.layout_thread.is_alive():
+                self.layout_thread.join(0.02)
+                yield 0.0
+        finally:
+            # Only matters when the generator is closed while the thread
+            # runs, the thread then stops at its next check
+            cancel.set()
+        if "error" in result:
+            raise result["error"]
+        if resample:
+            self.select_sample_vertices()
+        layout = result.get("layout")
+        if layout is None:
+            log.warning("No scatter points could be sampled on the "
+                        "scatter destination object.")
+            return
+        if self.output_mode == 1:
+            self.apply_layout(layout)
+            yield 1.0
+            return
+        for progress in self._commit_in_slices(layout):
+            yield progress
+
+    def _create_layout_in_background(self, settings, key, resample, cancel,
+                                     result):
+        try:
+            if resample:
+                self.compute_sample_points(settings, key, cancel)
+            if _is_set(cancel):
+                return
+            self.stats.count("points sampled", len(self.sample_positions))
+            if len(self.sample_positions):
+                result["layout"] = self.create_layout(settings, cancel)
+        except Exception as error:
+            result["error"] = error
+
+    def _commit_in_slices(self, layout):
+        names = scatter_commit.layout_instance_names(self.scatter_obj_def,
+                                                     layout)
+        group = None
+        committed = 0
+        batch_size = 100
+        finished = False
+        try:
+            while committed < len(layout):
+                if group is not None and not cmds.objExists(group):
+                    log.warning("The instance group was removed while "
+                                "scattering, stopping the scatter.")
+                    return
+                start_time = time.time()
+                end = min(committed + batch_size, len(layout))
+                with self.stats.phase("commit"):
+                    group = scatter_commit.commit_layout(
+                        self.scatter_obj_def,
+                        layout.subset(slice(committed, end)), group,
+                        names[committed:end], undoable=False)
+                self.stats.count("instances committed", end - committed)
+                elapsed = max(time.time() - start_time, 1e-3)
+                batch_size = max(1, int((end - committed)
+                                        * TIME_SLICE / elapsed))
+                committed = end
+                yield committed / float(len(layout))
+            finished = True
+            scatter_commit.own_group(group)
+            self._bind_instances(group, layout)
+        finally:
+            if not finished and group is not None and \
+                    cmds.objExists(group):
+                if self.keep_partial_on_cancel:
+                    scatter_commit.own_group(group)
+                else:
+                    # Its creation was never recorded, nor is its removal
+                    with scatter_commit.scene_edit(undoable=False):
+                        cmds.delete(group)
+
+    def _bind_instances(self, group, layout):
+        """Remembers a committed group so it can follow its target"""
+        if layout.binding is not None:
+            self.bound_group = group
+            self.bound_layout = layout
+            self.bound_settings = self.last_settings
+
+    def followed_layout(self):
+        """Returns the bound layout moved onto the target's current shape
+
+        Every bound mesh is read once as whole arrays, however many
+        instances sit on it.
+        """
+        binding = self.bound_layout.binding
+        with self.stats.phase("read_meshes"):
+            meshes = dict((mesh, read_mesh_data(mesh))
+                          for mesh in binding.meshes)
+        with self.stats.phase("follow"):
+            positions, normals = binding.evaluate(meshes)
+            return scatter_binding.follow_layout(
+                self.bound_layout, positions, normals, self.bound_settings)
+
+    def _bound_nodes(self):
+        """Returns the bound group's instances, or None if it changed"""
+        if self.bound_group is None or not cmds.objExists(self.bound_group):
+            log.warning("No bound scatter found. Scatter with Bind to "
+                        "Target enabled first.")
+            return None
+        nodes = scatter_commit.group_nodes(self.bound_group)
+        if len(nodes) != len(self.bound_layout):
+            log.warning("Instances of %s were added or deleted since they "
+                        "were bound. Scatter again to rebind them.",
+                        self.bound_group)
+            return None
+        return nodes
+
+    def update_bound_instances(self):
+        """Moves the bound instances onto the target at the current time"""
+        nodes = self._bound_nodes()
+        if nodes is None:
+            return False
+        try:
+            layout = self.followed_layout()
+        except ValueError as error:
+            log.warning(error)
+            return False
+        cmds.refresh(suspend=True)
+        try:
+            with self.stats.phase("update_instances"):
+                scatter_commit.set_transforms(nodes, layout)
+        finally:
+            cmds.refresh(suspend=False)
+        return True
+
+    def follow_time_changes(self, enabled):
+        """Updates the bound instances whenever the current time changes"""
+        if self.follow_callback is not None:
+            om.MMessage.removeCallback(self.follow_callback)
+            self.follow_callback = None
+        if enabled:
+            self.follow_callback = om.MDGMessage.addTimeChangeCallback(
+                self._time_changed)
+
+    def _time_changed(self, time, client_data):
+        if self.bound_group is not None:
+            self.update_bound_instances()
+
+    def bake_bound_instances(self, start, end, step=1):
+        """Keys the bound instances following the target over a range
+
+        The target is read once per frame, then all frames are written
+        as one curve per instance channel in a single undo step. Time
+        change following is stopped, the keys drive the instances now.
+        """
+        nodes = self._bound_nodes()
+        if nodes is None:
+            return None
+        frames = np.arange(start, end + step * 0.5, step).tolist()
+        if not frames:
+            log.warning("Bake end frame is before the start frame.")
+            return None
+        self.follow_time_changes(False)
+        current = cmds.currentTime(query=True)
+        translations, rotations, scales = [], [], []
+        try:
+            for frame in frames:
+                cmds.currentTime(frame, update=True)
+                layout = self.followed_layout()
+                translations.append(layout.translations())
+                rotations.append(layout.rotations)
+                scales.append(layout.scales)
+        except ValueError as error:
+            log.warning(error)
+            return None
+        finally:
+            cmds.currentTime(current, update=True)
+        with self.stats.phase("bake"):
+            return scatter_commit.bake_transforms(
+                nodes, frames, np.array(translations), np.array(rotations),
+                np.array(scales))
+
+    def update_preview(self):
+        """Pushes the current layout onto the live preview instances"""
+        settings = self.scatter_settings()
+        problem = scatter_core.check_settings(settings)
+        if problem is not None:
+            log.warning(problem)
+        else:
+            with self.stats.run():
+                self._update_preview(settings)
+
+    def _update_preview(self, settings):
+        self.sample_target_points(settings)
+        layout = self.create_layout(settings)
+        if self.preview_pool is None or \
+                self.preview_pool.prototypes != self.scatter_obj_def:
+            self.clear_preview()
+            self.preview_pool = scatter_commit.InstancePool(
+                self.scatter_obj_def)
+        with self.stats.phase("preview_update"):
+            self.preview_pool.update(layout)
+
+    def keep_preview(self):
+        """Leaves the preview instances in the scene as a finished scatter
+
+        With Bind to Target set the kept instances are bound like those of
+        a normal scatter, their layout reordered to match the group.
+        """
+        pool = self.preview_pool
+        self.preview_pool = None
+        if pool is None or not pool.exists() or self.last_layout is None:
+            return
+        if self.last_layout.binding is not None:
+            self._bind_instances(pool.group, self.last_layout.subset(
+                pool.child_order(self.last_layout)))
+
+    def clear_preview(self):
+        if self.preview_pool is not None:
+            self.preview_pool.delete()
+            self.preview_pool = None
+
+    def save_layout_file(self, path):
+        """Saves the last computed layout with its target and settings"""
+        if self.last_layout is None:
+            log.warning("No scatter layout has been computed yet. Scatter "
+                        "or preview first, then save the layout.")
+            return False
+        metadata = {"target": self.current_target_def,
+                    "prototypes": self.scatter_obj_def,
+                    "seed": self.last_settings.seed,
+                    "settings": self.last_settings.to_dict()}
+        scatter_io.save_layout(path, self.last_layout, metadata)
+        log.info("Saved %d scattered instances to %s", len(self.last_layout),
+                 path)
+        return True
+
+    def apply_layout_file(self, path):
+        """Writes a layout saved by scatter_io, e.g. from a batch job
+
+        Without an object being scattered selected, the prototypes
+        recorded in the file are used if they exist in the scene.
+        """
+        layout, metadata = scatter_io.load_layout(path)
+        if not self.scatter_obj_def:
+            prototypes = metadata.get("prototypes") or []
+            if not prototypes or not all(cmds.objExists(prototype)
+                                         for prototype in prototypes):
+                log.warning("Select an object being scattered to apply the "
+                            "layout in %s.", path)
+                return None
+            self.scatter_obj_def = prototypes
+            self.current_object_def = ", ".join(prototypes)
+        if len(layout) and \
+                layout.prototype_indices().max() >= len(self.scatter_obj_def):
+            log.warning("The layout in %s uses more objects being scattered "
+                        "than are selected.", path)
+            return None
+        return self.apply_layout(layout)
+
+    def read_target_meshes(self, triangles=False, settings=None):
+        """Reads every target mesh once into target_mesh_data
+
+        Vertex colors and UVs are only read when settings use them as
+        placement masks.
+        """
+        colors = settings is not None and settings.color_channel is not None
+        uvs = settings is not None and bool(settings.density_map)
+        self.target_mesh_data = {}
+        with self.stats.phase("read_meshes"):
+            for mesh, _ in self.scatter_target_def:
+                self.target_mesh_data[mesh] = read_mesh_data(
+                    mesh, triangles, colors, uvs)
+
+    def _rotation_range(self):
+        return ((self.scatter_x_min, self.scatter_y_min, self.scatter_z_min),
+                (self.scatter_x_max, self.scatter_y_max, self.scatter_z_max))
+
+    def _prototype_weights(self):
+        """Returns a weight per object being scattered, 1 if not given"""
+        count = max(len(self.scatter_obj_def or []), 1)
+        weights = list(self.prototype_weights[:count])
+        return tuple(weights + [1.0] * (count - len(weights)))
+
+    def _scale_range(self):
+        return ((self.scatter_scale_xmin, self.scatter_scale_ymin,
+                 self.scatter_scale_zmin),
+                (self.scatter_scale_xmax, self.scatter_scale_ymax,
+                 self.scatter_scale_zmax))
 
     def select_target_object(self):
-        selection = cmds.ls(os=True, fl=True)
-        self.scatter_target_def = cmds.polyListComponentConversion(
-            selection, toVertex=True)
-        self.scatter_target_def = cmds.filterExpand(self.scatter_target_def,
-                                                    selectionMask=31)
-        if self.scatter_target_def is None:
+        self.sample_key = None
+        with self.stats.phase("select_target"):
+            selection = cmds.ls(os=True)
+            components = cmds.polyListComponentConversion(
+                selection, toVertex=True) or []
+            self.scatter_target_def = scatter_mesh.parse_vertex_ranges(
+                components, self._vertex_count)
+        if len(self.scatter_target_def) == 0:
+            self.scatter_target_def = None
             self.current_target_def = ''
             log.warning("No object or vertices are currently selected for "
                         "scatter destination. Select one or more vertices, or "
                         "an object and then try again.")
         else:
-            self.current_target_def = self.scatter_target_def
-
-    def random_scatter_vertices(self):
-        random_amount = int(round(len(self.scatter_target_def)
-                                  * (self.scatter_percentage * 0.01)))
-        self.percentage_selection = random.sample(self.scatter_target_def,
-                                                  k=random_amount)
-        cmds.select(self.percentage_selection)
-
-    def create_rotation_scatter_randomization(self):
-        x_rot = random.uniform(self.scatter_x_min, self.scatter_x_max)
-        y_rot = random.uniform(self.scatter_y_min, self.scatter_y_max)
-        z_rot = random.uniform(self.scatter_z_min, self.scatter_z_max)
-        cmds.rotate(x_rot, y_rot, z_rot, self.scatterObject)
-
-    def create_scale_scatter_randomization(self):
-        scale_factor_x = random.uniform(self.scatter_scale_xmin,
-                                        self.scatter_scale_xmax)
-        scale_factor_y = random.uniform(self.scatter_scale_ymin,
-                                        self.scatter_scale_ymax)
-        scale_factor_z = random.uniform(self.scatter_scale_zmin,
-                                        self.scatter_scale_zmax)
-        cmds.scale(scale_factor_x, scale_factor_y, scale_factor_z,
-                   self.scatterObject)
+            self.current_target_def = ", ".join(
+                "%s (%d vertices)" % (mesh, len(indices))
+                for mesh, indices in self.scatter_target_def)
+
+    def random_scatter_vertices(self, settings):
+        with self.stats.phase("sample_vertices"):
+            selection = scatter_core.masked_selection(
+                self.target_mesh_data, self.scatter_target_def, settings)
+            return scatter_core.sample_vertices(selection, settings)
+
+    def _vertex_count(self, mesh):
+        return cmds.polyEvaluate(mesh, vertex=True)
+
+    def select_cull_camera(self):
+        """Uses the selected camera to cull points outside its view"""
+        selection = cmds.ls(os=True, o=True) or []
+        cameras = [node for node in selection
+                   if cmds.nodeType(node) == "camera" or
+                   cmds.listRelatives(node, shapes=True, type="camera")]
+        if cameras:
+            self.cull_camera = cameras[-1]
+        else:
+            self.cull_camera = None
+            log.warning("No camera is currently selected. Select a camera "
+                        "to cull scatter points outside its view.")
+
+    def select_projection_curve(self):
+        """Uses the selected curve as the outline points are projected from"""
+        selection = cmds.ls(os=True, o=True) or []
+        curves = [node for node in selection
+                  if cmds.nodeType(node) == "nurbsCurve" or
+                  cmds.listRelatives(node, shapes=True, type="nurbsCurve")]
+        if curves:
+            self.projection_curve = curves[-1]
+        else:
+            self.projection_curve = None
+            log.warning("No curve is currently selected. Select a curve "
+                        "outlining the region to project scatter points "
+                        "from.")
 
     def select_scatter_object(self):
+        """Uses every selected object as a prototype, in selection order"""
         self.scatter_obj_def = cmds.ls(os=True, o=True)
         if len(self.scatter_obj_def) > 0:
-            self.current_object_def = self.scatter_obj_def[-1]
+            self.current_object_def = ", ".join(self.scatter_obj_def)
         else:
             self.current_object_def = None
             log.warning("No objects are currently selected for object being"
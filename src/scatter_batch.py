@@ -0,0 +1,110 @@
+"""Command line scatter layout generation without Maya
+
+Usage: python scatter_batch.py job.json layout.sclayout
+
+The job spec is a JSON object with a "target" entry and any
+ScatterSettings fields, for example:
+
+    {"target": "ground.obj", "percentage": 25, "seed": 7,
+     "form_of_scatter": 1, "scale_range": [[0.5, 0.5, 0.5], [2, 2, 2]]}
+
+"target" is either an OBJ path or an object with "points" and "normals"
+given as .npy paths or nested lists, plus optional "colors", "uvs" and
+"name". A "density_map" setting must be a .npy path, and a
+"camera_view" setting is an object with a 16 value row major "matrix",
+"horizontal_fov" and "vertical_fov" in degrees, and "near" and "far". A
+"projection_path" setting is a list of [x, y, z] points. An
+optional "vertices" list restricts the scatter to those vertex indices,
+and an optional "prototypes" list names the Maya objects the layout is
+applied to when no object being scattered is chosen. Mixing several
+prototypes needs a matching "prototype_weights" list. A single
+"prototype" name, as older jobs give, is read as a one entry list.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import numpy as np
+import scatter_core
+import scatter_io
+import scatter_mesh
+log = logging.getLogger(__name__)
+
+
+def load_target(target, base_dir):
+    """Builds MeshData from the "target" entry of a job spec"""
+    if not isinstance(target, dict):
+        return scatter_mesh.read_obj(os.path.join(base_dir, target))
+    colors, uvs = [_load_array(target[key], base_dir) if key in target
+                   else None for key in ("colors", "uvs")]
+    return scatter_mesh.MeshData(target.get("name", "target"),
+                                 _load_array(target["points"], base_dir),
+                                 _load_array(target["normals"], base_dir),
+                                 colors=colors, uvs=uvs)
+
+
+def _load_array(value, base_dir):
+    if isinstance(value, list):
+        return np.array(value, dtype=np.float64)
+    return np.load(os.path.join(base_dir, value))
+
+
+def run_job(job, base_dir="."):
+    """Generates the layout for a job spec, returns (layout, metadata)"""
+    job = dict(job)
+    mesh_data = load_target(job.pop("target"), base_dir)
+    vertices = job.pop("vertices", None)
+    prototypes = job.pop("prototypes", None)
+    prototype = job.pop("prototype", None)
+    if prototypes is None and prototype:
+        prototypes = [prototype]
+    settings = scatter_core.ScatterSettings.from_dict(job)
+    if settings.density_map:
+        settings.density_map = os.path.join(base_dir, settings.density_map)
+    problem = scatter_core.check_settings(settings)
+    if problem is not None:
+        raise ValueError(problem)
+    if settings.sample_mode in (scatter_core.SURFACE_SAMPLING,
+                                scatter_core.PROJECTED_SAMPLING) and \
+            mesh_data.triangles is None:
+        raise ValueError("Surface and projected sampling need an OBJ target "
+                         "with faces.")
+    selection = scatter_core.whole_mesh_selection(mesh_data)
+    if vertices is not None:
+        vertices = np.unique(np.asarray(vertices, dtype=np.int64))
+        if len(vertices) and (vertices[0] < 0
+                              or vertices[-1] >= len(mesh_data)):
+            raise ValueError("vertex index out of range: the target has %d "
+                             "vertices." % len(mesh_data))
+        selection = scatter_mesh.VertexSelection([mesh_data.name],
+                                                 [vertices])
+    layout = scatter_core.generate_layout({mesh_data.name: mesh_data},
+                                          selection, settings)
+    metadata = {"target": mesh_data.name, "prototypes": prototypes,
+                "seed": settings.seed, "settings": settings.to_dict()}
+    return layout, metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate a scatter layout from a job spec.")
+    parser.add_argument("job", help="JSON job spec")
+    parser.add_argument("output", help="layout file to write")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    with open(args.job) as job_file:
+        job = json.load(job_file)
+    try:
+        layout, metadata = run_job(job, os.path.dirname(
+            os.path.abspath(args.job)))
+    except (ValueError, KeyError, IOError) as error:
+        log.error("Scatter job failed: %s", error)
+        return 1
+    scatter_io.save_layout(args.output, layout, metadata)
+    log.info("Wrote %d instances to %s", len(layout), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import numpy as np
+import scatter_layout
+
+
+class PointBinding(object):
+    """Source vertices and barycentric weights of every scattered point
+
+    mesh_ids index into meshes, vertex_ids holds the three vertices each
+    point is interpolated from and weights their (n, 3) barycentric
+    weights. Points sampled on vertices use their vertex three times
+    with weights (1, 0, 0).
+    """
+
+    def __init__(self, meshes, mesh_ids, vertex_ids, weights):
+        self.meshes = list(meshes)
+        self.mesh_ids = np.asarray(mesh_ids, dtype=np.int32)
+        self.vertex_ids = np.asarray(vertex_ids,
+                                     dtype=np.int32).reshape(-1, 3)
+        self.weights = np.asarray(weights, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.mesh_ids)
+
+    def subset(self, mask):
+        """Returns a binding holding only the entries selected by mask"""
+        return PointBinding(self.meshes, self.mesh_ids[mask],
+                            self.vertex_ids[mask], self.weights[mask])
+
+    def evaluate(self, meshes):
+        """Returns bound positions and unit normals on the given meshes
+
+        meshes maps the bound mesh names to MeshData of their current,
+        possibly deformed, shape. Raises ValueError when a mesh lost
+        vertices since the points were bound.
+        """
+        positions = np.empty((len(self), 3))
+        normals = np.empty((len(self), 3))
+        for index, mesh in enumerate(self.meshes):
+            picks = self.mesh_ids == index
+            corners = self.vertex_ids[picks]
+            if len(corners) and corners.max() >= len(meshes[mesh]):
+                raise ValueError("%s has fewer vertices than when the "
+                                 "instances were bound to it. Scatter "
+                                 "again to rebind them." % mesh)
+            positions[picks] = np.einsum(
+                "ij,ijk->ik", self.weights[picks],
+                meshes[mesh].positions[corners])
+            normals[picks] = np.einsum(
+                "ij,ijk->ik", self.weights[picks],
+                meshes[mesh].normals[corners])
+        lengths = np.linalg.norm(normals, axis=1)
+        return positions, normals / np.maximum(lengths, 1e-12)[:, None]
+
+
+def vertex_binding(selection):
+    """Returns the binding of the vertices of a VertexSelection
+
+    Entries are in the order vertex_points gathers the positions.
+    """
+    meshes = []
+    mesh_ids = []
+    vertex_ids = []
+    for index, (mesh, indices) in enumerate(selection):
+        meshes.append(mesh)
+        mesh_ids.append(np.full(len(indices), index, dtype=np.int32))
+        vertex_ids.append(np.repeat(indices[:, None], 3, axis=1))
+    count = sum(len(ids) for ids in mesh_ids)
+    weights = np.zeros((count, 3))
+    weights[:, 0] = 1.0
+    return PointBinding(meshes,
+                        np.concatenate(mesh_ids or [np.empty(0)]),
+                        np.concatenate(vertex_ids or [np.empty((0, 3))]),
+                        weights)
+
+
+def surface_binding(meshes, samplers, samples):
+    """Returns the binding of points drawn by sample_surface_barycentric
+
+    meshes names the mesh of each sampler and samples holds the
+    (triangle ids, barycentric weights) drawn from it.
+    """
+    mesh_ids = [np.full(len(triangle_ids), index, dtype=np.int32)
+                for index, (triangle_ids, _) in enumerate(samples)]
+    vertex_ids = [sampler.triangles[triangle_ids]
+                  for sampler, (triangle_ids, _) in zip(samplers, samples)]
+    weights = [weights for _, weights in samples]
+    return PointBinding(meshes,
+                        np.concatenate(mesh_ids or [np.empty(0)]),
+                        np.concatenate(vertex_ids or [np.empty((0, 3))]),
+                        np.concatenate(weights or [np.empty((0, 3))]))
+
+
+def follow_layout(layout, positions, normals, settings):
+    """Returns the layout moved onto new positions and normals
+
+    Random rotations, scales and prototype ids are kept. Normal aligned
+    rotations and embed offsets along the normals follow the new normals.
+    """
+    rotations = layout.rotations
+    if layout.form_of_scatter == 1:
+        rotations = scatter_layout.aligned_rotations(
+            normals, settings.aim_axis, settings.up_axis)
+    offsets = layout.offsets
+    if layout.form_of_scatter != 0:
+        offsets = settings.embed_offset * normals
+    return scatter_layout.ScatterLayout(
+        positions, rotations, layout.scales, offsets, layout.form_of_scatter,
+        layout.prototype_ids, layout.binding)
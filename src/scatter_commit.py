@@ -0,0 +1,509 @@
+import contextlib
+import os
+import re
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+
+PLUGIN_NAME = "scatter_commit"
+COMMAND_NAME = "scatterCommit"
+BAKE_COMMAND_NAME = "scatterBake"
+OWN_COMMAND_NAME = "scatterOwn"
+BAKE_CHANNELS = (("translate", "animCurveTL"), ("rotate", "animCurveTA"),
+                 ("scale", "animCurveTU"))
+pending_commits = []
+pending_bakes = []
+pending_owns = []
+
+
+def maya_useNewAPI():
+    """Tells Maya this plugin uses the Python API 2.0"""
+
+
+class CommitRequest(object):
+    """Prototypes, layout and node names handed to the commit command
+
+    The layout's prototype ids index into prototypes. With
+    existing_group set, instances are added under that group instead of
+    a new one named group_name.
+    """
+
+    def __init__(self, prototypes, layout, group_name, instance_names,
+                 existing_group=False):
+        self.prototypes = prototypes
+        self.layout = layout
+        self.group_name = group_name
+        self.instance_names = instance_names
+        self.existing_group = existing_group
+
+
+class ScatterCommitCommand(om.MPxCommand):
+    """Creates, parents and places all instances of a layout at once
+
+    Nodes are created through one MDagModifier so the whole scatter is a
+    single undo step.
+    """
+
+    def __init__(self):
+        super(ScatterCommitCommand, self).__init__()
+        self.request = None
+        self.modifier = None
+        self.instanced = []
+
+    @staticmethod
+    def creator():
+        return ScatterCommitCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        # Maya loads plugins as a separate module object, so the request
+        # queue is read from the regularly imported module.
+        import scatter_commit
+        self.request = scatter_commit.pending_commits.pop(0)
+        self.redoIt()
+
+    def redoIt(self):
+        request = self.request
+        self.modifier = om.MDagModifier()
+        if request.existing_group:
+            group = node_object(request.group_name)
+        else:
+            group = self.modifier.createNode("transform")
+            self.modifier.renameNode(group, request.group_name)
+        nodes = []
+        for name in request.instance_names:
+            node = self.modifier.createNode("transform", group)
+            self.modifier.renameNode(node, name)
+            nodes.append(node)
+        self.modifier.doIt()
+        self.instanced = []
+        prototype_ids = request.layout.prototype_indices()
+        for index, prototype in enumerate(request.prototypes):
+            self.instanced += instance_prototype(
+                prototype, [nodes[node] for node in
+                            np.flatnonzero(prototype_ids == index)])
+        set_transforms(nodes, request.layout)
+        self.setResult(om.MFnDependencyNode(group).name())
+
+    def undoIt(self):
+        for node, child in self.instanced:
+            om.MFnDagNode(node).removeChild(child)
+        self.instanced = []
+        self.modifier.undoIt()
+
+
+class BakeRequest(object):
+    """Instance nodes and their per frame transforms for the bake command
+
+    translations, rotations in degrees and scales are (frames, n, 3)
+    arrays, one row per frame and one column per node.
+    """
+
+    def __init__(self, nodes, frames, translations, rotations, scales):
+        self.nodes = nodes
+        self.frames = frames
+        self.translations = translations
+        self.rotations = rotations
+        self.scales = scales
+
+
+class ScatterBakeCommand(om.MPxCommand):
+    """Keys baked transforms onto instances with one curve per channel
+
+    Every channel gets a new animation curve holding all frames at once,
+    replacing curves already driving it. Curves are created and
+    connected through one MDGModifier so the bake is a single undo step.
+    """
+
+    def __init__(self):
+        super(ScatterBakeCommand, self).__init__()
+        self.request = None
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        return ScatterBakeCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        import scatter_commit
+        self.request = scatter_commit.pending_bakes.pop(0)
+        self.redoIt()
+
+    def redoIt(self):
+        # OpenMayaAnim is only needed here, not by sessions that never bake.
+        import maya.api.OpenMayaAnim as oma
+        request = self.request
+        self.modifier = om.MDGModifier()
+        channels = zip(BAKE_CHANNELS, (request.translations,
+                                       np.radians(request.rotations),
+                                       request.scales))
+        curves = []
+        node_fn = om.MFnDependencyNode()
+        for (attribute, curve_type), values in channels:
+            for axis_index, axis in enumerate("XYZ"):
+                for node_index, node in enumerate(request.nodes):
+                    node_fn.setObject(node)
+                    plug = node_fn.findPlug(attribute + axis, False)
+                    if plug.isDestination:
+                        source = plug.source()
+                        if source.node().hasFn(om.MFn.kAnimCurve):
+                            self.modifier.deleteNode(source.node())
+                        else:
+                            self.modifier.disconnect(source, plug)
+                    curve = self.modifier.createNode(curve_type)
+                    self.modifier.connect(om.MFnDependencyNode(
+                        curve).findPlug("output", False), plug)
+                    curves.append((curve, values[:, node_index, axis_index]))
+        self.modifier.doIt()
+        times = om.MTimeArray([om.MTime(frame, om.MTime.uiUnit())
+                               for frame in request.frames])
+        curve_fn = oma.MFnAnimCurve()
+        for curve, values in curves:
+            curve_fn.setObject(curve)
+            curve_fn.addKeys(times, values.tolist())
+        self.setResult(len(curves))
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+
+class ScatterOwnCommand(om.MPxCommand):
+    """Makes a group built with undo turned off a single undo step
+
+    The group already exists when the command runs, so doing it changes
+    nothing. Undoing deletes the group through an MDagModifier and
+    redoing undoes that deletion.
+    """
+
+    def __init__(self):
+        super(ScatterOwnCommand, self).__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        return ScatterOwnCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        import scatter_commit
+        group = node_object(scatter_commit.pending_owns.pop(0))
+        self.modifier = om.MDagModifier()
+        self.modifier.deleteNode(group)
+        self.setResult(om.MFnDependencyNode(group).name())
+
+    def redoIt(self):
+        self.modifier.undoIt()
+
+    def undoIt(self):
+        self.modifier.doIt()
+
+
+def initializePlugin(plugin):
+    plugin_fn = om.MFnPlugin(plugin)
+    plugin_fn.registerCommand(COMMAND_NAME, ScatterCommitCommand.creator)
+    plugin_fn.registerCommand(BAKE_COMMAND_NAME, ScatterBakeCommand.creator)
+    plugin_fn.registerCommand(OWN_COMMAND_NAME, ScatterOwnCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    plugin_fn = om.MFnPlugin(plugin)
+    plugin_fn.deregisterCommand(COMMAND_NAME)
+    plugin_fn.deregisterCommand(BAKE_COMMAND_NAME)
+    plugin_fn.deregisterCommand(OWN_COMMAND_NAME)
+
+
+def load_plugin():
+    """Loads this module as a Maya plugin if it is not loaded yet"""
+    if not cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):
+        path = os.path.splitext(os.path.abspath(__file__))[0] + ".py"
+        cmds.loadPlugin(path, quiet=True)
+
+
+def commit_layout(prototypes, layout, group=None, instance_names=None,
+                  undoable=True):
+    """Creates every instance of a layout as one undoable scene edit
+
+    prototypes is one object name or a list indexed by the layout's
+    prototype ids. Instances go into a new instance group unless an
+    existing group is given. Returns the name of the group. With
+    undoable False nothing is recorded for undo, so a group filled over
+    several calls can be made one undo step with own_group.
+    """
+    load_plugin()
+    prototypes = prototype_list(prototypes)
+    if instance_names is None:
+        instance_names = layout_instance_names(prototypes, layout)
+    pending_commits.append(CommitRequest(
+        prototypes, layout, group or unique_names("instance_group", 1)[0],
+        instance_names, group is not None))
+    with scene_edit(undoable):
+        return getattr(cmds, COMMAND_NAME)()
+
+
+def own_group(group):
+    """Makes a group committed with undoable False a single undo step
+
+    Returns the name of the group.
+    """
+    load_plugin()
+    pending_owns.append(group)
+    with scene_edit():
+        return getattr(cmds, OWN_COMMAND_NAME)()
+
+
+def bake_transforms(nodes, frames, translations, rotations, scales):
+    """Keys per frame transforms onto nodes as one undoable scene edit
+
+    translations, rotations in degrees and scales are (frames, n, 3)
+    arrays. Returns the number of animation curves created.
+    """
+    load_plugin()
+    pending_bakes.append(BakeRequest(nodes, frames, translations, rotations,
+                                     scales))
+    with scene_edit():
+        return getattr(cmds, BAKE_COMMAND_NAME)()
+
+
+class InstancePool(object):
+    """Instances of a live preview whose transforms are updated in place
+
+    Nodes are only created or deleted when the number of points of a
+    prototype changes, all other updates write transforms onto the
+    existing instances. Each prototype keeps its own nodes, all under
+    one group.
+    """
+
+    def __init__(self, prototypes):
+        self.prototypes = prototype_list(prototypes)
+        self.group = None
+        self.nodes = [[] for _ in self.prototypes]
+
+    def exists(self):
+        return self.group is not None and cmds.objExists(self.group) and \
+            all(node.isValid() for nodes in self.nodes for node in nodes)
+
+    def update(self, layout):
+        """Matches the pool to a layout, reusing existing instances"""
+        if not self.exists():
+            self.group = None
+            self.nodes = [[] for _ in self.prototypes]
+        prototype_ids = layout.prototype_indices()
+        added = []
+        cmds.refresh(suspend=True)
+        try:
+            for index, nodes in enumerate(self.nodes):
+                picks = np.flatnonzero(prototype_ids == index)
+                reused = min(len(nodes), len(picks))
+                if len(nodes) > reused:
+                    cmds.delete([om.MFnDagNode(node.object()).fullPathName()
+                                 for node in nodes[reused:]])
+                    del nodes[reused:]
+                set_transforms([node.object() for node in nodes],
+                               layout.subset(picks[:reused]))
+                added.append(picks[reused:])
+        finally:
+            cmds.refresh(suspend=False)
+        added = np.sort(np.concatenate(added))
+        if len(added):
+            added_layout = layout.subset(added)
+            names = layout_instance_names(self.prototypes, added_layout)
+            self.group = commit_layout(self.prototypes, added_layout,
+                                       self.group, names)
+            handles = child_handles(self.group)[-len(names):]
+            for handle, index in zip(
+                    handles, added_layout.prototype_indices().tolist()):
+                self.nodes[index].append(handle)
+
+    def child_order(self, layout):
+        """Returns the layout index of each of the group's children
+
+        layout is the one the pool was last updated with. Children are
+        ordered by when they were created, not by layout order.
+        """
+        prototype_ids = layout.prototype_indices()
+        indices = {}
+        for index, nodes in enumerate(self.nodes):
+            picks = np.flatnonzero(prototype_ids == index)
+            for node, pick in zip(nodes, picks):
+                indices[node.hashCode()] = pick
+        return np.array([indices[handle.hashCode()]
+                         for handle in child_handles(self.group)],
+                        dtype=np.int64)
+
+    def delete(self):
+        if self.group is not None and cmds.objExists(self.group):
+            cmds.delete(self.group)
+        self.group = None
+        self.nodes = [[] for _ in self.prototypes]
+
+
+def node_object(name):
+    selection = om.MSelectionList()
+    selection.add(name)
+    return selection.getDependNode(0)
+
+
+def child_handles(group):
+    """Returns MObjectHandles of a group's children in order"""
+    group_fn = om.MFnDagNode(node_object(group))
+    return [om.MObjectHandle(group_fn.child(index))
+            for index in range(group_fn.childCount())]
+
+
+def group_nodes(group):
+    """Returns MObjects of a group's children in order"""
+    return [handle.object() for handle in child_handles(group)]
+
+
+def commit_point_instancer(prototypes, layout):
+    """Writes a layout into one particle cloud driving an instancer
+
+    Every point carries its rotation and scale as per particle vector
+    arrays, and with several prototypes its prototype id as object
+    index, so the node count stays flat regardless of the point count.
+    Returns the name of the new instance group.
+    """
+    prototypes = prototype_list(prototypes)
+    with scene_edit():
+        group = cmds.group(empty=True,
+                           name=unique_names("instance_group", 1)[0])
+        particle, shape = cmds.particle(
+            position=layout.translations().tolist(),
+            name=unique_names("scatter_points", 1)[0])
+        cmds.setAttr(shape + ".isDynamic", False)
+        for attribute, values in (("rotationPP", layout.rotations),
+                                  ("scalePP", layout.scales)):
+            cmds.addAttr(shape, longName=attribute, dataType="vectorArray")
+            cmds.addAttr(shape, longName=attribute + "0",
+                         dataType="vectorArray")
+            cmds.setAttr(shape + "." + attribute + "0", values.tolist(),
+                         type="vectorArray")
+        index_attribute = {}
+        if len(prototypes) > 1:
+            for attribute in ("prototypeIndexPP", "prototypeIndexPP0"):
+                cmds.addAttr(shape, longName=attribute,
+                             dataType="doubleArray")
+            cmds.setAttr(shape + ".prototypeIndexPP0",
+                         layout.prototype_indices().tolist(),
+                         type="doubleArray")
+            index_attribute["objectIndex"] = "prototypeIndexPP"
+        instancer = cmds.particleInstancer(
+            shape, addObject=True, object=prototypes,
+            position="worldPosition", rotation="rotationPP",
+            scale="scalePP", name=unique_names("scatter_instancer", 1)[0],
+            **index_attribute)
+        cmds.parent(particle, instancer, group)
+        return group
+
+
+@contextlib.contextmanager
+def scene_edit(undoable=True):
+    """Groups scene edits into one undo chunk with refresh suspended
+
+    With undoable False the edits are not recorded for undo at all, the
+    undo queue itself is kept.
+    """
+    if undoable:
+        cmds.undoInfo(openChunk=True, chunkName="scatter")
+    else:
+        undo_state = cmds.undoInfo(query=True, state=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+    cmds.refresh(suspend=True)
+    try:
+        yield
+    finally:
+        cmds.refresh(suspend=False)
+        if undoable:
+            cmds.undoInfo(closeChunk=True)
+        else:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+
+def prototype_list(prototypes):
+    """Returns prototypes as a list, accepting a single object name"""
+    if isinstance(prototypes, (list, tuple)):
+        return list(prototypes)
+    return [prototypes]
+
+
+def instance_names_for(prototype, count):
+    """Returns count unused instance names for a prototype"""
+    return unique_names(instance_prefix(prototype), count)
+
+
+def instance_prefix(prototype):
+    return prototype.split("|")[-1] + "_instance"
+
+
+def layout_instance_names(prototypes, layout):
+    """Returns an unused name per instance after its prototype
+
+    Prototypes sharing a short name draw from one numbering.
+    """
+    prototype_ids = layout.prototype_indices()
+    picks = {}
+    for index, prototype in enumerate(prototype_list(prototypes)):
+        picks.setdefault(instance_prefix(prototype), []).append(
+            np.flatnonzero(prototype_ids == index))
+    names = [None] * len(layout)
+    for prefix, prefix_picks in picks.items():
+        prefix_picks = np.sort(np.concatenate(prefix_picks))
+        for pick, name in zip(prefix_picks.tolist(),
+                              unique_names(prefix, len(prefix_picks))):
+            names[pick] = name
+    return names
+
+
+def unique_names(prefix, count):
+    """Returns count numbered names that are unused in the scene
+
+    Existing names are listed once so Maya does not have to search for a
+    free "#" suffix per node.
+    """
+    suffix = re.compile(re.escape(prefix) + r"(\d+)$")
+    used = [int(match.group(1))
+            for match in map(suffix.match, cmds.ls(prefix + "*") or [])
+            if match]
+    start = max(used) + 1 if used else 1
+    return ["%s%d" % (prefix, index) for index in range(start, start + count)]
+
+
+def instance_prototype(prototype, nodes):
+    """Adds the prototype's children under every node as instances"""
+    selection = om.MSelectionList()
+    selection.add(prototype)
+    prototype_fn = om.MFnDagNode(selection.getDagPath(0))
+    if prototype_fn.object().hasFn(om.MFn.kTransform):
+        children = [prototype_fn.child(index)
+                    for index in range(prototype_fn.childCount())]
+    else:
+        children = [prototype_fn.object()]
+    instanced = []
+    for node in nodes:
+        node_fn = om.MFnDagNode(node)
+        for child in children:
+            node_fn.addChild(child, om.MFnDagNode.kNextPos, True)
+            instanced.append((node, child))
+    return instanced
+
+
+def set_transforms(nodes, layout):
+    """Writes layout translations, rotations and scales onto nodes"""
+    transform_fn = om.MFnTransform()
+    transforms = zip(nodes, layout.translations().tolist(),
+                     np.radians(layout.rotations).tolist(),
+                     layout.scales.tolist())
+    for node, translation, rotation, scale in transforms:
+        transform_fn.setObject(node)
+        transform_fn.setTranslation(om.MVector(translation),
+                                    om.MSpace.kTransform)
+        transform_fn.setRotation(om.MEulerRotation(rotation),
+                                 om.MSpace.kTransform)
+        transform_fn.setScale(scale)
@@ -0,0 +1,379 @@
+import hashlib
+import numpy as np
+import scatter_binding
+import scatter_culling
+import scatter_layout
+import scatter_masks
+import scatter_mesh
+import scatter_projection
+import scatter_sampling
+
+VERTEX_SAMPLING = 0
+SURFACE_SAMPLING = 1
+PROJECTED_SAMPLING = 2
+LAYOUT_CHUNK_SIZE = 50000
+SAMPLING_SETTINGS = ("sample_mode", "percentage", "surface_point_count",
+                     "projection_path", "projection_width", "slope_range",
+                     "height_range", "color_channel", "density_map",
+                     "camera_view", "frustum_padding", "thin_distance",
+                     "seed")
+
+
+class ScatterSettings(object):
+    """Parameters of one scatter run, independent of Maya and the UI"""
+
+    def __init__(self):
+        self.rotation_range = ((0, 0, 0), (360, 360, 360))
+        self.scale_range = ((1.0, 1.0, 1.0), (1.0, 1.0, 1.0))
+        self.embed_offset = 0.0
+        self.form_of_scatter = 0
+        self.aim_axis = scatter_layout.X_AXIS
+        self.up_axis = scatter_layout.Y_AXIS
+        self.percentage = 100
+        self.sample_mode = VERTEX_SAMPLING
+        self.surface_point_count = 1000
+        self.projection_path = None
+        self.projection_width = 0.0
+        self.min_spacing = 0.0
+        self.spacing_uses_scale = False
+        self.slope_range = None
+        self.height_range = None
+        self.color_channel = None
+        self.density_map = None
+        self.prototype_weights = (1.0,)
+        self.camera_view = None
+        self.frustum_padding = 0.1
+        self.thin_distance = 0.0
+        self.seed = None
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Builds settings from a dict such as a batch job spec"""
+        settings = cls()
+        for key, value in values.items():
+            if not hasattr(settings, key):
+                raise ValueError("Unknown scatter setting: %s" % key)
+            if isinstance(value, list):
+                value = tuple(tuple(item) if isinstance(item, list) else item
+                              for item in value)
+            setattr(settings, key, value)
+        return settings
+
+
+def sampling_key(settings):
+    """Returns the settings sampled points depend on, None if unseeded
+
+    Points sampled without a seed differ on every run and are never
+    reused. Other settings, such as rotation, scale and embed offset,
+    only affect the layout.
+    """
+    if settings.seed is None:
+        return None
+    values = []
+    for name in SAMPLING_SETTINGS:
+        value = getattr(settings, name)
+        if isinstance(value, dict):
+            value = tuple(sorted((key, repr(item))
+                                 for key, item in value.items()))
+        values.append(value)
+    return tuple(values)
+
+
+def check_settings(settings):
+    """Returns a message describing invalid settings, or None"""
+    for minimum, maximum in (settings.rotation_range, settings.scale_range):
+        if any(low > high for low, high in zip(minimum, maximum)):
+            return ("Minimum value(s) greater than maximum value(s). "
+                    "This is not valid. Resubmit values correctly.")
+    for value_range in (settings.slope_range, settings.height_range):
+        if value_range is not None and value_range[0] > value_range[1]:
+            return ("Minimum slope or height greater than the maximum. "
+                    "Resubmit values correctly.")
+    if settings.form_of_scatter != 0 and \
+            tuple(settings.aim_axis) == tuple(settings.up_axis):
+        return ("Normal aim axis and up axis are the same. Choose two "
+                "different axes.")
+    if any(weight < 0 for weight in settings.prototype_weights) or \
+            sum(settings.prototype_weights) <= 0:
+        return ("Prototype weights must not be negative and at least one "
+                "must be above 0.")
+    if settings.sample_mode == VERTEX_SAMPLING and settings.percentage == 0:
+        return ("Percentage set to 0, no vertices randomly selected. "
+                "Specify a higher percentage.")
+    if settings.sample_mode in (SURFACE_SAMPLING, PROJECTED_SAMPLING) and \
+            settings.surface_point_count == 0:
+        return ("Surface point count set to 0, no points sampled. Specify "
+                "a higher point count.")
+    if settings.sample_mode == PROJECTED_SAMPLING and \
+            len(settings.projection_path or ()) < \
+            (2 if settings.projection_width > 0 else 3):
+        return ("Projection needs a curve outlining a region, or a band "
+                "width to scatter along an open curve.")
+    if settings.sample_mode == PROJECTED_SAMPLING and \
+            settings.projection_width <= 0 and \
+            not scatter_projection.has_region(settings.projection_path):
+        return ("Projection curve encloses no area seen from above. Draw "
+                "it in the top view, or set a band width to scatter along "
+                "it.")
+    return None
+
+
+def sample_vertices(selection, settings):
+    """Randomly picks the settings' percentage of a VertexSelection"""
+    count = int(round(len(selection) * (settings.percentage * 0.01)))
+    rng = scatter_layout.random_state(settings.seed,
+                                      scatter_layout.SAMPLE_STREAM)
+    return selection.sample(count, rng)
+
+
+def masked_selection(meshes, selection, settings):
+    """Drops vertices ruled out by the placement masks before sampling
+
+    Each vertex is kept with its placement weight as chance, drawn from
+    a random stream of its own so enabling masks does not reshuffle the
+    later sampling.
+    """
+    if not scatter_masks.uses_masks(settings):
+        return selection
+    rng = scatter_layout.random_state(settings.seed,
+                                      scatter_layout.MASK_STREAM)
+    kept_meshes = []
+    kept_indices = []
+    for mesh, indices in selection:
+        weights = scatter_masks.placement_weights(meshes[mesh], settings)
+        indices = indices[scatter_masks.thin(weights[indices], rng)]
+        if len(indices):
+            kept_meshes.append(mesh)
+            kept_indices.append(indices)
+    return scatter_mesh.VertexSelection(kept_meshes, kept_indices)
+
+
+def vertex_points(meshes, selection):
+    """Gathers positions and normals of selected vertices
+
+    meshes maps the selection's mesh names to MeshData.
+    """
+    positions = [meshes[mesh].positions[indices]
+                 for mesh, indices in selection]
+    normals = [meshes[mesh].normals[indices] for mesh, indices in selection]
+    return (np.concatenate(positions or [np.empty((0, 3))]),
+            np.concatenate(normals or [np.empty((0, 3))]))
+
+
+def sample_surface(meshes, selection, settings):
+    """Draws area weighted points over the selected triangles
+
+    Placement weights scale each triangle's share of the points, and
+    points outside the slope range or height band are dropped after.
+    """
+    positions, normals, _ = sample_bound_surface(meshes, selection, settings)
+    return positions, normals
+
+
+def sample_bound_surface(meshes, selection, settings):
+    """Runs sample_surface, also returning the points' PointBinding"""
+    samplers = [scatter_sampling.surface_sampler(
+        meshes[mesh], indices,
+        scatter_masks.placement_weights(meshes[mesh], settings))
+        for mesh, indices in selection]
+    rng = scatter_layout.random_state(settings.seed,
+                                      scatter_layout.SAMPLE_STREAM)
+    samples = scatter_sampling.sample_surface_barycentric(
+        samplers, settings.surface_point_count, rng)
+    positions, normals = scatter_sampling.interpolate_samples(samplers,
+                                                              samples)
+    binding = scatter_binding.surface_binding(
+        [mesh for mesh, _ in selection], samplers, samples)
+    if scatter_masks.uses_masks(settings):
+        keep = scatter_masks.point_mask(positions, normals, settings)
+        positions, normals = positions[keep], normals[keep]
+        binding = binding.subset(keep)
+    return positions, normals, binding
+
+
+def sample_projected(meshes, selection, settings):
+    """Projects points straight down from a path onto the selected triangles
+
+    With a projection width the points fill a band of that width along
+    settings.projection_path, otherwise the region the path encloses.
+    Hits outside the slope range or height band are dropped and the
+    remaining ones thinned by their interpolated placement weights.
+    Returns positions, normals and their PointBinding.
+    """
+    rng = scatter_layout.random_state(settings.seed,
+                                      scatter_layout.SAMPLE_STREAM)
+    if settings.projection_width > 0:
+        origins = scatter_projection.path_origins(
+            settings.projection_path, settings.surface_point_count,
+            settings.projection_width, rng)
+    else:
+        origins = scatter_projection.region_origins(
+            settings.projection_path, settings.surface_point_count, rng)
+    positions, normals, binding = scatter_projection.project_points(
+        meshes, selection, origins)
+    if scatter_masks.uses_masks(settings):
+        keep = scatter_masks.point_mask(positions, normals, settings)
+        weights = np.ones(len(positions))
+        for index, mesh in enumerate(binding.meshes):
+            picks = binding.mesh_ids == index
+            vertex_weights = scatter_masks.placement_weights(meshes[mesh],
+                                                             settings)
+            weights[picks] = np.einsum(
+                "ij,ij->i", binding.weights[picks],
+                vertex_weights[binding.vertex_ids[picks]])
+        keep &= scatter_masks.thin(weights, scatter_layout.random_state(
+            settings.seed, scatter_layout.MASK_STREAM))
+        positions, normals = positions[keep], normals[keep]
+        binding = binding.subset(keep)
+    return positions, normals, binding
+
+
+def sample_points(meshes, selection, settings):
+    """Returns the positions and normals instances are placed on"""
+    if settings.sample_mode == SURFACE_SAMPLING:
+        positions, normals = sample_surface(meshes, selection, settings)
+    elif settings.sample_mode == PROJECTED_SAMPLING:
+        positions, normals, _ = sample_projected(meshes, selection, settings)
+    else:
+        selection = masked_selection(meshes, selection, settings)
+        positions, normals = vertex_points(
+            meshes, sample_vertices(selection, settings))
+    return cull_points(positions, normals, settings)
+
+
+def cull_points(positions, normals, settings):
+    """Drops sampled points outside the camera view and thins far ones
+
+    settings.camera_view is a CameraView dict, without one all points
+    are kept. Distance thinning starts at settings.thin_distance and is
+    off at 0.
+    """
+    keep = cull_mask(positions, settings)
+    if keep is None:
+        return positions, normals
+    return positions[keep], normals[keep]
+
+
+def cull_mask(positions, settings):
+    """Returns which points cull_points keeps, None without a camera"""
+    if settings.camera_view is None:
+        return None
+    view = scatter_culling.CameraView.from_dict(settings.camera_view)
+    keep = scatter_culling.frustum_mask(positions, view,
+                                        settings.frustum_padding)
+    if settings.thin_distance > 0:
+        rng = scatter_layout.random_state(settings.seed,
+                                          scatter_layout.CULL_STREAM)
+        keep &= scatter_masks.thin(scatter_culling.distance_density(
+            positions, view, settings.thin_distance), rng)
+    return keep
+
+
+class LayoutCache(object):
+    """Intermediate arrays of the last layout, reused while inputs match
+
+    Random unit samples depend only on the points and the seed, normal
+    aligned rotations on the normals and axes, and the spacing mask on
+    those plus the spacing settings. Changing a rotation or scale range
+    or the embed offset therefore only remaps cached arrays. Nothing is
+    reused for unseeded runs.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, name, key, compute):
+        """Returns the cached value for name if key matches, else compute"""
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != key:
+            entry = (key, compute())
+            self._entries[name] = entry
+        return entry[1]
+
+    def clear(self):
+        self._entries = {}
+
+
+def points_key(positions, normals):
+    """Returns a hash identifying sampled points and their normals"""
+    key = hashlib.sha1(np.ascontiguousarray(positions).tobytes())
+    key.update(np.ascontiguousarray(normals).tobytes())
+    return key.hexdigest()
+
+
+def create_layout(positions, normals, settings, cache=None, binding=None):
+    """Computes the transforms of every instance for sampled points
+
+    Random values are drawn in fixed size chunks of points, each from
+    its own stream derived from the seed and the chunk index. A
+    LayoutCache kept between calls skips the parts whose inputs did not
+    change. With several prototype weights every
+    instance is assigned a prototype in the same pass. A PointBinding
+    of the points is kept on the layout so instances can follow the
+    target later.
+    """
+    cache = cache or LayoutCache()
+    key = points_key(positions, normals)
+    units_key = (key, settings.seed) if settings.seed is not None \
+        else object()
+    starts = range(0, len(positions), LAYOUT_CHUNK_SIZE)
+    rotation_unit, scale_unit = cache.get(
+        "units", units_key, lambda: _concatenate_pairs([
+            scatter_layout.draw_unit_samples(
+                min(LAYOUT_CHUNK_SIZE, len(positions) - start),
+                settings.seed, chunk)
+            for chunk, start in enumerate(starts)]))
+    aligned = None
+    if settings.form_of_scatter == 1:
+        aligned = cache.get(
+            "aligned", (key, tuple(settings.aim_axis),
+                        tuple(settings.up_axis)),
+            lambda: scatter_layout.aligned_rotations(
+                normals, settings.aim_axis, settings.up_axis))
+    layout = scatter_layout.assemble_layout(
+        positions, normals, rotation_unit, scale_unit,
+        settings.rotation_range, settings.scale_range,
+        settings.embed_offset, settings.form_of_scatter, aligned)
+    layout.binding = binding
+    if len(settings.prototype_weights) > 1:
+        layout.prototype_ids = scatter_layout.assign_prototypes(
+            len(layout), settings.prototype_weights,
+            scatter_layout.random_state(settings.seed,
+                                        scatter_layout.PROTOTYPE_STREAM))
+    if settings.min_spacing > 0:
+        spacing_key = (units_key, settings.min_spacing,
+                       settings.spacing_uses_scale)
+        if settings.spacing_uses_scale:
+            spacing_key += (tuple(map(tuple, settings.scale_range)),)
+        layout = layout.subset(cache.get(
+            "spacing", spacing_key, lambda: spacing_mask(layout, settings)))
+    return layout
+
+
+def _concatenate_pairs(pairs):
+    if not pairs:
+        return np.empty((0, 3)), np.empty((0, 3))
+    return tuple(np.concatenate(arrays) for arrays in zip(*pairs))
+
+
+def spacing_mask(layout, settings):
+    """Returns the instances kept by the minimum spacing filter"""
+    radii = np.full(len(layout), settings.min_spacing * 0.5)
+    if settings.spacing_uses_scale:
+        radii *= layout.scales.max(axis=1)
+    return scatter_sampling.poisson_disk_filter(layout.positions, radii)
+
+
+def generate_layout(meshes, selection, settings, cache=None):
+    """Runs sampling and layout for a target without touching a scene"""
+    positions, normals = sample_points(meshes, selection, settings)
+    return create_layout(positions, normals, settings, cache)
+
+
+def whole_mesh_selection(mesh_data):
+    """Returns a VertexSelection of every vertex of a mesh"""
+    return scatter_mesh.VertexSelection([mesh_data.name],
+                                        [np.arange(len(mesh_data))])
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class CameraView(object):
+    """A camera's world matrix, field of view and clipping planes
+
+    matrix is a row major 4x4 world matrix with the translation in the
+    last row, as Maya's xform returns it. The camera looks down its
+    local -Z axis. Fields of view are in degrees.
+    """
+
+    def __init__(self, matrix, horizontal_fov, vertical_fov, near=0.1,
+                 far=100000.0):
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+        self.horizontal_fov = horizontal_fov
+        self.vertical_fov = vertical_fov
+        self.near = near
+        self.far = far
+
+    def to_dict(self):
+        return {"matrix": self.matrix.ravel().tolist(),
+                "horizontal_fov": self.horizontal_fov,
+                "vertical_fov": self.vertical_fov,
+                "near": self.near, "far": self.far}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values["matrix"], values["horizontal_fov"],
+                   values["vertical_fov"], values.get("near", 0.1),
+                   values.get("far", 100000.0))
+
+    def eye(self):
+        return self.matrix[3, :3]
+
+    def camera_space(self, positions):
+        """Returns positions relative to the camera, -Z in front"""
+        homogeneous = np.hstack((positions, np.ones((len(positions), 1))))
+        return homogeneous.dot(np.linalg.inv(self.matrix))[:, :3]
+
+
+def frustum_mask(positions, view, padding=0.0):
+    """Returns which positions lie inside the camera's view frustum
+
+    padding widens the frustum by a fraction of its width and height so
+    instances just outside the frame, which may still cast shadows or
+    poke into it, are kept.
+    """
+    local = view.camera_space(positions)
+    depth = -local[:, 2]
+    half_width = np.tan(np.radians(view.horizontal_fov) * 0.5) * \
+        (1.0 + padding) * depth
+    half_height = np.tan(np.radians(view.vertical_fov) * 0.5) * \
+        (1.0 + padding) * depth
+    return (depth >= view.near) & (depth <= view.far) & \
+        (np.abs(local[:, 0]) <= half_width) & \
+        (np.abs(local[:, 1]) <= half_height)
+
+
+def distance_density(positions, view, full_density_distance):
+    """Returns a keep chance falling off with distance from the camera
+
+    Points closer than full_density_distance are always kept, beyond it
+    the chance falls with the square of the distance, as the screen
+    area an instance covers does, so on screen density stays even.
+    """
+    distances = np.linalg.norm(positions - view.eye(), axis=1)
+    return np.minimum(1.0, (full_density_distance
+                            / np.maximum(distances, 1e-12)) ** 2)
@@ -0,0 +1,96 @@
+"""Compact binary scatter layout files
+
+A layout file is a fixed header, JSON metadata and the positions,
+rotations, scales and offsets arrays stored back to back as
+little-endian float32:
+
+    magic "SCLAYOUT", uint32 version, uint32 instance count,
+    uint32 metadata length, metadata, padding to ARRAY_ALIGNMENT,
+    float32[4][count][3], int32[count] prototype ids if the metadata
+    has "prototype_ids" set
+
+Version 1 files have no prototype ids and name a single "prototype" in
+their metadata. They are still read, their metadata converted to a
+"prototypes" list.
+
+load_layout memory-maps the arrays, so opening a file costs the same
+whatever the number of instances and values are only paged in when
+read.
+"""
+import json
+import struct
+import numpy as np
+import scatter_layout
+
+MAGIC = b"SCLAYOUT"
+VERSION = 2
+READ_VERSIONS = (1, 2)
+HEADER = struct.Struct("<8sIII")
+ARRAY_ALIGNMENT = 16
+ARRAY_DTYPE = np.dtype("<f4")
+ID_DTYPE = np.dtype("<i4")
+
+
+def save_layout(path, layout, metadata=None):
+    """Writes a layout and JSON metadata to a layout file"""
+    metadata = dict(metadata or {})
+    metadata["form_of_scatter"] = layout.form_of_scatter
+    metadata["prototype_ids"] = layout.prototype_ids is not None
+    encoded = json.dumps(metadata, sort_keys=True).encode("utf-8")
+    padding = -(HEADER.size + len(encoded)) % ARRAY_ALIGNMENT
+    with open(path, "wb") as layout_file:
+        layout_file.write(HEADER.pack(MAGIC, VERSION, len(layout),
+                                      len(encoded)))
+        layout_file.write(encoded + b" " * padding)
+        for values in (layout.positions, layout.rotations, layout.scales,
+                       layout.offsets):
+            layout_file.write(np.ascontiguousarray(
+                values, dtype=ARRAY_DTYPE).reshape(-1, 3).tobytes())
+        if layout.prototype_ids is not None:
+            layout_file.write(np.ascontiguousarray(
+                layout.prototype_ids, dtype=ID_DTYPE).tobytes())
+
+
+def read_header(path):
+    """Returns (instance count, metadata, array offset) of a layout file"""
+    with open(path, "rb") as layout_file:
+        header = layout_file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("%s is not a scatter layout file." % path)
+        magic, version, count, metadata_size = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("%s is not a scatter layout file." % path)
+        if version not in READ_VERSIONS:
+            raise ValueError("%s has unsupported layout version %d."
+                             % (path, version))
+        metadata = json.loads(layout_file.read(metadata_size).decode("utf-8"))
+    if version == 1:
+        prototype = metadata.pop("prototype", None)
+        metadata["prototypes"] = [prototype] if prototype else None
+    offset = HEADER.size + metadata_size
+    return count, metadata, offset + -offset % ARRAY_ALIGNMENT
+
+
+def load_layout(path):
+    """Maps a layout file written by save_layout, returns (layout, metadata)
+
+    The layout's arrays are read only views of the file.
+    """
+    count, metadata, offset = read_header(path)
+    prototype_ids = None
+    if count == 0:
+        arrays = np.empty((4, 0, 3), dtype=ARRAY_DTYPE)
+        if metadata.get("prototype_ids"):
+            prototype_ids = np.empty(0, dtype=ID_DTYPE)
+    else:
+        arrays = np.memmap(path, dtype=ARRAY_DTYPE, mode="r", offset=offset,
+                           shape=(4, count, 3))
+        if metadata.get("prototype_ids"):
+            prototype_ids = np.memmap(
+                path, dtype=ID_DTYPE, mode="r",
+                offset=offset + arrays.nbytes, shape=(count,))
+    layout = scatter_layout.ScatterLayout(arrays[0], arrays[1], arrays[2],
+                                          arrays[3],
+                                          metadata["form_of_scatter"],
+                                          prototype_ids)
+    return layout, metadata
@@ -0,0 +1,157 @@
+import numpy as np
+
+X_AXIS = (1.0, 0.0, 0.0)
+Y_AXIS = (0.0, 1.0, 0.0)
+Z_AXIS = (0.0, 0.0, 1.0)
+SAMPLE_STREAM = 0
+LAYOUT_STREAM = 1
+MASK_STREAM = 2
+PROTOTYPE_STREAM = 3
+CULL_STREAM = 4
+
+
+class ScatterLayout(object):
+    """Per instance transforms of a scatter stored as (n, 3) arrays
+
+    positions are the sampled surface points, offsets the world space
+    embed offsets added to them and rotations XYZ euler angles in degrees.
+    prototype_ids picks each instance's prototype when several are
+    scattered at once, None means all use the first. binding is the
+    PointBinding of the positions to the target when instances follow it.
+    """
+
+    def __init__(self, positions, rotations, scales, offsets,
+                 form_of_scatter=0, prototype_ids=None, binding=None):
+        self.positions = positions
+        self.rotations = rotations
+        self.scales = scales
+        self.offsets = offsets
+        self.form_of_scatter = form_of_scatter
+        self.prototype_ids = prototype_ids
+        self.binding = binding
+
+    def __len__(self):
+        return len(self.positions)
+
+    def translations(self):
+        return self.positions + self.offsets
+
+    def prototype_indices(self):
+        if self.prototype_ids is None:
+            return np.zeros(len(self), dtype=np.int32)
+        return self.prototype_ids
+
+    def subset(self, mask):
+        """Returns a layout holding only the entries selected by mask"""
+        prototype_ids = None
+        if self.prototype_ids is not None:
+            prototype_ids = self.prototype_ids[mask]
+        binding = None
+        if self.binding is not None:
+            binding = self.binding.subset(mask)
+        return ScatterLayout(self.positions[mask], self.rotations[mask],
+                             self.scales[mask], self.offsets[mask],
+                             self.form_of_scatter, prototype_ids, binding)
+
+
+def draw_unit_samples(count, seed=None, chunk=0):
+    """Returns the [0, 1) rotation and scale samples of a layout chunk"""
+    rng = random_state(seed, LAYOUT_STREAM, chunk)
+    return rng.random_sample((count, 3)), rng.random_sample((count, 3))
+
+
+def aligned_rotations(normals, aim_axis=X_AXIS, up_axis=Y_AXIS):
+    """Returns XYZ euler degrees aligning aim_axis to each normal"""
+    return matrices_to_euler_xyz(
+        normal_alignment_matrices(normals, aim_axis, up_axis))
+
+
+def assemble_layout(positions, normals, rotation_unit, scale_unit,
+                    rotation_range, scale_range, embed_offset=0.0,
+                    form_of_scatter=0, aligned=None):
+    """Maps unit samples onto ranges and adds the embed offsets
+
+    rotation_range and scale_range are ((x, y, z) minimums,
+    (x, y, z) maximums) pairs. form_of_scatter 0 uses random rotations
+    and embeds along world Y, 1 uses the normal aligned rotations in
+    aligned and 2 embeds along the normals but keeps random rotations.
+    Offsets along the aim axis of an aligned instance point along its
+    normal, so forms 1 and 2 embed along the unit normals.
+    """
+    rotations = map_unit_range(rotation_unit, *rotation_range)
+    if form_of_scatter == 1:
+        rotations = aligned
+    scales = map_unit_range(scale_unit, *scale_range)
+    if form_of_scatter == 0:
+        offsets = np.zeros((len(positions), 3))
+        offsets[:, 1] = embed_offset
+    else:
+        offsets = embed_offset * _normalize(
+            np.asarray(normals, dtype=np.float64).reshape(-1, 3))
+    return ScatterLayout(positions, rotations, scales, offsets,
+                         form_of_scatter)
+
+
+def assign_prototypes(count, weights, rng):
+    """Picks a prototype index per instance in proportion to weights"""
+    cdf = np.cumsum(np.asarray(weights, dtype=np.float64))
+    picks = np.searchsorted(cdf, rng.random_sample(count) * cdf[-1],
+                            side="right")
+    return np.minimum(picks, len(cdf) - 1).astype(np.int32)
+
+
+def random_state(seed, *stream):
+    """Returns an independent RandomState per stream of a seed"""
+    if seed is None:
+        return np.random.RandomState()
+    return np.random.RandomState([seed] + list(stream))
+
+
+def map_unit_range(unit, minimum, maximum):
+    """Maps [0, 1) samples onto per axis [minimum, maximum] ranges"""
+    minimum = np.asarray(minimum, dtype=np.float64)
+    maximum = np.asarray(maximum, dtype=np.float64)
+    return minimum + (maximum - minimum) * unit
+
+
+def normal_alignment_matrices(normals, aim_axis=X_AXIS, up_axis=Y_AXIS,
+                              world_up=Y_AXIS):
+    """Returns (n, 3, 3) rotations pointing aim_axis along each normal
+
+    Matches cmds.normalConstraint with the same aim and up vectors and a
+    vector world up: up_axis is kept as close to world_up as the normal
+    allows. Normals parallel to world_up fall back to world Z as up.
+    """
+    normals = _normalize(np.asarray(normals, dtype=np.float64)
+                         .reshape(-1, 3))
+    world_up = np.broadcast_to(np.asarray(world_up, dtype=np.float64),
+                               normals.shape)
+    side = np.cross(normals, world_up)
+    parallel = np.einsum("ij,ij->i", side, side) < 1e-12
+    side[parallel] = np.cross(normals[parallel], Z_AXIS)
+    side = _normalize(side)
+    up = np.cross(side, normals)
+    world_frame = np.stack((normals, up, side), axis=2)
+    aim_axis = np.asarray(aim_axis, dtype=np.float64)
+    up_axis = np.asarray(up_axis, dtype=np.float64)
+    object_frame = np.stack((aim_axis, up_axis, np.cross(aim_axis, up_axis)),
+                            axis=1)
+    return world_frame.dot(object_frame.T)
+
+
+def matrices_to_euler_xyz(matrices):
+    """Converts (n, 3, 3) rotation matrices to XYZ order euler degrees"""
+    cos_y = np.hypot(matrices[:, 0, 0], matrices[:, 1, 0])
+    x_rot = np.arctan2(matrices[:, 2, 1], matrices[:, 2, 2])
+    y_rot = np.arctan2(-matrices[:, 2, 0], cos_y)
+    z_rot = np.arctan2(matrices[:, 1, 0], matrices[:, 0, 0])
+    gimbal = cos_y < 1e-9
+    x_rot[gimbal] = np.arctan2(-matrices[gimbal, 1, 2],
+                               matrices[gimbal, 1, 1])
+    z_rot[gimbal] = 0.0
+    return np.degrees(np.stack((x_rot, y_rot, z_rot), axis=1))
+
+
+def _normalize(vectors):
+    lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    return vectors / np.maximum(lengths, 1e-12)[:, None]
@@ -0,0 +1,133 @@
+import ctypes
+import os
+import numpy as np
+
+COLOR_CHANNELS = ["Red", "Green", "Blue", "Alpha"]
+UP = np.array([0.0, 1.0, 0.0])
+_density_maps = {}
+
+
+def uses_masks(settings):
+    return (settings.slope_range is not None
+            or settings.height_range is not None
+            or settings.color_channel is not None
+            or bool(settings.density_map))
+
+
+def placement_weights(mesh_data, settings):
+    """Returns the chance in [0, 1] of each vertex receiving an instance
+
+    The slope range (degrees between the normal and world up) and height
+    band are hard limits giving 0 or 1. The vertex color channel and
+    the density map, looked up at each vertex's UV, scale that chance.
+    Returns None when no mask is enabled.
+    """
+    if not uses_masks(settings):
+        return None
+    weights = np.ones(len(mesh_data))
+    if settings.slope_range is not None:
+        weights *= in_range(slope_angles(mesh_data.normals),
+                            settings.slope_range)
+    if settings.height_range is not None:
+        weights *= in_range(mesh_data.positions[:, 1], settings.height_range)
+    if settings.color_channel is not None:
+        if mesh_data.colors is None:
+            raise ValueError("%s has no vertex colors to use as density."
+                             % mesh_data.name)
+        weights *= np.clip(mesh_data.colors[:, settings.color_channel],
+                           0.0, 1.0)
+    if settings.density_map:
+        if mesh_data.uvs is None:
+            raise ValueError("%s has no UVs to look up the density map."
+                             % mesh_data.name)
+        weights *= sample_density_map(load_density_map(settings.density_map),
+                                      mesh_data.uvs)
+    return weights
+
+
+def point_mask(positions, normals, settings):
+    """Returns which points lie inside the slope range and height band
+
+    Used on surface samples, whose triangles may straddle a limit.
+    """
+    keep = np.ones(len(positions), dtype=bool)
+    if settings.slope_range is not None:
+        keep &= in_range(slope_angles(normals), settings.slope_range)
+    if settings.height_range is not None:
+        keep &= in_range(positions[:, 1], settings.height_range)
+    return keep
+
+
+def slope_angles(normals):
+    """Returns the angle in degrees between each normal and world up"""
+    lengths = np.maximum(np.linalg.norm(normals, axis=1), 1e-12)
+    return np.degrees(np.arccos(np.clip(normals.dot(UP) / lengths,
+                                        -1.0, 1.0)))
+
+
+def in_range(values, value_range):
+    minimum, maximum = value_range
+    return (values >= minimum) & (values <= maximum)
+
+
+def sample_density_map(density_map, uvs):
+    """Returns bilinear density map values at (n, 2) UVs
+
+    Row 0 of the map is v = 0. UVs outside 0 to 1 are clamped.
+    """
+    rows, columns = density_map.shape
+    u = np.clip(uvs[:, 0], 0.0, 1.0) * (columns - 1)
+    v = np.clip(uvs[:, 1], 0.0, 1.0) * (rows - 1)
+    column = np.minimum(u.astype(np.int64), max(columns - 2, 0))
+    row = np.minimum(v.astype(np.int64), max(rows - 2, 0))
+    next_column = np.minimum(column + 1, columns - 1)
+    next_row = np.minimum(row + 1, rows - 1)
+    u -= column
+    v -= row
+    bottom = density_map[row, column] * (1.0 - u) + \
+        density_map[row, next_column] * u
+    top = density_map[next_row, column] * (1.0 - u) + \
+        density_map[next_row, next_column] * u
+    return np.clip(bottom * (1.0 - v) + top * v, 0.0, 1.0)
+
+
+def load_density_map(path):
+    """Returns a density map as a 2D array of values in [0, 1]
+
+    .npy files are loaded with NumPy. Other image formats are read
+    through Maya's MImage, whose rows already start at the bottom, using
+    the first channel, so they only load inside Maya. Maps are cached
+    until the file changes.
+    """
+    modified = os.path.getmtime(path)
+    cached = _density_maps.get(path)
+    if cached is None or cached[0] != modified:
+        if path.lower().endswith(".npy"):
+            density_map = np.asarray(np.load(path), dtype=np.float64)
+            if density_map.ndim == 3:
+                density_map = density_map[:, :, 0]
+        else:
+            density_map = _read_image(path)
+        cached = (modified, density_map)
+        _density_maps[path] = cached
+    return cached[1]
+
+
+def _read_image(path):
+    try:
+        import maya.api.OpenMaya as om
+    except ImportError:
+        raise ValueError("Density map %s needs Maya to be read, save it as "
+                         "a .npy array for batch jobs." % path)
+    image = om.MImage()
+    image.readFromFile(path)
+    columns, rows = image.getSize()
+    buffer = (ctypes.c_ubyte * (rows * columns * 4)).from_address(
+        image.pixels())
+    pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(rows, columns, 4)
+    return pixels[:, :, 0] / 255.0
+
+
+def thin(weights, rng):
+    """Returns a mask keeping each entry with its weight as chance"""
+    return rng.random_sample(len(weights)) < weights
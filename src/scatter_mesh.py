@@ -0,0 +1,184 @@
+import hashlib
+import itertools
+import os
+import re
+import numpy as np
+
+VERTEX_COMPONENT = re.compile(r"^(.+)\.vtx\[(\*|\d+)(?::(\d+))?\]$")
+_versions = itertools.count()
+
+
+class MeshData(object):
+    """Vertex data of a scatter target stored as contiguous arrays
+
+    colors holds an RGBA row and uvs a UV per vertex when they were read.
+    The arrays are not changed after construction, a mesh read again
+    gets a new MeshData with a new version, so caches built from a mesh
+    can check version instead of hashing its arrays.
+    """
+
+    def __init__(self, name, positions, normals, triangles=None, colors=None,
+                 uvs=None):
+        self.name = name
+        self.version = next(_versions)
+        self.positions = np.ascontiguousarray(positions,
+                                              dtype=np.float64).reshape(-1, 3)
+        self.normals = np.ascontiguousarray(normals,
+                                            dtype=np.float64).reshape(-1, 3)
+        self.triangles = triangles
+        if triangles is not None:
+            self.triangles = np.ascontiguousarray(
+                triangles, dtype=np.int32).reshape(-1, 3)
+        self.colors = colors
+        if colors is not None:
+            self.colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+        self.uvs = uvs
+        if uvs is not None:
+            self.uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def digest(self):
+        """Returns a hash of every array read from the mesh"""
+        digest = hashlib.sha1(self.positions.tobytes())
+        digest.update(self.normals.tobytes())
+        for values in (self.triangles, self.colors, self.uvs):
+            digest.update(b"-" if values is None
+                          else np.ascontiguousarray(values).tobytes())
+        return digest.hexdigest()
+
+
+class VertexSelection(object):
+    """Target vertices stored as mesh names and integer index arrays"""
+
+    def __init__(self, meshes, indices):
+        self.meshes = list(meshes)
+        self.indices = [np.asarray(index_array, dtype=np.int32)
+                        for index_array in indices]
+
+    def __len__(self):
+        return sum(len(index_array) for index_array in self.indices)
+
+    def __iter__(self):
+        return iter(zip(self.meshes, self.indices))
+
+    def sample(self, count, rng):
+        """Returns a random subset of count vertices without repeats"""
+        picks = rng.choice(len(self), count, replace=False)
+        bounds = np.cumsum([0] + [len(index_array)
+                                  for index_array in self.indices])
+        meshes = []
+        indices = []
+        for mesh, index_array, start, end in zip(self.meshes, self.indices,
+                                                 bounds[:-1], bounds[1:]):
+            mesh_picks = picks[(picks >= start) & (picks < end)]
+            if len(mesh_picks):
+                meshes.append(mesh)
+                indices.append(index_array[mesh_picks - start])
+        return VertexSelection(meshes, indices)
+
+    def component_names(self):
+        """Returns the vertices as compact "mesh.vtx[a:b]" range names"""
+        names = []
+        for mesh, index_array in self:
+            index_array = np.sort(index_array)
+            breaks = np.flatnonzero(np.diff(index_array) != 1) + 1
+            starts = index_array[np.r_[0, breaks]]
+            ends = index_array[np.r_[breaks - 1, len(index_array) - 1]]
+            names.extend("%s.vtx[%d:%d]" % (mesh, start, end)
+                         for start, end in zip(starts, ends))
+        return names
+
+
+def parse_vertex_ranges(components, vertex_count):
+    """Builds a VertexSelection from unflattened vertex component names
+
+    vertex_count is called with a mesh name to expand "mesh.vtx[*]".
+    Names that are not vertex components are ignored.
+    """
+    ranges = {}
+    order = []
+    for component in components:
+        match = VERTEX_COMPONENT.match(component)
+        if match is None:
+            continue
+        mesh, start, end = match.groups()
+        if start == "*":
+            index_range = np.arange(vertex_count(mesh))
+        else:
+            index_range = np.arange(int(start), int(end or start) + 1)
+        if mesh not in ranges:
+            ranges[mesh] = []
+            order.append(mesh)
+        ranges[mesh].append(index_range)
+    return VertexSelection(order, [np.unique(np.concatenate(ranges[mesh]))
+                                   for mesh in order])
+
+
+def read_obj(path, name=None):
+    """Reads the vertices and faces of an OBJ file into MeshData
+
+    Polygons are fan triangulated and vertex normals are computed from
+    the triangles, so "vn" entries are not needed. Vertex colors written
+    as "v x y z r g b" and the first "vt" used by each vertex are kept.
+    """
+    positions = []
+    colors = []
+    texture_coordinates = []
+    vertex_uvs = {}
+    triangles = []
+    with open(path) as obj_file:
+        for line in obj_file:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "v":
+                positions.append([float(value) for value in fields[1:4]])
+                if len(fields) >= 7:
+                    colors.append([float(value) for value in fields[4:7]]
+                                  + [1.0])
+            elif fields[0] == "vt":
+                texture_coordinates.append([float(value)
+                                            for value in fields[1:3]])
+            elif fields[0] == "f":
+                references = [field.split("/") for field in fields[1:]]
+                face = [_obj_index(reference[0], len(positions))
+                        for reference in references]
+                for vertex, reference in zip(face, references):
+                    if len(reference) > 1 and reference[1]:
+                        vertex_uvs.setdefault(vertex, _obj_index(
+                            reference[1], len(texture_coordinates)))
+                triangles.extend([face[0], face[corner], face[corner + 1]]
+                                 for corner in range(1, len(face) - 1))
+    positions = np.array(positions, dtype=np.float64).reshape(-1, 3)
+    triangles = np.array(triangles, dtype=np.int32).reshape(-1, 3)
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    uvs = None
+    if vertex_uvs:
+        uvs = np.zeros((len(positions), 2))
+        vertices = np.fromiter(vertex_uvs.keys(), dtype=np.int64)
+        uv_indices = np.fromiter(vertex_uvs.values(), dtype=np.int64)
+        uvs[vertices] = np.array(texture_coordinates)[uv_indices]
+    return MeshData(name, positions,
+                    compute_vertex_normals(positions, triangles), triangles,
+                    colors if colors and len(colors) == len(positions)
+                    else None, uvs)
+
+
+def _obj_index(reference, count):
+    index = int(reference)
+    return index - 1 if index > 0 else count + index
+
+
+def compute_vertex_normals(positions, triangles):
+    """Returns area weighted unit vertex normals of a triangle mesh"""
+    corners = positions[triangles]
+    face_normals = np.cross(corners[:, 1] - corners[:, 0],
+                            corners[:, 2] - corners[:, 0])
+    normals = np.zeros_like(positions)
+    for corner in range(3):
+        np.add.at(normals, triangles[:, corner], face_normals)
+    lengths = np.linalg.norm(normals, axis=1)
+    return normals / np.maximum(lengths, 1e-12)[:, None]
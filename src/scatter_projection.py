@@ -0,0 +1,448 @@
+import hashlib
+import numpy as np
+import scatter_binding
+
+LEAF_SIZE = 4
+MORTON_BITS = 21
+RAY_CHUNK_SIZE = 4096
+MAX_REJECTION_ROUNDS = 50
+DOWN = np.array([0.0, -1.0, 0.0])
+_bvhs = {}
+
+
+class TriangleBVH(object):
+    """Bounding volume hierarchy over the triangles of a mesh
+
+    Nodes are stored as flat arrays. Triangles are sorted once along a
+    Morton curve through their centroids and each node covers a
+    contiguous range of that order. Internal nodes split their range
+    where the highest bit differing between its codes flips, which
+    halves the node's Morton cell, so building needs a single sort. The
+    tree is built and traversed one level at a time over all nodes, or
+    all rays, of that level at once, so Python only loops over the tree
+    depth. The tree depends only on the triangles; refit updates its
+    bounds for moved points.
+    """
+
+    def __init__(self, positions, triangles, leaf_size=LEAF_SIZE):
+        self.triangles = np.asarray(triangles, dtype=np.int32).reshape(-1, 3)
+        centroids = (positions[self.triangles[:, 0]]
+                     + positions[self.triangles[:, 1]]
+                     + positions[self.triangles[:, 2]]) / 3.0
+        codes = morton_codes(centroids)
+        self.order = np.argsort(codes, kind="stable")
+        codes = codes[self.order]
+        starts = [np.zeros(1, dtype=np.int64)]
+        counts = [np.array([len(self.triangles)])]
+        lefts, rights = [], []
+        level_start, level_count = starts[0], counts[0]
+        node_count = 1
+        while len(level_start):
+            level_left = np.full(len(level_start), -1)
+            level_right = np.full(len(level_start), -1)
+            split = np.flatnonzero(level_count > leaf_size)
+            half = _morton_splits(codes, level_start[split],
+                                  level_count[split])
+            level_left[split] = node_count + 2 * np.arange(len(split))
+            level_right[split] = level_left[split] + 1
+            node_count += 2 * len(split)
+            lefts.append(level_left)
+            rights.append(level_right)
+            level_start = np.stack((level_start[split],
+                                    level_start[split] + half),
+                                   axis=1).ravel()
+            level_count = np.stack((half, level_count[split] - half),
+                                   axis=1).ravel()
+            starts.append(level_start)
+            counts.append(level_count)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.start = np.concatenate(starts)
+        self.count = np.concatenate(counts)
+        self.levels = np.cumsum([0] + [len(level) for level in lefts])
+        self.refit(positions)
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def refit(self, positions):
+        """Recomputes all bounds for moved points, one tree level at once"""
+        ordered = self.triangles[self.order]
+        corners = [positions[ordered[:, corner]] for corner in range(3)]
+        self.v0 = corners[0]
+        self.edge1 = corners[1] - corners[0]
+        self.edge2 = corners[2] - corners[0]
+        self.lower = np.zeros((len(self.left), 3))
+        self.upper = np.zeros((len(self.left), 3))
+        self.bound_columns = np.zeros((6, len(self.left)))
+        if not len(self.triangles):
+            return
+        leaves = np.flatnonzero(self.left < 0)
+        # Three way minimum and maximum, much faster than reducing a
+        # length 3 axis
+        self.lower[leaves] = _segment_reduce(
+            np.minimum, np.minimum(np.minimum(*corners[:2]), corners[2]),
+            self.start[leaves], self.count[leaves])
+        self.upper[leaves] = _segment_reduce(
+            np.maximum, np.maximum(np.maximum(*corners[:2]), corners[2]),
+            self.start[leaves], self.count[leaves])
+        for first, last in reversed(list(zip(self.levels[:-1],
+                                             self.levels[1:]))):
+            nodes = np.arange(first, last)
+            nodes = nodes[self.left[nodes] >= 0]
+            self.lower[nodes] = np.minimum(self.lower[self.left[nodes]],
+                                           self.lower[self.right[nodes]])
+            self.upper[nodes] = np.maximum(self.upper[self.left[nodes]],
+                                           self.upper[self.right[nodes]])
+        self.bound_columns = np.vstack((self.lower.T, self.upper.T))
+
+    def intersect(self, origins, directions):
+        """Returns the nearest hit of every ray
+
+        Returns (triangle ids, distances, (n, 3) barycentric weights),
+        with triangle id -1 and an infinite distance for rays that miss.
+        Rays are cast in chunks of RAY_CHUNK_SIZE to bound memory.
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.ascontiguousarray(np.broadcast_to(
+            np.asarray(directions, dtype=np.float64), origins.shape))
+        triangle_ids = np.full(len(origins), -1)
+        distances = np.full(len(origins), np.inf)
+        weights = np.zeros((len(origins), 3))
+        if len(self.triangles):
+            for start in range(0, len(origins), RAY_CHUNK_SIZE):
+                chunk = slice(start, start + RAY_CHUNK_SIZE)
+                triangle_ids[chunk], distances[chunk], weights[chunk] = \
+                    self._intersect_chunk(origins[chunk], directions[chunk])
+        return triangle_ids, distances, weights
+
+    def _intersect_chunk(self, origins, directions):
+        down = (directions == DOWN).all()
+        if down:
+            box_hits = self._down_box_hits(origins)
+        else:
+            box_hits = self._slab_box_hits(origins, directions)
+        rays = np.arange(len(origins))
+        nodes = np.zeros(len(origins), dtype=np.int64)
+        leaf_rays, leaf_nodes = [], []
+        while len(rays):
+            hit = box_hits(rays, nodes)
+            rays, nodes = rays[hit], nodes[hit]
+            leaf = self.left[nodes] < 0
+            leaf_rays.append(rays[leaf])
+            leaf_nodes.append(nodes[leaf])
+            rays, nodes = rays[~leaf], nodes[~leaf]
+            rays = np.concatenate((rays, rays))
+            nodes = np.concatenate((self.left[nodes], self.right[nodes]))
+        nodes = np.concatenate(leaf_nodes)
+        rays = np.repeat(np.concatenate(leaf_rays), self.count[nodes])
+        triangles = _ranges(self.start[nodes], self.count[nodes])
+        if down:
+            hits = self._down_hits(rays, triangles, origins)
+        else:
+            hits = self._ray_hits(rays, triangles, origins, directions)
+        return self._nearest_hits(len(origins), rays, triangles, *hits)
+
+    def _slab_box_hits(self, origins, directions):
+        """Returns a test of which rays hit which node bounds"""
+        # Tiny stand-ins for zero components keep the slab test free of
+        # 0 * inf on rays running along a box face.
+        inverse = 1.0 / np.where(np.abs(directions) < 1e-12, 1e-12,
+                                 directions)
+
+        def box_hits(rays, nodes):
+            near = (self.lower[nodes] - origins[rays]) * inverse[rays]
+            far = (self.upper[nodes] - origins[rays]) * inverse[rays]
+            exit_ = np.maximum(near, far).min(axis=1)
+            return (np.minimum(near, far).max(axis=1) <= exit_) & \
+                (exit_ >= 0.0)
+        return box_hits
+
+    def _down_box_hits(self, origins):
+        """Returns the box test of rays pointing straight down
+
+        Such a ray hits a box when its origin lies within the box's X
+        and Z extent and above the box's bottom, which is several times
+        cheaper than the general slab test.
+        """
+        x, y, z = origins.T.copy()
+        lower_x, lower_y, lower_z, upper_x, _, upper_z = self.bound_columns
+
+        def box_hits(rays, nodes):
+            ray_x, ray_z = x[rays], z[rays]
+            return (lower_x[nodes] <= ray_x) & (ray_x <= upper_x[nodes]) & \
+                (lower_z[nodes] <= ray_z) & (ray_z <= upper_z[nodes]) & \
+                (lower_y[nodes] <= y[rays])
+        return box_hits
+
+    def _ray_hits(self, rays, triangles, origins, directions):
+        """Moller-Trumbore test of ray and triangle pairs
+
+        Returns the barycentric u and v and the distance t of each pair,
+        NaN where the ray runs parallel to the triangle.
+        """
+        ray_directions = directions[rays]
+        edge1, edge2 = self.edge1[triangles], self.edge2[triangles]
+        p = np.cross(ray_directions, edge2)
+        determinant = np.einsum("ij,ij->i", p, edge1)
+        parallel = np.abs(determinant) < 1e-12
+        inverse = 1.0 / np.where(parallel, 1.0, determinant)
+        s = origins[rays] - self.v0[triangles]
+        u = np.einsum("ij,ij->i", s, p) * inverse
+        q = np.cross(s, edge1)
+        v = np.einsum("ij,ij->i", q, ray_directions) * inverse
+        t = np.einsum("ij,ij->i", q, edge2) * inverse
+        t[parallel] = np.nan
+        return u, v, t
+
+    def _down_hits(self, rays, triangles, origins):
+        """Returns what _ray_hits does for rays pointing straight down
+
+        With the direction fixed the cross products drop to their X and Z
+        terms, and t follows from the height of the hit point.
+        """
+        edge1, edge2 = self.edge1[triangles], self.edge2[triangles]
+        s = origins[rays] - self.v0[triangles]
+        determinant = edge2[:, 0] * edge1[:, 2] - edge2[:, 2] * edge1[:, 0]
+        parallel = np.abs(determinant) < 1e-12
+        inverse = 1.0 / np.where(parallel, 1.0, determinant)
+        u = (s[:, 2] * edge2[:, 0] - s[:, 0] * edge2[:, 2]) * inverse
+        v = (s[:, 0] * edge1[:, 2] - s[:, 2] * edge1[:, 0]) * inverse
+        t = s[:, 1] - u * edge1[:, 1] - v * edge2[:, 1]
+        t[parallel] = np.nan
+        return u, v, t
+
+    def _nearest_hits(self, ray_count, rays, triangles, u, v, t):
+        """Keeps the nearest valid hit of every ray"""
+        valid = (u >= -1e-9) & (v >= -1e-9) & (u + v <= 1.0 + 1e-9) & \
+            (t >= 0.0)
+        rays, triangles, u, v, t = rays[valid], triangles[valid], \
+            u[valid], v[valid], t[valid]
+        nearest = np.lexsort((t, rays))
+        nearest = nearest[np.r_[True, np.diff(rays[nearest]) != 0]] \
+            if len(nearest) else nearest
+        rays = rays[nearest]
+        triangle_ids = np.full(ray_count, -1)
+        distances = np.full(ray_count, np.inf)
+        weights = np.zeros((ray_count, 3))
+        triangle_ids[rays] = self.order[triangles[nearest]]
+        distances[rays] = t[nearest]
+        weights[rays] = np.stack((1.0 - u[nearest] - v[nearest], u[nearest],
+                                  v[nearest]), axis=1)
+        return triangle_ids, distances, weights
+
+
+def morton_codes(points):
+    """Returns Morton codes interleaving MORTON_BITS bits per axis
+
+    Points are quantized within the cube around their bounding box, the
+    same scale on every axis, so nearby points get nearby codes and a
+    flat target is not split across its thin axis first.
+    """
+    if not len(points):
+        return np.zeros(0, dtype=np.uint64)
+    lower = points.min(axis=0)
+    extent = max(np.ptp(points, axis=0).max(), 1e-12)
+    scale = (1 << MORTON_BITS) - 1
+    cells = ((points - lower) / extent * scale).astype(np.uint64)
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for axis in range(3):
+        codes |= _spread_bits(cells[:, axis]) << np.uint64(2 - axis)
+    return codes
+
+
+def _morton_splits(codes, starts, counts):
+    """Returns where each sorted range of codes splits, from its start
+
+    Ranges split at the first code with the highest bit differing
+    between their first and last codes set. Ranges of equal codes split
+    in half.
+    """
+    first = codes[starts]
+    last = codes[starts + counts - 1]
+    differing = first ^ last
+    splits = counts // 2
+    unequal = differing > 0
+    differing = differing[unequal]
+    # float64 rounds some values up to the next power of two, fix those
+    bits = np.floor(np.log2(differing.astype(np.float64))).astype(np.uint64)
+    bits -= (differing >> bits) == 0
+    prefixes = (last[unequal] >> bits) << bits
+    splits[unequal] = np.searchsorted(codes, prefixes) - starts[unequal]
+    return splits
+
+
+def _spread_bits(values):
+    """Moves bit i of each value to bit 3 * i"""
+    for shift, mask in ((32, 0x1f00000000ffff), (16, 0x1f0000ff0000ff),
+                        (8, 0x100f00f00f00f00f), (4, 0x10c30c30c30c30c3),
+                        (2, 0x1249249249249249)):
+        values = (values | values << np.uint64(shift)) & np.uint64(mask)
+    return values
+
+
+def _ranges(starts, counts):
+    """Returns the concatenated index ranges [start, start + count)"""
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + np.arange(counts.sum()) - offsets
+
+
+def _segment_reduce(ufunc, values, starts, counts):
+    """Reduces (n, 3) values over the rows of each [start, start + count)
+
+    Segments may leave gaps and come in any order but must not be empty.
+    """
+    order = np.argsort(starts)
+    bounds = np.stack((starts[order], starts[order] + counts[order]),
+                      axis=1).ravel()
+    padded = np.vstack((values, values[-1:]))
+    reduced = np.empty((len(starts), values.shape[1]))
+    reduced[order] = ufunc.reduceat(padded, bounds)[::2]
+    return reduced
+
+
+def mesh_bvh(mesh_data, indices=None):
+    """Returns the cached TriangleBVH of a mesh, building it if needed
+
+    When vertex indices are given only triangles with all three corners
+    in them are included. The tree is cached per mesh name and
+    triangle set, a mesh whose points moved since only has its bounds
+    refit.
+    """
+    triangles = mesh_data.triangles
+    topology = hashlib.sha1(triangles.tobytes())
+    if indices is not None and len(indices) < len(mesh_data):
+        topology.update(np.asarray(indices, dtype=np.int32).tobytes())
+        selected = np.zeros(len(mesh_data), dtype=bool)
+        selected[indices] = True
+        triangles = triangles[selected[triangles].all(axis=1)]
+    topology = topology.hexdigest()
+    points = hashlib.sha1(mesh_data.positions.tobytes()).hexdigest()
+    cached = _bvhs.get(mesh_data.name)
+    if cached is None or cached[0] != topology:
+        cached = [topology, points, TriangleBVH(mesh_data.positions,
+                                                triangles)]
+        _bvhs[mesh_data.name] = cached
+    elif cached[1] != points:
+        cached[2].refit(mesh_data.positions)
+        cached[1] = points
+    return cached[2]
+
+
+def region_origins(path, count, rng):
+    """Returns count random XZ points inside a closed path
+
+    path is an (m, 3) polygon whose Y values are ignored. Points are
+    drawn in its bounding rectangle and kept with an even-odd test.
+    Fewer points are returned when MAX_REJECTION_ROUNDS draws do not
+    find enough, as for a path with next to no area in XZ.
+    """
+    corners = np.asarray(path, dtype=np.float64).reshape(-1, 3)[:, [0, 2]]
+    lower, upper = corners.min(axis=0), corners.max(axis=0)
+    kept = []
+    remaining = count
+    for _ in range(MAX_REJECTION_ROUNDS):
+        if remaining <= 0:
+            break
+        candidates = lower + (upper - lower) * rng.random_sample(
+            (max(2 * remaining, 64), 2))
+        candidates = candidates[inside_polygon(candidates, corners)]
+        kept.append(candidates[:remaining])
+        remaining -= len(kept[-1])
+    return _to_origins(np.concatenate(kept or [np.empty((0, 2))]))
+
+
+def has_region(path):
+    """Returns whether a closed path encloses an area seen from above"""
+    corners = np.asarray(path, dtype=np.float64).reshape(-1, 3)[:, [0, 2]]
+    if len(corners) < 3:
+        return False
+    following = np.roll(corners, -1, axis=0)
+    area = 0.5 * abs(np.sum(corners[:, 0] * following[:, 1]
+                            - following[:, 0] * corners[:, 1]))
+    extent = (corners.max(axis=0) - corners.min(axis=0)).max()
+    return area > 1e-6 * extent * extent
+
+
+def inside_polygon(points, corners):
+    """Returns which (n, 2) points lie inside a polygon, even-odd rule"""
+    inside = np.zeros(len(points), dtype=bool)
+    x, y = points[:, 0], points[:, 1]
+    for (x1, y1), (x2, y2) in zip(corners, np.roll(corners, -1, axis=0)):
+        crosses = (y1 > y) != (y2 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            edge_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < edge_x)
+    return inside
+
+
+def path_origins(path, count, width, rng):
+    """Returns count random XZ points in a band of width along a path
+
+    Points are spread evenly by length along the path, then pushed a
+    random distance of up to half the width to either side in XZ.
+    """
+    corners = np.asarray(path, dtype=np.float64).reshape(-1, 3)[:, [0, 2]]
+    segments = np.diff(corners, axis=0)
+    lengths = np.linalg.norm(segments, axis=1)
+    cumulative = np.cumsum(lengths)
+    if not len(cumulative) or cumulative[-1] <= 0.0:
+        return np.empty((0, 3))
+    along = rng.random_sample(count) * cumulative[-1]
+    picks = np.minimum(np.searchsorted(cumulative, along, side="right"),
+                       len(segments) - 1)
+    fraction = (along - (cumulative[picks] - lengths[picks])) / \
+        np.maximum(lengths[picks], 1e-12)
+    points = corners[picks] + segments[picks] * fraction[:, None]
+    side = np.stack((-segments[picks, 1], segments[picks, 0]), axis=1) / \
+        np.maximum(lengths[picks], 1e-12)[:, None]
+    points += side * ((rng.random_sample(count) - 0.5) * width)[:, None]
+    return _to_origins(points)
+
+
+def _to_origins(points):
+    origins = np.zeros((len(points), 3))
+    origins[:, 0] = points[:, 0]
+    origins[:, 2] = points[:, 1]
+    return origins
+
+
+def project_points(meshes, selection, origins):
+    """Casts rays down from origins onto the selected triangles
+
+    Ray origins have their height replaced by a height above every
+    target. Returns the positions of the nearest hits over all meshes,
+    unit normals interpolated from the vertex normals and the hits'
+    PointBinding. Rays that miss every mesh are dropped.
+    """
+    origins = np.array(origins, dtype=np.float64).reshape(-1, 3)
+    tops = [meshes[mesh].positions[:, 1].max() for mesh, _ in selection
+            if len(meshes[mesh])]
+    origins[:, 1] = max(tops or [0.0]) + 1.0
+    distances = np.full(len(origins), np.inf)
+    mesh_ids = np.full(len(origins), -1, dtype=np.int32)
+    vertex_ids = np.zeros((len(origins), 3), dtype=np.int32)
+    weights = np.zeros((len(origins), 3))
+    for index, (mesh, indices) in enumerate(selection):
+        bvh = mesh_bvh(meshes[mesh], indices)
+        triangle_ids, mesh_distances, mesh_weights = bvh.intersect(origins,
+                                                                   DOWN)
+        closer = mesh_distances < distances
+        distances[closer] = mesh_distances[closer]
+        mesh_ids[closer] = index
+        vertex_ids[closer] = bvh.triangles[triangle_ids[closer]]
+        weights[closer] = mesh_weights[closer]
+    hit = mesh_ids >= 0
+    mesh_ids, vertex_ids, weights = mesh_ids[hit], vertex_ids[hit], \
+        weights[hit]
+    positions = origins[hit] + distances[hit, None] * DOWN
+    normals = np.zeros((len(positions), 3))
+    for index, (mesh, _) in enumerate(selection):
+        picks = mesh_ids == index
+        normals[picks] = np.einsum(
+            "ij,ijk->ik", weights[picks],
+            meshes[mesh].normals[vertex_ids[picks]])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.maximum(lengths, 1e-12)[:, None]
+    return positions, normals, scatter_binding.PointBinding(
+        [mesh for mesh, _ in selection], mesh_ids, vertex_ids, weights)
@@ -0,0 +1,148 @@
+import hashlib
+import numpy as np
+
+_surface_samplers = {}
+
+
+class SurfaceSampler(object):
+    """Area weighted random points on the triangles of a mesh
+
+    The cumulative area table is built once, after which any number of
+    points is drawn with a binary search per point. Optional per
+    triangle weights scale each triangle's share of the points.
+    """
+
+    def __init__(self, positions, normals, triangles, weights=None):
+        self.positions = positions
+        self.normals = normals
+        self.triangles = np.asarray(triangles, dtype=np.int32).reshape(-1, 3)
+        corners = positions[self.triangles]
+        areas = 0.5 * np.linalg.norm(
+            np.cross(corners[:, 1] - corners[:, 0],
+                     corners[:, 2] - corners[:, 0]), axis=1)
+        if weights is not None:
+            areas *= weights
+        self.cdf = np.cumsum(areas)
+
+    def area(self):
+        return self.cdf[-1] if len(self.cdf) else 0.0
+
+    def sample_barycentric(self, count, rng):
+        """Returns triangle ids and (count, 3) barycentric weights"""
+        triangle_ids = np.searchsorted(
+            self.cdf, rng.random_sample(count) * self.area(), side="right")
+        triangle_ids = np.minimum(triangle_ids, len(self.cdf) - 1)
+        u, v = rng.random_sample((2, count))
+        flip = u + v > 1.0
+        u[flip] = 1.0 - u[flip]
+        v[flip] = 1.0 - v[flip]
+        return triangle_ids, np.stack((1.0 - u - v, u, v), axis=1)
+
+    def interpolate(self, triangle_ids, weights):
+        """Returns positions and unit normals at barycentric points"""
+        corners = self.triangles[triangle_ids]
+        positions = np.einsum("ij,ijk->ik", weights, self.positions[corners])
+        normals = np.einsum("ij,ijk->ik", weights, self.normals[corners])
+        lengths = np.linalg.norm(normals, axis=1)
+        return positions, normals / np.maximum(lengths, 1e-12)[:, None]
+
+
+def surface_sampler(mesh_data, indices=None, vertex_weights=None):
+    """Returns the cached SurfaceSampler of a mesh, building it if needed
+
+    When vertex indices are given only triangles with all three corners
+    in them are sampled. Vertex weights, such as placement mask values,
+    weight each triangle by the average of its corners. The cache is keyed
+    by mesh name and checked against the MeshData version and a hash of
+    the vertex subset and weights, so a hit never hashes the mesh arrays.
+    """
+    key = hashlib.sha1()
+    subset = indices is not None and len(indices) < len(mesh_data)
+    if subset:
+        key.update(np.asarray(indices, dtype=np.int32).tobytes())
+    if vertex_weights is not None:
+        vertex_weights = np.asarray(vertex_weights, dtype=np.float64)
+        key.update(vertex_weights.tobytes())
+    key = (mesh_data.version, key.hexdigest())
+    cached = _surface_samplers.get(mesh_data.name)
+    if cached is None or cached[0] != key:
+        triangles = mesh_data.triangles
+        if subset:
+            selected = np.zeros(len(mesh_data), dtype=bool)
+            selected[indices] = True
+            triangles = triangles[selected[triangles].all(axis=1)]
+        weights = None
+        if vertex_weights is not None:
+            weights = vertex_weights[triangles].mean(axis=1)
+        cached = (key, SurfaceSampler(mesh_data.positions, mesh_data.normals,
+                                      triangles, weights))
+        _surface_samplers[mesh_data.name] = cached
+    return cached[1]
+
+
+def sample_surface_barycentric(samplers, count, rng):
+    """Returns (triangle ids, barycentric weights) drawn per sampler
+
+    count points are spread over the samplers by surface area.
+    """
+    areas = np.array([sampler.area() for sampler in samplers])
+    if areas.sum() <= 0.0:
+        return []
+    counts = rng.multinomial(count, areas / areas.sum())
+    return [sampler.sample_barycentric(mesh_count, rng)
+            for sampler, mesh_count in zip(samplers, counts)]
+
+
+def interpolate_samples(samplers, samples):
+    """Returns the positions and normals of sample_surface_barycentric"""
+    if not samples:
+        return np.empty((0, 3)), np.empty((0, 3))
+    points = [sampler.interpolate(*sample)
+              for sampler, sample in zip(samplers, samples)]
+    return (np.concatenate([positions for positions, _ in points]),
+            np.concatenate([normals for _, normals in points]))
+
+
+def poisson_disk_filter(positions, radii):
+    """Returns a mask of points kept so no two overlap their radii
+
+    Points are accepted in the given order, which should already be
+    random. Accepted points are bucketed in a uniform hash grid with
+    cells as large as the biggest spacing, so each candidate only checks
+    the 27 cells around it.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64),
+                            (len(positions),))
+    keep = np.zeros(len(positions), dtype=bool)
+    if len(positions) == 0:
+        return keep
+    cell_size = max(2.0 * radii.max(), 1e-12)
+    cells = np.floor(positions / cell_size).astype(np.int64).tolist()
+    points = positions.tolist()
+    radius_list = radii.tolist()
+    offsets = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1)
+               for z in (-1, 0, 1)]
+    grid = {}
+    for index, (cell, point, radius) in enumerate(zip(cells, points,
+                                                      radius_list)):
+        if not _is_clear(grid, cell, point, radius, offsets):
+            continue
+        keep[index] = True
+        grid.setdefault(tuple(cell), []).append((point, radius))
+    return keep
+
+
+def _is_clear(grid, cell, point, radius, offsets):
+    x, y, z = point
+    for offset_x, offset_y, offset_z in offsets:
+        neighbours = grid.get((cell[0] + offset_x, cell[1] + offset_y,
+                               cell[2] + offset_z))
+        if not neighbours:
+            continue
+        for (other_x, other_y, other_z), other_radius in neighbours:
+            spacing = radius + other_radius
+            if ((x - other_x) ** 2 + (y - other_y) ** 2
+                    + (z - other_z) ** 2) < spacing * spacing:
+                return False
+    return True
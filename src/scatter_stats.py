@@ -0,0 +1,168 @@
+import cProfile
+import contextlib
+import logging
+import time
+log = logging.getLogger(__name__)
+
+
+class ScatterStats(object):
+    """Wall time per phase and call counts of a scatter run
+
+    While disabled, phase() hands out a shared no-op context and count()
+    returns at once, so instrumented code costs one attribute check.
+    While a run is recorded, the cmds global of each module in
+    command_modules is swapped for a proxy counting every Maya command.
+    Phases recorded between runs, such as selecting the target, are
+    reported with the next run.
+    """
+
+    def __init__(self, command_modules=(), enabled=False, profile_path=None):
+        self.command_modules = command_modules
+        self.enabled = enabled
+        self.profile_path = profile_path
+        self.phases = {}
+        self.counters = {}
+        self.last_report = []
+        self._profiler = None
+        self._original_commands = None
+
+    def phase(self, name):
+        """Returns a context manager timing a block as part of a phase"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        self.phases = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def run(self):
+        """Records everything inside the block as one run"""
+        self.start_run()
+        self.resume()
+        try:
+            yield self
+        finally:
+            self.pause()
+            self.finish_run()
+
+    def steps(self, steps):
+        """Records a generator driven in slices, such as scatter_steps
+
+        The profiler only runs while the generator itself runs, so time
+        spent between slices in the Maya event loop is left out.
+        """
+        self.start_run()
+        try:
+            while True:
+                self.resume()
+                try:
+                    progress = next(steps)
+                except StopIteration:
+                    return
+                finally:
+                    self.pause()
+                yield progress
+        finally:
+            steps.close()
+            self.finish_run()
+
+    def start_run(self):
+        if not self.enabled or self._original_commands is not None:
+            return
+        self._original_commands = [(module, module.cmds)
+                                   for module in self.command_modules]
+        for module, commands in self._original_commands:
+            module.cmds = CountingCommands(commands, self)
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+
+    def resume(self):
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def pause(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    def finish_run(self):
+        """Restores the commands, logs the report and saves the profile"""
+        if self._original_commands is None:
+            return
+        for module, commands in self._original_commands:
+            module.cmds = commands
+        self._original_commands = None
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+            log.info("Scatter profile saved to %s", self.profile_path)
+        self.last_report = self.report_lines()
+        for line in self.last_report:
+            log.info(line)
+        self.reset()
+
+    def report_lines(self):
+        """Returns the phases, slowest first, followed by the counters"""
+        lines = ["%-20s %9.3f s  %6d calls" % (name, seconds, calls)
+                 for name, (seconds, calls) in sorted(
+                     self.phases.items(), key=lambda item: -item[1][0])]
+        lines += ["%-32s %8d" % (name, count)
+                  for name, count in sorted(self.counters.items())]
+        return lines
+
+
+class _Phase(object):
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.add_time(self.name, time.time() - self.start)
+        return False
+
+
+class _NullPhase(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class CountingCommands(object):
+    """Stands in for maya.cmds, counting each command before calling it"""
+
+    def __init__(self, commands, stats):
+        self._commands = commands
+        self._stats = stats
+
+    def __getattr__(self, name):
+        command = getattr(self._commands, name)
+        if not callable(command):
+            return command
+        stats = self._stats
+
+        def counted(*args, **kwargs):
+            stats.count("cmds." + name)
+            return command(*args, **kwargs)
+        return counted
@@ -0,0 +1,836 @@
+"""Qt dialog of the scatter tool
+
+Imported on first use of scatter.ScatterUI(), so batch and mayapy
+sessions that only use the scatter core never load Qt.
+"""
+import collections
+import logging
+import random
+from PySide2 import QtWidgets, QtCore
+from shiboken2 import isValid, wrapInstance
+import maya.OpenMayaUI as omui
+import scatter
+import scatter_layout
+import scatter_masks
+log = logging.getLogger(__name__)
+AXIS_NAMES = ["X", "Y", "Z"]
+AXES = [scatter_layout.X_AXIS, scatter_layout.Y_AXIS, scatter_layout.Z_AXIS]
+MAX_SEED = 2147483647
+PREVIEW_DELAY_MS = 200
+PROGRESS_STEPS = 1000
+OUTPUT_MODES = ["Instances", "Point Instancer"]
+SAMPLE_MODES = ["Target Vertices", "Surface Area", "Projected From Curve"]
+LAYOUT_FILE_FILTER = "Scatter Layouts (*.sclayout)"
+DENSITY_MAP_FILTER = "Images (*.png *.jpg *.jpeg *.tif *.tiff *.exr *.iff);;" \
+                     "NumPy Arrays (*.npy)"
+ROTATION_FIELD = (QtWidgets.QSpinBox, 0, 360, (0, 360), 10)
+SCALE_FIELD = (QtWidgets.QDoubleSpinBox, 0.1, 10, (1.0, 1.0), .1)
+RangeRow = collections.namedtuple(
+    "RangeRow", "layout label label_names spinbox_names attributes field "
+                "spacing")
+RANGE_ROWS = [
+    RangeRow("xrot_rand_lay", "X Rotation Variation",
+             ("x_min_lbl", "x_max_lbl"), ("xrot_min", "xrot_max"),
+             ("scatter_x_min", "scatter_x_max"), ROTATION_FIELD, 20),
+    RangeRow("yrot_rand_lay", "Y Rotation Variation",
+             ("y_min_lbl", "y_max_lbl"), ("yrot_min", "yrot_max"),
+             ("scatter_y_min", "scatter_y_max"), ROTATION_FIELD, 20),
+    RangeRow("zrot_rand_lay", "Z Rotation Variation",
+             ("z_min_lbl", "z_max_lbl"), ("zrot_min", "zrot_max"),
+             ("scatter_z_min", "scatter_z_max"), ROTATION_FIELD, 20),
+    RangeRow("xscale_rand_lay", "Scale X Variation",
+             ("scale_xmin_lbl", "scale_xmax_lbl"),
+             ("scale_xmin", "scale_xmax"),
+             ("scatter_scale_xmin", "scatter_scale_xmax"), SCALE_FIELD, 40),
+    RangeRow("yscale_rand_lay", "Scale Y Variation",
+             ("scale_ymin_lbl", "scale_ymax_lbl"),
+             ("scale_ymin", "scale_ymax"),
+             ("scatter_scale_ymin", "scatter_scale_ymax"), SCALE_FIELD, 20),
+    RangeRow("zscale_rand_lay", "Scale Z Variation",
+             ("scale_zmin_lbl", "scale_zmax_lbl"),
+             ("scale_zmin", "scale_zmax"),
+             ("scatter_scale_zmin", "scatter_scale_zmax"), SCALE_FIELD, 20),
+]
+_dialog = None
+
+
+def dialog():
+    """Returns the tool's single dialog, creating it if needed
+
+    A dialog deleted by Qt, e.g. when Maya's main window was rebuilt,
+    is replaced by a new one.
+    """
+    global _dialog
+    if _dialog is None or not isValid(_dialog):
+        _dialog = ScatterUI()
+    else:
+        _dialog.raise_()
+        _dialog.activateWindow()
+    return _dialog
+
+
+def maya_main_window():
+    """Return the maya main window widget"""
+    main_window = omui.MQtUtil.mainWindow()
+    return wrapInstance(long(main_window), QtWidgets.QWidget)
+
+
+class ScatterUI(QtWidgets.QDialog):
+    """Scatter Tool UI Class"""
+
+    def __init__(self):
+        super(ScatterUI, self).__init__(parent=maya_main_window())
+        self.setWindowTitle("Scatter Tool")
+        self.setMinimumWidth(500)
+        self.setMaximumWidth(1000)
+        self.setMaximumHeight(1560)
+        self.setWindowFlags(self.windowFlags() ^
+                            QtCore.Qt.WindowContextHelpButtonHint)
+        self.create_ui()
+        self.create_preview_timer()
+        self.create_connections()
+        self.scatterobject = scatter.ScatterObject()
+
+    def create_ui(self):
+        self.title_lbl = QtWidgets.QLabel("Scatter Tool")
+        self.title_lbl.setStyleSheet("font: bold 20px")
+        layout = self.layout_setup()
+        layout.addWidget(self.title_lbl)
+        layout.addLayout(self.scatter_field_lay)
+        layout.addLayout(self.align_to_normals_lay)
+        for row in RANGE_ROWS:
+            layout.addLayout(getattr(self, row.layout))
+        layout.addLayout(self.selected_vert_perc_rand_lay)
+        layout.addLayout(self.sample_mode_lay)
+        layout.addLayout(self.placement_masks_lay)
+        layout.addLayout(self.camera_culling_lay)
+        layout.addLayout(self.target_binding_lay)
+        layout.addLayout(self.output_mode_lay)
+        layout.addLayout(self.seed_lay)
+        layout.addStretch()
+        layout.addLayout(self.bottom_button_rand_lay)
+        layout.addLayout(self.stats_lay)
+        return layout
+
+    def layout_setup(self):
+        """Sets row min heights to fix layout spacing"""
+        main_lay = QtWidgets.QVBoxLayout()
+        self.layout_creation()
+        self.xrot_rand_lay.setRowMinimumHeight(1, 20)
+        self.selected_vert_perc_rand_lay.setRowMinimumHeight(0, 40)
+        self.bottom_button_rand_lay.setRowMinimumHeight(0, 20)
+        self.setLayout(main_lay)
+        return main_lay
+
+    def layout_creation(self):
+        """Assigns variable names to method calls"""
+        self.scatter_field_lay = self._create_scatter_field_ui()
+        self.align_to_normals_lay = self._create_align_to_normals_ui()
+        self._create_range_rows_ui()
+        self.selected_vert_perc_rand_lay = \
+            self._create_selected_vert_percentage_ui()
+        self.sample_mode_lay = self._create_sample_mode_ui()
+        self.placement_masks_lay = self._create_placement_masks_ui()
+        self.camera_culling_lay = self._create_camera_culling_ui()
+        self.target_binding_lay = self._create_target_binding_ui()
+        self.output_mode_lay = self._create_output_mode_ui()
+        self.seed_lay = self._create_seed_ui()
+        self.bottom_button_rand_lay = self._create_bottom_buttons_ui()
+        self.stats_lay = self._create_stats_ui()
+
+    def create_preview_timer(self):
+        """Debounces live preview updates while values are being edited"""
+        self.preview_timer = QtCore.QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self.scatter_timer = QtCore.QTimer(self)
+        self.scatter_timer.setInterval(0)
+        self.scatter_run = None
+
+    def create_connections(self):
+        """Connects Signals and Slots"""
+        self.scatter_btn.clicked.connect(self._scatter_click)
+        self.reset_btn.clicked.connect(self._reset_click)
+        self.new_seed_btn.clicked.connect(self._new_seed_click)
+        self.scatter_obj_pb.clicked.connect(self._select_scatter_object_click)
+        self.scatter_targ_pb.clicked.connect(self._select_scatter_target_click)
+        self.align_to_normals.clicked.connect(self._align_to_normals_click)
+        self.align_to_normals_and_rotation.clicked.connect(
+            self._align_to_normals_and_random_rotate_click)
+        self.live_preview.toggled.connect(self._live_preview_toggled)
+        self.preview_timer.timeout.connect(self._update_live_preview)
+        self.scatter_timer.timeout.connect(self._scatter_step)
+        self.cancel_btn.clicked.connect(self._cancel_click)
+        self.stats_toggle.toggled.connect(self._stats_toggled)
+        self.save_layout_btn.clicked.connect(self._save_layout_click)
+        self.load_layout_btn.clicked.connect(self._load_layout_click)
+        self.density_map_pb.clicked.connect(self._density_map_click)
+        self.cull_camera_pb.clicked.connect(self._select_cull_camera_click)
+        self.projection_curve_pb.clicked.connect(
+            self._select_projection_curve_click)
+        self.follow_target.toggled.connect(self._follow_target_toggled)
+        self.update_bound_btn.clicked.connect(self._update_bound_click)
+        self.bake_bound_btn.clicked.connect(self._bake_bound_click)
+        self._connect_live_preview_fields()
+
+    def _connect_live_preview_fields(self):
+        for spinbox in self._range_spinboxes() + [
+                self.obj_embed_offset, self.selected_vert_perc,
+                self.surface_count, self.min_spacing, self.seed,
+                self.slope_min, self.slope_max, self.height_min,
+                self.height_max, self.frustum_padding, self.thin_distance,
+                self.projection_width]:
+            spinbox.valueChanged.connect(self._schedule_live_preview)
+        for checkbox in (self.align_to_normals,
+                         self.align_to_normals_and_rotation,
+                         self.spacing_uses_scale, self.limit_slope,
+                         self.limit_height):
+            checkbox.toggled.connect(self._schedule_live_preview)
+        for combobox in (self.aim_axis_cb, self.up_axis_cb,
+                         self.sample_mode_cb, self.color_channel_cb):
+            combobox.currentIndexChanged.connect(self._schedule_live_preview)
+        self.density_map.editingFinished.connect(self._schedule_live_preview)
+        self.prototype_weights.editingFinished.connect(
+            self._schedule_live_preview)
+        self.cull_camera.editingFinished.connect(self._schedule_live_preview)
+        self.projection_curve.editingFinished.connect(
+            self._schedule_live_preview)
+
+    @QtCore.Slot()
+    def _select_scatter_object_click(self):
+        """Sets scatter object to name of last selected object"""
+        self._set_selected_scatter_object()
+
+    @QtCore.Slot()
+    def _select_scatter_target_click(self):
+        """Sets scatter object to name of last selected object"""
+        self._set_selected_scatter_target()
+
+    @QtCore.Slot()
+    def _align_to_normals_click(self):
+        """Aligns to normals when box is checked"""
+        self._set_align_to_normals_values()
+
+    @QtCore.Slot()
+    def _align_to_normals_and_random_rotate_click(self):
+        """Aligns to normals when box is checked"""
+        self._set_align_to_normals_values_and_rotate_randomly()
+
+    @QtCore.Slot()
+    def _scatter_click(self):
+        """Scatters object with randomization specifications"""
+        if len(self.scatter_obj.text()) <= 0:
+            log.warning("Scatter Failed: Scatter Object Not Selected. Select "
+                        "a Scatter Object to fix this.")
+        elif len(self.scatter_targ.text()) <= 0:
+            log.warning("Scatter Failed: Scatter Destination Object Not "
+                        "Selected. Select a Scatter Object to fix this.")
+        elif self.live_preview.isChecked() and \
+                self.output_mode_cb.currentIndex() == 0:
+            self._set_scatterobject_properties_from_ui()
+            self.scatterobject.update_preview()
+            self.scatterobject.keep_preview()
+            self.live_preview.setChecked(False)
+            self._show_stats()
+        elif self.scatter_run is None and \
+                not self.scatterobject.layout_busy():
+            self._set_scatterobject_properties_from_ui()
+            self.scatter_run = self.scatterobject.scatter_steps()
+            self.progress_bar.setValue(0)
+            self.scatter_btn.setEnabled(False)
+            self.cancel_btn.setEnabled(True)
+            self.scatter_timer.start()
+
+    @QtCore.Slot()
+    def _scatter_step(self):
+        """Runs one time slice of the scatter in progress"""
+        if self.scatter_run is None:
+            # Cancelled, waiting for the layout thread to exit
+            if not self.scatterobject.layout_busy():
+                self.scatter_timer.stop()
+                self.scatter_btn.setEnabled(True)
+            return
+        try:
+            progress = next(self.scatter_run)
+        except StopIteration:
+            self.progress_bar.setValue(PROGRESS_STEPS)
+            self._finish_scatter_run()
+        except Exception:
+            self._finish_scatter_run()
+            raise
+        else:
+            self.progress_bar.setValue(int(progress * PROGRESS_STEPS))
+
+    @QtCore.Slot()
+    def _cancel_click(self):
+        """Stops the scatter in progress, keeping or removing its group"""
+        if self.scatter_run is not None:
+            self.scatter_run.close()
+            self.progress_bar.setValue(0)
+            self._finish_scatter_run()
+            log.warning("Scatter cancelled.")
+
+    def _finish_scatter_run(self):
+        """Ends the run, Scatter stays disabled until its thread exits"""
+        self.scatter_run = None
+        self.cancel_btn.setEnabled(False)
+        if not self.scatterobject.layout_busy():
+            self.scatter_timer.stop()
+            self.scatter_btn.setEnabled(True)
+        self._show_stats()
+
+    def _show_stats(self):
+        """Shows the report of the last recorded run in the stats panel"""
+        if self.record_stats.isChecked():
+            self.stats_text.setPlainText(
+                "\n".join(self.scatterobject.stats.last_report))
+
+    @QtCore.Slot(bool)
+    def _stats_toggled(self, checked):
+        """Expands or collapses the run statistics panel"""
+        self.stats_panel.setVisible(checked)
+        self.stats_toggle.setArrowType(QtCore.Qt.DownArrow if checked
+                                       else QtCore.Qt.RightArrow)
+
+    def _schedule_live_preview(self, *args):
+        """Restarts the debounce timer when live preview is enabled"""
+        if self.live_preview.isChecked():
+            self.preview_timer.start()
+
+    @QtCore.Slot()
+    def _update_live_preview(self):
+        """Pushes the current field values onto the preview instances"""
+        if self.scatter_run is not None or \
+                self.scatterobject.layout_busy():
+            self.preview_timer.start()
+        elif self.live_preview.isChecked() and \
+                len(self.scatter_obj.text()) > 0 and \
+                len(self.scatter_targ.text()) > 0:
+            self._set_scatterobject_properties_from_ui()
+            self.scatterobject.update_preview()
+            self._show_stats()
+
+    @QtCore.Slot(bool)
+    def _live_preview_toggled(self, checked):
+        """Starts the live preview or removes the preview instances"""
+        if checked:
+            self.preview_timer.start()
+        else:
+            self.preview_timer.stop()
+            self.scatterobject.clear_preview()
+
+    @QtCore.Slot()
+    def _new_seed_click(self):
+        """Picks a new random seed so the next scatter is resampled"""
+        self.seed.setValue(random.randint(0, MAX_SEED))
+
+    @QtCore.Slot()
+    def _save_layout_click(self):
+        """Saves the last scattered layout to a layout file"""
+        path = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save Scatter Layout", "", LAYOUT_FILE_FILTER)[0]
+        if path:
+            self.scatterobject.save_layout_file(path)
+
+    @QtCore.Slot()
+    def _load_layout_click(self):
+        """Scatters the object being scattered using a saved layout file"""
+        path = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Apply Scatter Layout", "", LAYOUT_FILE_FILTER)[0]
+        if path:
+            self.scatterobject.apply_layout_file(path)
+            self.scatter_obj.setText(self.scatterobject.current_object_def)
+
+    @QtCore.Slot()
+    def _select_cull_camera_click(self):
+        """Sets the culling camera to the selected camera"""
+        self.scatterobject.select_cull_camera()
+        self.cull_camera.setText(self.scatterobject.cull_camera or "")
+        self._schedule_live_preview()
+
+    @QtCore.Slot()
+    def _select_projection_curve_click(self):
+        """Sets the projection curve to the selected curve"""
+        self.scatterobject.select_projection_curve()
+        self.projection_curve.setText(
+            self.scatterobject.projection_curve or "")
+        self._schedule_live_preview()
+
+    @QtCore.Slot(bool)
+    def _follow_target_toggled(self, checked):
+        """Starts or stops moving bound instances when time changes"""
+        self.scatterobject.follow_time_changes(checked)
+
+    @QtCore.Slot()
+    def _update_bound_click(self):
+        """Moves the bound instances onto the target's current shape"""
+        self.scatterobject.update_bound_instances()
+
+    @QtCore.Slot()
+    def _bake_bound_click(self):
+        """Keys the bound instances following the target over the range"""
+        self.follow_target.setChecked(False)
+        self.scatterobject.bake_bound_instances(self.bake_start.value(),
+                                                self.bake_end.value(),
+                                                self.bake_step.value())
+
+    @QtCore.Slot()
+    def _density_map_click(self):
+        """Picks the image used as placement density map"""
+        path = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Choose Density Map", "", DENSITY_MAP_FILTER)[0]
+        if path:
+            self.density_map.setText(path)
+            self._schedule_live_preview()
+
+    @QtCore.Slot()
+    def _reset_click(self):
+        """Reset UI values to default"""
+        self._reset_scatterobject_properties_from_ui()
+
+    def _create_scatter_field_ui(self):
+        layout = self._create_scatter_field_headers()
+        self.scatter_obj = QtWidgets.QLineEdit()
+        self.scatter_obj.setMinimumWidth(100)
+        self.scatter_obj_pb = QtWidgets.QPushButton("Select")
+        self.scatter_obj_pb.setFixedWidth(50)
+        self.scatter_targ = QtWidgets.QLineEdit()
+        self.scatter_targ.setMinimumWidth(100)
+        self.scatter_targ_pb = QtWidgets.QPushButton("Select")
+        self.scatter_targ_pb.setFixedWidth(50)
+        layout.addWidget(self.scatter_obj, 1, 0)
+        layout.addWidget(self.scatter_obj_pb, 1, 2)
+        layout.addWidget(self.scatter_targ, 1, 3)
+        layout.addWidget(self.scatter_targ_pb, 1, 4)
+        self.prototype_weights_lbl = QtWidgets.QLabel(
+            "Object Weights (comma separated)")
+        self.prototype_weights = QtWidgets.QLineEdit()
+        self.prototype_weights.setPlaceholderText("equal")
+        self.prototype_weights.setMinimumWidth(100)
+        layout.addWidget(self.prototype_weights_lbl, 2, 0)
+        layout.addWidget(self.prototype_weights, 3, 0)
+        return layout
+
+    def _create_align_to_normals_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.align_to_normals = QtWidgets.QCheckBox("Align to Normals")
+        layout.addWidget(self.align_to_normals, 2, 0)
+        self.align_to_normals_and_rotation \
+            = QtWidgets.QCheckBox("Align to Normals with Random Rotation")
+        layout.addWidget(self.align_to_normals_and_rotation, 2, 1)
+        self.aim_axis_lbl = QtWidgets.QLabel("Normal Aim Axis")
+        self.up_axis_lbl = QtWidgets.QLabel("Normal Up Axis")
+        self.aim_axis_cb = QtWidgets.QComboBox()
+        self.aim_axis_cb.addItems(AXIS_NAMES)
+        self.up_axis_cb = QtWidgets.QComboBox()
+        self.up_axis_cb.addItems(AXIS_NAMES)
+        self.up_axis_cb.setCurrentIndex(1)
+        layout.addWidget(self.aim_axis_lbl, 3, 0)
+        layout.addWidget(self.up_axis_lbl, 3, 1)
+        layout.addWidget(self.aim_axis_cb, 4, 0)
+        layout.addWidget(self.up_axis_cb, 4, 1)
+        return layout
+
+    def _set_align_to_normals_values(self):
+        if self.align_to_normals.isChecked():
+            self.align_to_normals_and_rotation.setChecked(False)
+            self.scatterobject.form_of_scatter = 1
+        else:
+            self.scatterobject.form_of_scatter = 0
+
+    def _set_align_to_normals_values_and_rotate_randomly(self):
+        if self.align_to_normals_and_rotation.isChecked():
+            self.align_to_normals.setChecked(False)
+            self.scatterobject.form_of_scatter = 2
+        else:
+            self.scatterobject.form_of_scatter = 0
+
+    def _create_range_rows_ui(self):
+        """Builds a minimum and maximum spinbox row per RANGE_ROWS entry"""
+        for row in RANGE_ROWS:
+            layout = QtWidgets.QGridLayout()
+            layout.setRowMinimumHeight(0, row.spacing)
+            spinbox_class, minimum, maximum, defaults, step = row.field
+            for column, (label_name, spinbox_name, bound, default) in \
+                    enumerate(zip(row.label_names, row.spinbox_names,
+                                  ("Minimum", "Maximum"), defaults)):
+                label = QtWidgets.QLabel("%s %s" % (row.label, bound))
+                spinbox = spinbox_class()
+                spinbox.setMinimum(minimum)
+                spinbox.setMaximum(maximum)
+                spinbox.setValue(default)
+                spinbox.setMinimumWidth(100)
+                spinbox.setSingleStep(step)
+                layout.addWidget(label, 1, column)
+                layout.addWidget(spinbox, 2, column)
+                setattr(self, label_name, label)
+                setattr(self, spinbox_name, spinbox)
+            setattr(self, row.layout, layout)
+
+    def _range_spinboxes(self):
+        return [getattr(self, name) for row in RANGE_ROWS
+                for name in row.spinbox_names]
+
+    def _create_selected_vert_percentage_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.selected_vert_lbl = QtWidgets.QLabel("Target Vertices Random "
+                                                  "Scatter Percentage")
+        self.obj_embed_offset_lbl = QtWidgets.QLabel("Scatter Object Embed "
+                                                     "Position Offset")
+        self._set_selected_vert_percentage_spinbox()
+        self._create_y_position_offset_spinbox()
+        layout.addWidget(self.selected_vert_lbl, 14, 0)
+        layout.addWidget(self.obj_embed_offset_lbl, 14, 1)
+        layout.addWidget(self.selected_vert_perc, 15, 0)
+        layout.addWidget(self.obj_embed_offset, 15, 1)
+        return layout
+
+    def _create_y_position_offset_spinbox(self):
+        self.obj_embed_offset = QtWidgets.QDoubleSpinBox()
+        self.obj_embed_offset.setMinimum(-10)
+        self.obj_embed_offset.setValue(0)
+        self.obj_embed_offset.setMaximum(10)
+        self.obj_embed_offset.setMinimumWidth(100)
+        self.obj_embed_offset.setSingleStep(.1)
+
+    def _set_selected_vert_percentage_spinbox(self):
+        self.selected_vert_perc = QtWidgets.QSpinBox()
+        self.selected_vert_perc.setMinimum(0)
+        self.selected_vert_perc.setMaximum(100)
+        self.selected_vert_perc.setValue(100)
+        self.selected_vert_perc.setMinimumWidth(100)
+        self.selected_vert_perc.setSingleStep(5)
+
+    def _create_sample_mode_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.sample_mode_lbl = QtWidgets.QLabel("Scatter Point Placement")
+        self.surface_count_lbl = QtWidgets.QLabel(
+            "Surface Area / Projected Point Count")
+        self.sample_mode_cb = QtWidgets.QComboBox()
+        self.sample_mode_cb.addItems(SAMPLE_MODES)
+        self.sample_mode_cb.setMinimumWidth(100)
+        self.surface_count = QtWidgets.QSpinBox()
+        self.surface_count.setMinimum(0)
+        self.surface_count.setMaximum(10000000)
+        self.surface_count.setValue(1000)
+        self.surface_count.setMinimumWidth(100)
+        self.surface_count.setSingleStep(100)
+        layout.addWidget(self.sample_mode_lbl, 16, 0)
+        layout.addWidget(self.surface_count_lbl, 16, 1)
+        layout.addWidget(self.sample_mode_cb, 17, 0)
+        layout.addWidget(self.surface_count, 17, 1)
+        self.min_spacing_lbl = QtWidgets.QLabel("Minimum Instance Spacing")
+        self.min_spacing = QtWidgets.QDoubleSpinBox()
+        self.min_spacing.setMinimum(0)
+        self.min_spacing.setMaximum(1000)
+        self.min_spacing.setMinimumWidth(100)
+        self.min_spacing.setSingleStep(.1)
+        self.spacing_uses_scale = QtWidgets.QCheckBox(
+            "Scale Spacing by Instance Scale")
+        layout.addWidget(self.min_spacing_lbl, 18, 0)
+        layout.addWidget(self.min_spacing, 19, 0)
+        layout.addWidget(self.spacing_uses_scale, 19, 1)
+        self.projection_curve_lbl = QtWidgets.QLabel("Projection Curve")
+        self.projection_curve = QtWidgets.QLineEdit()
+        self.projection_curve.setMinimumWidth(100)
+        self.projection_curve_pb = QtWidgets.QPushButton("Select")
+        self.projection_curve_pb.setFixedWidth(50)
+        self.projection_width_lbl = QtWidgets.QLabel(
+            "Band Width (0 = Enclosed Region)")
+        self.projection_width = self._create_mask_spinbox(0, 100000, 0, 1)
+        layout.addWidget(self.projection_curve_lbl, 20, 0)
+        layout.addWidget(self.projection_width_lbl, 20, 1)
+        layout.addWidget(self.projection_curve, 21, 0)
+        layout.addWidget(self.projection_curve_pb, 21, 2)
+        layout.addWidget(self.projection_width, 21, 1)
+        return layout
+
+    def _create_placement_masks_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.limit_slope = QtWidgets.QCheckBox("Limit Slope from Up (Degrees)")
+        self.slope_min = self._create_mask_spinbox(0, 180, 0, 5)
+        self.slope_max = self._create_mask_spinbox(0, 180, 30, 5)
+        self.limit_height = QtWidgets.QCheckBox("Limit World Height Band")
+        self.height_min = self._create_mask_spinbox(-100000, 100000, 0, 1)
+        self.height_max = self._create_mask_spinbox(-100000, 100000, 10, 1)
+        self.color_channel_lbl = QtWidgets.QLabel("Vertex Color Density")
+        self.color_channel_cb = QtWidgets.QComboBox()
+        self.color_channel_cb.addItems(["None"] + scatter_masks.COLOR_CHANNELS)
+        self.density_map_lbl = QtWidgets.QLabel("Density Map (UV)")
+        self.density_map = QtWidgets.QLineEdit()
+        self.density_map.setMinimumWidth(100)
+        self.density_map_pb = QtWidgets.QPushButton("Browse")
+        self.density_map_pb.setFixedWidth(50)
+        layout.addWidget(self.limit_slope, 0, 0)
+        layout.addWidget(self.slope_min, 0, 1)
+        layout.addWidget(self.slope_max, 0, 2)
+        layout.addWidget(self.limit_height, 1, 0)
+        layout.addWidget(self.height_min, 1, 1)
+        layout.addWidget(self.height_max, 1, 2)
+        layout.addWidget(self.color_channel_lbl, 2, 0)
+        layout.addWidget(self.density_map_lbl, 2, 1)
+        layout.addWidget(self.color_channel_cb, 3, 0)
+        layout.addWidget(self.density_map, 3, 1, 1, 2)
+        layout.addWidget(self.density_map_pb, 3, 3)
+        return layout
+
+    def _create_mask_spinbox(self, minimum, maximum, value, step):
+        spinbox = QtWidgets.QDoubleSpinBox()
+        spinbox.setMinimum(minimum)
+        spinbox.setMaximum(maximum)
+        spinbox.setValue(value)
+        spinbox.setMinimumWidth(100)
+        spinbox.setSingleStep(step)
+        return spinbox
+
+    def _create_camera_culling_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.cull_camera_lbl = QtWidgets.QLabel("Cull to Camera View")
+        self.cull_camera = QtWidgets.QLineEdit()
+        self.cull_camera.setPlaceholderText("no culling")
+        self.cull_camera.setMinimumWidth(100)
+        self.cull_camera_pb = QtWidgets.QPushButton("Select")
+        self.cull_camera_pb.setFixedWidth(50)
+        self.frustum_padding_lbl = QtWidgets.QLabel("Frame Padding")
+        self.frustum_padding = self._create_mask_spinbox(0, 2, 0.1, .05)
+        self.thin_distance_lbl = QtWidgets.QLabel(
+            "Thin Beyond Distance (0 = Off)")
+        self.thin_distance = self._create_mask_spinbox(0, 1000000, 0, 10)
+        layout.addWidget(self.cull_camera_lbl, 0, 0)
+        layout.addWidget(self.frustum_padding_lbl, 0, 2)
+        layout.addWidget(self.thin_distance_lbl, 0, 3)
+        layout.addWidget(self.cull_camera, 1, 0)
+        layout.addWidget(self.cull_camera_pb, 1, 1)
+        layout.addWidget(self.frustum_padding, 1, 2)
+        layout.addWidget(self.thin_distance, 1, 3)
+        return layout
+
+    def _create_target_binding_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.bind_to_target = QtWidgets.QCheckBox("Bind Instances to Target")
+        self.follow_target = QtWidgets.QCheckBox("Follow on Time Change")
+        self.update_bound_btn = QtWidgets.QPushButton("Update Now")
+        self.bake_start_lbl = QtWidgets.QLabel("Bake Start")
+        self.bake_end_lbl = QtWidgets.QLabel("Bake End")
+        self.bake_step_lbl = QtWidgets.QLabel("Step")
+        self.bake_start = self._create_mask_spinbox(-100000, 100000, 1, 1)
+        self.bake_end = self._create_mask_spinbox(-100000, 100000, 120, 1)
+        self.bake_step = self._create_mask_spinbox(0.1, 100, 1, 1)
+        self.bake_bound_btn = QtWidgets.QPushButton("Bake Keys")
+        layout.addWidget(self.bind_to_target, 0, 0)
+        layout.addWidget(self.follow_target, 0, 1)
+        layout.addWidget(self.update_bound_btn, 0, 2)
+        layout.addWidget(self.bake_start_lbl, 1, 0)
+        layout.addWidget(self.bake_end_lbl, 1, 1)
+        layout.addWidget(self.bake_step_lbl, 1, 2)
+        layout.addWidget(self.bake_start, 2, 0)
+        layout.addWidget(self.bake_end, 2, 1)
+        layout.addWidget(self.bake_step, 2, 2)
+        layout.addWidget(self.bake_bound_btn, 2, 3)
+        return layout
+
+    def _create_output_mode_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.output_mode_lbl = QtWidgets.QLabel("Scatter Output")
+        self.output_mode_cb = QtWidgets.QComboBox()
+        self.output_mode_cb.addItems(OUTPUT_MODES)
+        self.output_mode_cb.setMinimumWidth(100)
+        layout.addWidget(self.output_mode_lbl, 20, 0)
+        layout.addWidget(self.output_mode_cb, 21, 0)
+        return layout
+
+    def _create_seed_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.seed_lbl = QtWidgets.QLabel("Random Seed")
+        self.seed = QtWidgets.QSpinBox()
+        self.seed.setMinimum(0)
+        self.seed.setMaximum(MAX_SEED)
+        self.seed.setValue(random.randint(0, MAX_SEED))
+        self.seed.setMinimumWidth(100)
+        self.new_seed_btn = QtWidgets.QPushButton("New Seed")
+        layout.addWidget(self.seed_lbl, 22, 0)
+        layout.addWidget(self.seed, 23, 0)
+        layout.addWidget(self.new_seed_btn, 23, 1)
+        return layout
+
+    def _create_bottom_buttons_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.live_preview = QtWidgets.QCheckBox("Live Preview")
+        self.keep_partial = QtWidgets.QCheckBox(
+            "Keep Partial Scatter on Cancel")
+        self.scatter_btn = QtWidgets.QPushButton("Scatter")
+        self.reset_btn = QtWidgets.QPushButton("Reset")
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, PROGRESS_STEPS)
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        layout.addWidget(self.live_preview, 24, 0)
+        layout.addWidget(self.keep_partial, 24, 1)
+        layout.addWidget(self.scatter_btn, 25, 0)
+        layout.addWidget(self.reset_btn, 25, 1)
+        layout.addWidget(self.progress_bar, 26, 0)
+        layout.addWidget(self.cancel_btn, 26, 1)
+        self.save_layout_btn = QtWidgets.QPushButton("Save Layout")
+        self.load_layout_btn = QtWidgets.QPushButton("Apply Layout File")
+        layout.addWidget(self.save_layout_btn, 27, 0)
+        layout.addWidget(self.load_layout_btn, 27, 1)
+        return layout
+
+    def _create_stats_ui(self):
+        layout = QtWidgets.QGridLayout()
+        self.stats_toggle = QtWidgets.QToolButton()
+        self.stats_toggle.setText("Run Statistics")
+        self.stats_toggle.setCheckable(True)
+        self.stats_toggle.setArrowType(QtCore.Qt.RightArrow)
+        self.stats_toggle.setToolButtonStyle(
+            QtCore.Qt.ToolButtonTextBesideIcon)
+        self.stats_toggle.setStyleSheet("border: none")
+        self.stats_panel = QtWidgets.QWidget()
+        panel_lay = QtWidgets.QGridLayout(self.stats_panel)
+        panel_lay.setContentsMargins(0, 0, 0, 0)
+        self.record_stats = QtWidgets.QCheckBox("Record Phase Timings")
+        self.profile_path = QtWidgets.QLineEdit()
+        self.profile_path.setPlaceholderText(
+            "cProfile output file (optional)")
+        self.stats_text = QtWidgets.QPlainTextEdit()
+        self.stats_text.setReadOnly(True)
+        self.stats_text.setStyleSheet("font-family: monospace")
+        self.stats_text.setMinimumHeight(120)
+        panel_lay.addWidget(self.record_stats, 0, 0)
+        panel_lay.addWidget(self.profile_path, 0, 1)
+        panel_lay.addWidget(self.stats_text, 1, 0, 1, 2)
+        self.stats_panel.setVisible(False)
+        layout.addWidget(self.stats_toggle, 27, 0)
+        layout.addWidget(self.stats_panel, 28, 0)
+        return layout
+
+    def _create_scatter_field_headers(self):
+        self.scatter_targ_lbl = QtWidgets.QLabel("Object Being Scattered")
+        self.scatter_targ_lbl.setStyleSheet("font: bold")
+        self.scatter_obj_lbl = QtWidgets.QLabel("Scatter Destination Object")
+        self.scatter_obj_lbl.setStyleSheet("font: bold")
+        layout = QtWidgets.QGridLayout()
+        layout.addWidget(self.scatter_targ_lbl, 0, 0)
+        layout.addWidget(self.scatter_obj_lbl, 0, 3)
+        return layout
+
+    def _set_scatterobject_properties_from_ui(self):
+        for row in RANGE_ROWS:
+            for spinbox_name, attribute in zip(row.spinbox_names,
+                                               row.attributes):
+                setattr(self.scatterobject, attribute,
+                        getattr(self, spinbox_name).value())
+        self.scatterobject.scatter_percentage = self.selected_vert_perc.value()
+        self.scatterobject.obj_pos_offset = self.obj_embed_offset.value()
+        self.scatterobject.aim_axis = AXES[self.aim_axis_cb.currentIndex()]
+        self.scatterobject.up_axis = AXES[self.up_axis_cb.currentIndex()]
+        self.scatterobject.output_mode = self.output_mode_cb.currentIndex()
+        self.scatterobject.sample_mode = self.sample_mode_cb.currentIndex()
+        self.scatterobject.surface_point_count = self.surface_count.value()
+        self.scatterobject.projection_curve = \
+            self.projection_curve.text() or None
+        self.scatterobject.projection_width = self.projection_width.value()
+        self.scatterobject.min_spacing = self.min_spacing.value()
+        self.scatterobject.spacing_uses_scale = \
+            self.spacing_uses_scale.isChecked()
+        self.scatterobject.seed = self.seed.value()
+        self.scatterobject.keep_partial_on_cancel = \
+            self.keep_partial.isChecked()
+        self.scatterobject.slope_range = None
+        if self.limit_slope.isChecked():
+            self.scatterobject.slope_range = (self.slope_min.value(),
+                                              self.slope_max.value())
+        self.scatterobject.height_range = None
+        if self.limit_height.isChecked():
+            self.scatterobject.height_range = (self.height_min.value(),
+                                               self.height_max.value())
+        self.scatterobject.color_channel = None
+        if self.color_channel_cb.currentIndex() > 0:
+            self.scatterobject.color_channel = \
+                self.color_channel_cb.currentIndex() - 1
+        self.scatterobject.density_map = self.density_map.text() or None
+        self.scatterobject.prototype_weights = self._prototype_weights()
+        self.scatterobject.cull_camera = self.cull_camera.text() or None
+        self.scatterobject.frustum_padding = self.frustum_padding.value()
+        self.scatterobject.thin_distance = self.thin_distance.value()
+        self.scatterobject.bind_to_target = self.bind_to_target.isChecked()
+        self.scatterobject.stats.enabled = self.record_stats.isChecked()
+        self.scatterobject.stats.profile_path = \
+            self.profile_path.text() or None
+
+    def _prototype_weights(self):
+        try:
+            return [float(weight) for weight in
+                    self.prototype_weights.text().replace(",", " ").split()]
+        except ValueError:
+            log.warning("Object weights must be numbers separated by commas. "
+                        "Using equal weights.")
+            return []
+
+    def _set_selected_scatter_object(self):
+        self.scatterobject.select_scatter_object()
+        self.scatter_obj.setText(self.scatterobject.current_object_def)
+
+    def _set_selected_scatter_target(self):
+        self.scatterobject.select_target_object()
+        self.scatter_targ.setText(self.scatterobject.current_target_def)
+
+    def _reset_scatterobject_properties_from_ui(self):
+        self._reset_scatter_scale_and_rotation_from_ui()
+        self.align_to_normals.setChecked(False)
+        self.align_to_normals_and_rotation.setChecked(False)
+        self.scatterobject.form_of_scatter = 0
+        self.aim_axis_cb.setCurrentIndex(0)
+        self.up_axis_cb.setCurrentIndex(1)
+        self.output_mode_cb.setCurrentIndex(0)
+        self.scatterobject.output_mode = 0
+        self.sample_mode_cb.setCurrentIndex(0)
+        self.scatterobject.sample_mode = 0
+        self.scatterobject.surface_point_count = \
+            self.surface_count.setValue(1000)
+        self.projection_curve.setText("")
+        self.projection_width.setValue(0)
+        self.scatterobject.projection_curve = None
+        self.scatterobject.projection_width = 0.0
+        self.scatterobject.min_spacing = self.min_spacing.setValue(0)
+        self.spacing_uses_scale.setChecked(False)
+        self.scatterobject.spacing_uses_scale = False
+        self._reset_placement_masks_from_ui()
+        self._new_seed_click()
+        self.scatterobject.scatter_percentage = \
+            self.selected_vert_perc.setValue(100)
+        self.scatterobject.scatter_obj_def = self.scatter_obj.setText("")
+        self.prototype_weights.setText("")
+        self.scatterobject.prototype_weights = []
+        self.scatterobject.scatter_target_def = self.scatter_targ.setText("")
+        self.scatterobject.obj_pos_offset = self.obj_embed_offset.setValue(0)
+
+    def _reset_placement_masks_from_ui(self):
+        self.limit_slope.setChecked(False)
+        self.slope_min.setValue(0)
+        self.slope_max.setValue(30)
+        self.limit_height.setChecked(False)
+        self.height_min.setValue(0)
+        self.height_max.setValue(10)
+        self.color_channel_cb.setCurrentIndex(0)
+        self.density_map.setText("")
+        self.scatterobject.slope_range = None
+        self.scatterobject.height_range = None
+        self.scatterobject.color_channel = None
+        self.scatterobject.density_map = None
+        self.cull_camera.setText("")
+        self.frustum_padding.setValue(0.1)
+        self.thin_distance.setValue(0)
+        self.scatterobject.cull_camera = None
+        self.scatterobject.frustum_padding = 0.1
+        self.scatterobject.thin_distance = 0.0
+        self.bind_to_target.setChecked(False)
+        self.follow_target.setChecked(False)
+        self.scatterobject.bind_to_target = False
+
+    def _reset_scatter_scale_and_rotation_from_ui(self):
+        for row in RANGE_ROWS:
+            for spinbox_name, attribute, default in zip(
+                    row.spinbox_names, row.attributes, row.field[3]):
+                getattr(self, spinbox_name).setValue(default)
+                setattr(self.scatterobject, attribute, default)
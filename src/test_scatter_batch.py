@@ -0,0 +1,60 @@
+"""Tests of scatter_batch, run with pytest"""
+import json
+import numpy as np
+import pytest
+import scatter_batch
+import scatter_io
+
+
+def write_grid_obj(path, size=20):
+    with open(path, "w") as obj_file:
+        for z in range(size):
+            for x in range(size):
+                obj_file.write("v %d 0 %d\n" % (x, z))
+        for z in range(size - 1):
+            for x in range(size - 1):
+                corner = z * size + x + 1
+                obj_file.write("f %d %d %d %d\n" % (
+                    corner, corner + size, corner + size + 1, corner + 1))
+
+
+def test_run_job_is_reproducible(tmp_path):
+    write_grid_obj(str(tmp_path / "ground.obj"))
+    job = {"target": "ground.obj", "percentage": 25, "seed": 7,
+           "form_of_scatter": 1, "prototype": "rock"}
+    layout, metadata = scatter_batch.run_job(job, str(tmp_path))
+    again, _ = scatter_batch.run_job(job, str(tmp_path))
+    assert len(layout) == 100
+    assert metadata["prototypes"] == ["rock"]
+    np.testing.assert_array_equal(layout.positions, again.positions)
+    np.testing.assert_array_equal(layout.rotations, again.rotations)
+    np.testing.assert_allclose(layout.positions[:, 1], 0.0)
+
+
+def test_run_job_restricts_to_vertices(tmp_path):
+    job = {"target": {"points": [[0, 0, 0], [1, 0, 0], [2, 0, 0]],
+                      "normals": [[0, 1, 0]] * 3},
+           "vertices": [2, 0, 2], "seed": 1}
+    layout, _ = scatter_batch.run_job(job, str(tmp_path))
+    np.testing.assert_array_equal(np.sort(layout.positions[:, 0]), [0, 2])
+
+
+def test_run_job_rejects_vertices_out_of_range(tmp_path):
+    write_grid_obj(str(tmp_path / "ground.obj"))
+    job = {"target": "ground.obj", "vertices": [1, 2, 99999]}
+    with pytest.raises(ValueError, match="vertex index out of range"):
+        scatter_batch.run_job(job, str(tmp_path))
+
+
+def test_main_writes_layout_and_reports_errors(tmp_path):
+    write_grid_obj(str(tmp_path / "ground.obj"))
+    job_path = str(tmp_path / "job.json")
+    output = str(tmp_path / "layout.sclayout")
+    with open(job_path, "w") as job_file:
+        json.dump({"target": "ground.obj", "seed": 3}, job_file)
+    assert scatter_batch.main([job_path, output]) == 0
+    layout, _ = scatter_io.load_layout(output)
+    assert len(layout) == 400
+    with open(job_path, "w") as job_file:
+        json.dump({"target": "ground.obj", "vertices": [400]}, job_file)
+    assert scatter_batch.main([job_path, output]) == 1
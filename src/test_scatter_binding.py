@@ -0,0 +1,83 @@
+"""Tests of scatter_binding, run with pytest"""
+import numpy as np
+import pytest
+import scatter_binding
+import scatter_core
+import scatter_mesh
+import scatter_sampling
+
+
+def wavy_grid(offset=0.0, size=6, amplitude=1.0):
+    x, z = np.meshgrid(np.arange(size, dtype=np.float64),
+                       np.arange(size, dtype=np.float64))
+    positions = np.stack((x.ravel(), amplitude * np.sin(x.ravel() + z.ravel())
+                          + offset, z.ravel()), axis=1)
+    corners = np.arange(size * size).reshape(size, size)[:-1, :-1].ravel()
+    triangles = np.concatenate((
+        np.stack((corners, corners + size, corners + 1), axis=1),
+        np.stack((corners + 1, corners + size, corners + size + 1), axis=1)))
+    return scatter_mesh.MeshData(
+        "ground", positions,
+        scatter_mesh.compute_vertex_normals(positions, triangles), triangles)
+
+
+def test_vertex_binding_evaluates_to_the_vertices():
+    mesh_data = wavy_grid()
+    selection = scatter_mesh.VertexSelection(["ground"], [[3, 7, 20]])
+    binding = scatter_binding.vertex_binding(selection)
+    positions, normals = binding.evaluate({"ground": mesh_data})
+    expected = scatter_core.vertex_points({"ground": mesh_data}, selection)
+    np.testing.assert_allclose(positions, expected[0])
+    np.testing.assert_allclose(normals, expected[1])
+
+
+def test_surface_binding_follows_moved_points():
+    mesh_data = wavy_grid()
+    sampler = scatter_sampling.surface_sampler(mesh_data)
+    samples = scatter_sampling.sample_surface_barycentric(
+        [sampler], 200, np.random.RandomState(0))
+    positions, normals = scatter_sampling.interpolate_samples([sampler],
+                                                              samples)
+    binding = scatter_binding.surface_binding(["ground"], [sampler],
+                                              samples)
+    bound = binding.evaluate({"ground": mesh_data})
+    np.testing.assert_allclose(bound[0], positions)
+    np.testing.assert_allclose(bound[1], normals)
+    moved = binding.evaluate({"ground": wavy_grid(offset=2.0)})
+    np.testing.assert_allclose(moved[0], positions + [0, 2, 0])
+    np.testing.assert_allclose(moved[1], normals)
+    subset = binding.subset(np.arange(200) % 2 == 0)
+    np.testing.assert_allclose(
+        subset.evaluate({"ground": mesh_data})[0], positions[::2])
+
+
+def test_evaluate_rejects_meshes_that_lost_vertices():
+    binding = scatter_binding.vertex_binding(
+        scatter_mesh.VertexSelection(["ground"], [[35]]))
+    with pytest.raises(ValueError):
+        binding.evaluate({"ground": wavy_grid(size=5)})
+
+
+def test_follow_layout_keeps_random_values():
+    mesh_data = wavy_grid()
+    selection = scatter_core.whole_mesh_selection(mesh_data)
+    binding = scatter_binding.vertex_binding(selection)
+    settings = scatter_core.ScatterSettings()
+    settings.scale_range = ((0.5, 0.5, 0.5), (2.0, 2.0, 2.0))
+    settings.embed_offset = 0.3
+    settings.seed = 5
+    for form_of_scatter in (0, 1, 2):
+        settings.form_of_scatter = form_of_scatter
+        positions, normals = scatter_core.vertex_points(
+            {"ground": mesh_data}, selection)
+        layout = scatter_core.create_layout(positions, normals, settings,
+                                            binding=binding)
+        moved = wavy_grid(offset=1.0, amplitude=0.5)
+        followed = scatter_binding.follow_layout(
+            layout, *binding.evaluate({"ground": moved}), settings=settings)
+        expected = scatter_core.create_layout(moved.positions, moved.normals,
+                                              settings)
+        for name in ("positions", "rotations", "scales", "offsets"):
+            np.testing.assert_allclose(getattr(followed, name),
+                                       getattr(expected, name), atol=1e-9)
+        assert followed.binding is binding
@@ -0,0 +1,81 @@
+"""Tests of scatter_core, run with pytest"""
+import numpy as np
+import scatter_core
+
+
+def layout_settings():
+    settings = scatter_core.ScatterSettings()
+    settings.form_of_scatter = 2
+    settings.scale_range = ((0.5, 0.5, 0.5), (2.0, 2.0, 2.0))
+    settings.embed_offset = 0.1
+    settings.seed = 7
+    return settings
+
+
+def random_points(count, rng):
+    normals = rng.normal(size=(count, 3))
+    return (rng.uniform(-10, 10, (count, 3)),
+            normals / np.linalg.norm(normals, axis=1)[:, None])
+
+
+def test_chunks_keep_their_random_values():
+    chunk = scatter_core.LAYOUT_CHUNK_SIZE
+    positions, normals = random_points(2 * chunk + 123,
+                                       np.random.RandomState(3))
+    settings = layout_settings()
+    full = scatter_core.create_layout(positions, normals, settings)
+    first = scatter_core.create_layout(positions[:chunk], normals[:chunk],
+                                       settings)
+    for name in ("positions", "rotations", "scales", "offsets"):
+        np.testing.assert_array_equal(getattr(full, name)[:chunk],
+                                      getattr(first, name))
+    assert not np.array_equal(full.rotations[:chunk],
+                              full.rotations[chunk:2 * chunk])
+
+
+class CountingCache(scatter_core.LayoutCache):
+    """LayoutCache recording the name of every entry it computes"""
+
+    def __init__(self, computed):
+        super(CountingCache, self).__init__()
+        self.computed = computed
+
+    def get(self, name, key, compute):
+        def counted():
+            self.computed.append(name)
+            return compute()
+        return super(CountingCache, self).get(name, key, counted)
+
+
+def test_layout_cache_reuses_random_values():
+    positions, normals = random_points(500, np.random.RandomState(4))
+    settings = layout_settings()
+    computed = []
+    cache = CountingCache(computed)
+    first = scatter_core.create_layout(positions, normals, settings, cache)
+    settings.rotation_range = ((0, 0, 0), (0, 90, 0))
+    settings.embed_offset = 0.5
+    second = scatter_core.create_layout(positions, normals, settings, cache)
+    assert computed == ["units"]
+    np.testing.assert_array_equal(first.scales, second.scales)
+    assert not np.array_equal(first.rotations, second.rotations)
+    uncached = scatter_core.create_layout(positions, normals, settings)
+    np.testing.assert_array_equal(second.rotations, uncached.rotations)
+    settings.seed = 8
+    scatter_core.create_layout(positions, normals, settings, cache)
+    moved = positions + 1.0
+    scatter_core.create_layout(moved, normals, settings, cache)
+    assert computed == ["units"] * 3
+
+
+def test_sampling_key_ignores_layout_settings():
+    settings = layout_settings()
+    key = scatter_core.sampling_key(settings)
+    settings.rotation_range = ((0, 0, 0), (0, 90, 0))
+    settings.scale_range = ((1, 1, 1), (3, 3, 3))
+    settings.embed_offset = 2.0
+    assert scatter_core.sampling_key(settings) == key
+    settings.percentage = 50
+    assert scatter_core.sampling_key(settings) != key
+    settings.seed = None
+    assert scatter_core.sampling_key(settings) is None
@@ -0,0 +1,54 @@
+"""Tests of scatter_culling, run with pytest"""
+import numpy as np
+import scatter_core
+import scatter_culling
+
+
+def side_view():
+    """Returns a camera at (10, 0, 0) looking down world -X
+
+    Its local -Z axis is world -X, local X is world -Z and local Y is
+    world Y. Both fields of view are 90 degrees.
+    """
+    matrix = [[0, 0, -1, 0], [0, 1, 0, 0], [1, 0, 0, 0], [10, 0, 0, 1]]
+    return scatter_culling.CameraView(matrix, 90.0, 90.0, 1.0, 50.0)
+
+
+def test_frustum_mask():
+    positions = np.array([[0, 0, 0], [0, 9, 0], [0, 10.8, 0], [0, 0, -9],
+                          [20, 0, 0], [9.5, 0, 0], [-45, 0, 0],
+                          [0, 10.5, 0]])
+    np.testing.assert_array_equal(
+        scatter_culling.frustum_mask(positions, side_view()),
+        [True, True, False, True, False, False, False, False])
+    np.testing.assert_array_equal(
+        scatter_culling.frustum_mask(positions, side_view(), 0.1),
+        [True, True, True, True, False, False, False, True])
+
+
+def test_distance_density():
+    positions = np.array([[8, 0, 0], [5, 0, 0], [0, 0, 0], [-10, 0, 0]])
+    np.testing.assert_allclose(
+        scatter_culling.distance_density(positions, side_view(), 5.0),
+        [1.0, 1.0, 0.25, 0.0625])
+
+
+def test_view_dict_round_trip():
+    view = scatter_culling.CameraView.from_dict(side_view().to_dict())
+    np.testing.assert_array_equal(view.matrix, side_view().matrix)
+    assert (view.horizontal_fov, view.near, view.far) == (90.0, 1.0, 50.0)
+
+
+def test_cull_mask_thins_far_points():
+    rng = np.random.RandomState(0)
+    near = rng.uniform([6, -1, -1], [8, 1, 1], (4000, 3))
+    far = rng.uniform([-21, -1, -1], [-19, 1, 1], (4000, 3))
+    settings = scatter_core.ScatterSettings()
+    settings.camera_view = side_view().to_dict()
+    settings.thin_distance = 5.0
+    settings.seed = 3
+    keep = scatter_core.cull_mask(np.vstack((near, far)), settings)
+    assert keep[:4000].all()
+    assert abs(keep[4000:].mean() - 1.0 / 36) < 0.01
+    np.testing.assert_array_equal(
+        keep, scatter_core.cull_mask(np.vstack((near, far)), settings))
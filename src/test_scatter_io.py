@@ -0,0 +1,36 @@
+"""Tests of scatter_io, run with pytest"""
+import numpy as np
+import scatter_io
+import scatter_layout
+
+
+def random_layout(count, rng, prototype_ids=None):
+    return scatter_layout.ScatterLayout(
+        rng.uniform(-100, 100, (count, 3)), rng.uniform(0, 360, (count, 3)),
+        rng.uniform(0.5, 2, (count, 3)), rng.uniform(-1, 1, (count, 3)), 2,
+        prototype_ids)
+
+
+def test_layout_file_round_trip(tmp_path):
+    rng = np.random.RandomState(4)
+    layout = random_layout(300, rng, rng.randint(0, 3, 300))
+    path = str(tmp_path / "layout.sclayout")
+    scatter_io.save_layout(path, layout, {"prototypes": ["rock", "bush"],
+                                          "seed": 4})
+    loaded, metadata = scatter_io.load_layout(path)
+    assert metadata["prototypes"] == ["rock", "bush"]
+    assert metadata["seed"] == 4
+    assert loaded.form_of_scatter == 2
+    for name in ("positions", "rotations", "scales", "offsets"):
+        np.testing.assert_allclose(getattr(loaded, name),
+                                   getattr(layout, name), rtol=1e-6,
+                                   atol=1e-4)
+    np.testing.assert_array_equal(loaded.prototype_ids, layout.prototype_ids)
+
+
+def test_empty_layout_round_trip(tmp_path):
+    path = str(tmp_path / "empty.sclayout")
+    scatter_io.save_layout(path, random_layout(0, np.random.RandomState(0)))
+    loaded, _ = scatter_io.load_layout(path)
+    assert len(loaded) == 0
+    assert loaded.prototype_ids is None
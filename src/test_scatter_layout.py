@@ -0,0 +1,59 @@
+"""Tests of scatter_layout, run with pytest"""
+import itertools
+import numpy as np
+import scatter_layout
+
+AXES = [scatter_layout.X_AXIS, scatter_layout.Y_AXIS, scatter_layout.Z_AXIS]
+
+
+def euler_xyz_matrices(degrees):
+    """Builds rotation matrices from XYZ order euler degrees"""
+    x_rot, y_rot, z_rot = np.radians(degrees).T
+    matrices = []
+    for x, y, z in zip(x_rot, y_rot, z_rot):
+        rotate_x = np.array([[1, 0, 0], [0, np.cos(x), -np.sin(x)],
+                             [0, np.sin(x), np.cos(x)]])
+        rotate_y = np.array([[np.cos(y), 0, np.sin(y)], [0, 1, 0],
+                             [-np.sin(y), 0, np.cos(y)]])
+        rotate_z = np.array([[np.cos(z), -np.sin(z), 0],
+                             [np.sin(z), np.cos(z), 0], [0, 0, 1]])
+        matrices.append(rotate_z.dot(rotate_y).dot(rotate_x))
+    return np.array(matrices)
+
+
+def random_normals(count, rng):
+    normals = rng.normal(size=(count, 3))
+    normals = np.vstack((normals, AXES, np.negative(AXES)))
+    return normals / np.linalg.norm(normals, axis=1)[:, None]
+
+
+def test_euler_round_trip():
+    rng = np.random.RandomState(0)
+    degrees = rng.uniform((-180, -90, -180), (180, 90, 180), (500, 3))
+    degrees = np.vstack((degrees, [[30, 90, 0], [-45, -90, 0]]))
+    matrices = euler_xyz_matrices(degrees)
+    converted = scatter_layout.matrices_to_euler_xyz(matrices)
+    np.testing.assert_allclose(euler_xyz_matrices(converted), matrices,
+                               atol=1e-9)
+
+
+def test_aim_axis_follows_normal():
+    normals = random_normals(200, np.random.RandomState(1))
+    for aim_axis, up_axis in itertools.permutations(AXES, 2):
+        matrices = scatter_layout.normal_alignment_matrices(
+            normals, aim_axis, up_axis)
+        np.testing.assert_allclose(np.einsum("ijk,k->ij", matrices, aim_axis),
+                                   normals, atol=1e-9)
+        np.testing.assert_allclose(np.linalg.det(matrices), 1.0, atol=1e-9)
+        up = np.einsum("ijk,k->ij", matrices, up_axis)
+        assert (up[:, 1] >= -1e-9).all()
+
+
+def test_aligned_rotations_aim_along_normal():
+    normals = random_normals(200, np.random.RandomState(2))
+    for aim_axis, up_axis in itertools.permutations(AXES, 2):
+        rotations = scatter_layout.aligned_rotations(normals, aim_axis,
+                                                     up_axis)
+        aims = np.einsum("ijk,k->ij", euler_xyz_matrices(rotations),
+                         aim_axis)
+        np.testing.assert_allclose(aims, normals, atol=1e-9)
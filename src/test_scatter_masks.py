@@ -0,0 +1,85 @@
+"""Tests of scatter_masks, run with pytest"""
+import numpy as np
+import pytest
+import scatter_core
+import scatter_masks
+import scatter_mesh
+
+
+def tilted_mesh():
+    """Returns four vertices at heights 0 to 3 with slopes 0 to 90"""
+    angles = np.radians([0, 30, 60, 90])
+    normals = np.stack((np.sin(angles), np.cos(angles),
+                        np.zeros(4)), axis=1)
+    positions = np.stack((np.zeros(4), np.arange(4.0), np.zeros(4)), axis=1)
+    colors = np.tile([0.0, 0.25, 1.0, 1.0], (4, 1))
+    colors[:, 0] = [0.0, 0.5, 1.0, 2.0]
+    uvs = np.array([[0, 0], [1, 0], [0, 1], [0.5, 0.5]])
+    return scatter_mesh.MeshData("hill", positions, normals, colors=colors,
+                                 uvs=uvs)
+
+
+def test_slope_and_height_limits():
+    settings = scatter_core.ScatterSettings()
+    assert scatter_masks.placement_weights(tilted_mesh(), settings) is None
+    settings.slope_range = (0, 45)
+    np.testing.assert_array_equal(
+        scatter_masks.placement_weights(tilted_mesh(), settings),
+        [1, 1, 0, 0])
+    settings.height_range = (0.5, 3)
+    np.testing.assert_array_equal(
+        scatter_masks.placement_weights(tilted_mesh(), settings),
+        [0, 1, 0, 0])
+
+
+def test_color_channel_scales_weights():
+    settings = scatter_core.ScatterSettings()
+    settings.color_channel = 0
+    np.testing.assert_allclose(
+        scatter_masks.placement_weights(tilted_mesh(), settings),
+        [0, 0.5, 1, 1])
+    mesh_data = tilted_mesh()
+    mesh_data.colors = None
+    with pytest.raises(ValueError):
+        scatter_masks.placement_weights(mesh_data, settings)
+
+
+def test_density_map_weights(tmp_path):
+    path = str(tmp_path / "density.npy")
+    np.save(path, np.array([[0.0, 1.0], [0.5, 0.25]]))
+    settings = scatter_core.ScatterSettings()
+    settings.density_map = path
+    np.testing.assert_allclose(
+        scatter_masks.placement_weights(tilted_mesh(), settings),
+        [0, 1, 0.5, 0.4375])
+
+
+def test_sample_density_map_is_bilinear_and_clamped():
+    density_map = np.array([[0.0, 0.2, 0.4], [0.6, 0.8, 1.0]])
+    uvs = np.array([[0, 0], [1, 1], [0.25, 0], [0.5, 0.5], [-1, 2],
+                    [1, 0.5]])
+    np.testing.assert_allclose(
+        scatter_masks.sample_density_map(density_map, uvs),
+        [0.0, 1.0, 0.1, 0.5, 0.6, 0.7])
+
+
+def test_point_mask_matches_vertex_limits():
+    mesh_data = tilted_mesh()
+    settings = scatter_core.ScatterSettings()
+    settings.slope_range = (20, 90)
+    settings.height_range = (0, 2)
+    np.testing.assert_array_equal(
+        scatter_masks.point_mask(mesh_data.positions, mesh_data.normals,
+                                 settings),
+        scatter_masks.placement_weights(mesh_data, settings) > 0)
+
+
+def test_masked_vertices_are_never_sampled():
+    mesh_data = tilted_mesh()
+    settings = scatter_core.ScatterSettings()
+    settings.slope_range = (0, 45)
+    settings.seed = 2
+    selection = scatter_core.masked_selection(
+        {"hill": mesh_data}, scatter_core.whole_mesh_selection(mesh_data),
+        settings)
+    np.testing.assert_array_equal(selection.indices[0], [0, 1])
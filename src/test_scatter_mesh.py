@@ -0,0 +1,56 @@
+"""Tests of scatter_mesh, run with pytest"""
+import numpy as np
+import scatter_mesh
+
+
+def test_parse_vertex_ranges():
+    selection = scatter_mesh.parse_vertex_ranges(
+        ["ground.vtx[4:6]", "rock.vtx[*]", "ground.vtx[2]", "ground.vtx[5]",
+         "ground.f[3]", "ground"], lambda mesh: 3)
+    assert selection.meshes == ["ground", "rock"]
+    np.testing.assert_array_equal(selection.indices[0], [2, 4, 5, 6])
+    np.testing.assert_array_equal(selection.indices[1], [0, 1, 2])
+    assert len(selection) == 7
+
+
+def test_sample_picks_distinct_selected_vertices():
+    selection = scatter_mesh.VertexSelection(
+        ["ground", "rock"], [np.arange(0, 100, 2), np.arange(10, 40)])
+    sampled = selection.sample(60, np.random.RandomState(0))
+    assert len(sampled) == 60
+    for mesh, indices in sampled:
+        picked = dict(selection)[mesh]
+        assert np.isin(indices, picked).all()
+        assert len(np.unique(indices)) == len(indices)
+
+
+def test_sample_everything_keeps_the_selection():
+    selection = scatter_mesh.VertexSelection(["ground"], [np.arange(5, 25)])
+    sampled = selection.sample(20, np.random.RandomState(1))
+    np.testing.assert_array_equal(np.sort(sampled.indices[0]),
+                                  selection.indices[0])
+
+
+def test_component_names_round_trip():
+    selection = scatter_mesh.VertexSelection(
+        ["ground", "rock"], [[9, 1, 2, 3, 7, 8, 12], [0]])
+    names = selection.component_names()
+    assert names == ["ground.vtx[1:3]", "ground.vtx[7:9]",
+                     "ground.vtx[12:12]", "rock.vtx[0:0]"]
+    parsed = scatter_mesh.parse_vertex_ranges(names, len)
+    np.testing.assert_array_equal(parsed.indices[0], [1, 2, 3, 7, 8, 9, 12])
+    np.testing.assert_array_equal(parsed.indices[1], [0])
+
+
+def test_digest_changes_with_any_read_array():
+    positions = np.arange(12, dtype=np.float64).reshape(4, 3)
+    normals = np.tile([0.0, 1.0, 0.0], (4, 1))
+    digest = scatter_mesh.MeshData("ground", positions, normals).digest()
+    assert scatter_mesh.MeshData("ground", positions.copy(),
+                                 normals).digest() == digest
+    assert scatter_mesh.MeshData("ground", positions + [0, 1, 0],
+                                 normals).digest() != digest
+    assert scatter_mesh.MeshData("ground", positions, -normals).digest() \
+        != digest
+    assert scatter_mesh.MeshData("ground", positions, normals,
+                                 colors=np.ones((4, 4))).digest() != digest
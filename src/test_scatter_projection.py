@@ -0,0 +1,85 @@
+"""Tests of scatter_projection, run with pytest"""
+import numpy as np
+import scatter_projection
+
+
+def brute_force_intersect(positions, triangles, origins, directions):
+    """Returns the nearest triangle id and distance of every ray"""
+    corners = positions[triangles]
+    edge_1 = corners[:, 1] - corners[:, 0]
+    edge_2 = corners[:, 2] - corners[:, 0]
+    triangle_ids = np.full(len(origins), -1)
+    distances = np.full(len(origins), np.inf)
+    for ray, (origin, direction) in enumerate(zip(origins, directions)):
+        across = np.cross(direction, edge_2)
+        determinants = np.einsum("ij,ij->i", edge_1, across)
+        valid = np.abs(determinants) > 1e-12
+        inverse = np.where(valid, 1.0 / np.where(valid, determinants, 1.0),
+                           0.0)
+        offsets = origin - corners[:, 0]
+        u = np.einsum("ij,ij->i", offsets, across) * inverse
+        lifted = np.cross(offsets, edge_1)
+        v = lifted.dot(direction) * inverse
+        t = np.einsum("ij,ij->i", edge_2, lifted) * inverse
+        hits = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+        if hits.any():
+            nearest = np.flatnonzero(hits)[np.argmin(t[hits])]
+            triangle_ids[ray] = nearest
+            distances[ray] = t[nearest]
+    return triangle_ids, distances
+
+
+def noisy_grid(rng, size=12):
+    x, z = np.meshgrid(np.linspace(-5, 5, size), np.linspace(-5, 5, size))
+    positions = np.stack((x.ravel(), rng.uniform(-1, 1, size * size),
+                          z.ravel()), axis=1)
+    corners = np.arange(size * size).reshape(size, size)[:-1, :-1].ravel()
+    triangles = np.concatenate((
+        np.stack((corners, corners + size, corners + 1), axis=1),
+        np.stack((corners + 1, corners + size, corners + size + 1), axis=1)))
+    return positions, triangles
+
+
+def check_against_brute_force(bvh, positions, triangles, rng):
+    origins = rng.uniform((-6, 2, -6), (6, 4, 6), (400, 3))
+    directions = rng.normal(size=(400, 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    for directions in (np.tile(scatter_projection.DOWN, (400, 1)),
+                       directions):
+        triangle_ids, distances, weights = bvh.intersect(origins, directions)
+        expected_ids, expected_distances = brute_force_intersect(
+            positions, triangles, origins, directions)
+        np.testing.assert_array_equal(triangle_ids >= 0, expected_ids >= 0)
+        hit = expected_ids >= 0
+        np.testing.assert_allclose(distances[hit], expected_distances[hit])
+        points = np.einsum("ij,ijk->ik", weights[hit],
+                           positions[triangles[triangle_ids[hit]]])
+        np.testing.assert_allclose(
+            points, origins[hit]
+            + expected_distances[hit, None] * directions[hit], atol=1e-9)
+
+
+def test_bvh_matches_brute_force():
+    rng = np.random.RandomState(6)
+    positions, triangles = noisy_grid(rng)
+    bvh = scatter_projection.TriangleBVH(positions, triangles)
+    check_against_brute_force(bvh, positions, triangles, rng)
+
+
+def test_refit_bvh_matches_brute_force():
+    rng = np.random.RandomState(7)
+    positions, triangles = noisy_grid(rng)
+    bvh = scatter_projection.TriangleBVH(positions, triangles)
+    positions[:, 1] = rng.uniform(-1, 1, len(positions))
+    bvh.refit(positions)
+    check_against_brute_force(bvh, positions, triangles, rng)
+
+
+def test_morton_codes_interleave_axes():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1],
+                       [1, 1, 1]], dtype=np.float64)
+    bits = scatter_projection.MORTON_BITS
+    axis_codes = [sum(1 << 3 * bit + 2 - axis for bit in range(bits))
+                  for axis in range(3)]
+    codes = scatter_projection.morton_codes(points)
+    assert codes.tolist() == [0] + axis_codes + [sum(axis_codes)]
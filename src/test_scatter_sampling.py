@@ -0,0 +1,73 @@
+"""Tests of scatter_sampling, run with pytest"""
+import numpy as np
+import scatter_mesh
+import scatter_sampling
+
+
+def two_triangles(height=1.0):
+    """Returns a mesh of two triangles, the second three times as large"""
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 0, 2],
+                          [5, 0, 0], [8, 0, 0], [5, 0, 2]],
+                         dtype=np.float64) * [1, height, 1]
+    triangles = np.array([[0, 2, 1], [3, 5, 4]])
+    return scatter_mesh.MeshData("ground", positions,
+                                 np.tile([0.0, 1.0, 0.0], (6, 1)), triangles)
+
+
+def test_points_spread_by_area():
+    sampler = scatter_sampling.surface_sampler(two_triangles())
+    triangle_ids, weights = sampler.sample_barycentric(
+        40000, np.random.RandomState(0))
+    np.testing.assert_allclose(np.bincount(triangle_ids) / 40000.0,
+                               [0.25, 0.75], atol=0.01)
+    assert (weights >= 0).all()
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+
+
+def test_vertex_weights_scale_triangle_share():
+    mesh_data = two_triangles()
+    sampler = scatter_sampling.surface_sampler(
+        mesh_data, vertex_weights=[3, 3, 3, 1, 1, 1])
+    triangle_ids, _ = sampler.sample_barycentric(40000,
+                                                 np.random.RandomState(1))
+    np.testing.assert_allclose(np.bincount(triangle_ids) / 40000.0,
+                               [0.5, 0.5], atol=0.01)
+
+
+def test_samples_spread_over_meshes_by_area():
+    small = scatter_sampling.surface_sampler(two_triangles(), [0, 1, 2])
+    large = scatter_sampling.surface_sampler(two_triangles(), [3, 4, 5])
+    samples = scatter_sampling.sample_surface_barycentric(
+        [small, large], 40000, np.random.RandomState(2))
+    counts = [len(triangle_ids) for triangle_ids, _ in samples]
+    np.testing.assert_allclose(np.array(counts) / 40000.0, [0.25, 0.75],
+                               atol=0.01)
+    positions, normals = scatter_sampling.interpolate_samples(
+        [small, large], samples)
+    assert (positions[:counts[0], 0] <= 1.0).all()
+    assert (positions[counts[0]:, 0] >= 5.0).all()
+    np.testing.assert_allclose(normals, np.tile([0, 1, 0], (40000, 1)))
+
+
+def test_sampler_cache_follows_mesh_version():
+    mesh_data = two_triangles()
+    sampler = scatter_sampling.surface_sampler(mesh_data)
+    assert scatter_sampling.surface_sampler(mesh_data) is sampler
+    assert scatter_sampling.surface_sampler(mesh_data, [0, 1, 2]) \
+        is not sampler
+    assert scatter_sampling.surface_sampler(two_triangles()) is not sampler
+
+
+def test_poisson_disk_filter_matches_brute_force():
+    rng = np.random.RandomState(5)
+    positions = rng.uniform(0, 10, (1500, 3))
+    radii = rng.uniform(0.2, 0.6, len(positions))
+    expected = np.zeros(len(positions), dtype=bool)
+    for index in range(len(positions)):
+        distances = np.linalg.norm(positions[expected] - positions[index],
+                                   axis=1)
+        expected[index] = (distances >= radii[expected]
+                           + radii[index]).all()
+    keep = scatter_sampling.poisson_disk_filter(positions, radii)
+    np.testing.assert_array_equal(keep, expected)
+    assert 0 < keep.sum() < len(positions)